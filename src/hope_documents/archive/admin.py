@@ -1,18 +1,39 @@
-from PIL import Image
-from admin_extra_buttons.api import ExtraButtonsMixin, button
+import json
+from collections.abc import Generator, Iterable
+from typing import Any
+
+from admin_extra_buttons.api import ExtraButtonsMixin, button, view
 from django import forms
+from django.conf import settings
 from django.contrib import admin, messages
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.http import HttpRequest, HttpResponse
+from django.db.models import QuerySet
+from django.http import (
+    HttpRequest,
+    HttpResponseBase,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
 from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
 
+from ..exceptions import OCRBusyError
+from ..ocr.admission import DEFAULT_CONCURRENCY, get_admission
 from ..ocr.engine import CV2Config, MatchMode, Processor, ScanEntryInfo, SearchInfo, TSConfig
 from ..ocr.loaders import Loader, loader_registry
-from ..utils.image import get_image_base64
+from ..utils.image import get_thumbnail_base64, load_pages
 from ..utils.language import fqn
-from ..utils.timeit import time_it
+from ..utils.timeit import Timer, time_it
 from . import models
+from .batch import uploaded_entries, verify_entries
+from .detection import detect
+from .jobs import job_options, submit_job
+from .store import DatabaseFingerprintIndex, DatabaseResultStore
 
 PSM_CHOICES = (
     (0, "(0) Orientation and script detection (OSD) only."),
@@ -38,6 +59,7 @@ OEM_CHOICES = (
 )
 
 LOADERS = [(fqn(p), p.__name__) for p in loader_registry]
+PREVIEW_SIZE = 500
 
 
 class TestImageForm(forms.Form):
@@ -51,6 +73,11 @@ class TestImageForm(forms.Form):
     loaders = forms.MultipleChoiceField(choices=LOADERS, initial=[x[0] for x in LOADERS])
 
     target = forms.CharField(required=False, help_text="Text to search for in the document")
+    rule = forms.ModelChoiceField(
+        queryset=models.DocumentRule.objects.select_related("country", "type"),
+        required=False,
+        help_text="Use the rule OCR profile, and extract the document number with its number regex",
+    )
     max_errors = forms.IntegerField(
         initial=5, validators=[MinValueValidator(0)], help_text="Maximum number of errors allowed for a match"
     )
@@ -60,11 +87,53 @@ class TestImageForm(forms.Form):
         coerce=lambda x: MatchMode(int(x)),
         help_text="Debug mode",
     )
+    use_cache = forms.BooleanField(
+        initial=True, required=False, help_text="Reuse the stored OCR results of this image and store the new ones"
+    )
+    dedupe = forms.BooleanField(
+        initial=False, required=False, help_text="Reuse the stored OCR results of a near duplicate image, if any"
+    )
+    stream = forms.BooleanField(initial=False, required=False, help_text="Show each result as soon as it is available")
+    background = forms.BooleanField(
+        initial=False, required=False, help_text="Queue the scan and follow its progress in the Scan Jobs page"
+    )
 
     def clean_loaders(self) -> list[type[Loader]]:
         return [import_string(p) for p in self.cleaned_data["loaders"]]
 
 
+class VerifyForm(forms.Form):
+    workers = forms.IntegerField(required=False, min_value=1)
+    timeout = forms.FloatField(required=False, min_value=1, max_value=600)
+    max_errors = forms.IntegerField(required=False, min_value=0, max_value=20)
+    rule = forms.CharField(required=False)
+
+    def __init__(self, data: Any, rules: list[str]) -> None:
+        super().__init__(data)
+        self.rules = rules
+
+    def clean_workers(self) -> int:
+        max_workers = getattr(settings, "HOPE_DOCUMENTS_VERIFY_MAX_WORKERS", DEFAULT_CONCURRENCY)
+        return min(self.cleaned_data["workers"] or 4, max_workers)
+
+    def clean_timeout(self) -> float:
+        return self.cleaned_data["timeout"] or 60.0
+
+    def clean_max_errors(self) -> int:
+        value = self.cleaned_data["max_errors"]
+        return 5 if value is None else value
+
+    def clean_rule(self) -> list[str]:
+        # resolved now, an invalid pk must not fail once the response is streaming
+        try:
+            pks = {int(pk) for pk in self.rules if pk}
+        except ValueError:
+            raise forms.ValidationError("Invalid rule") from None
+        if missing := pks - set(models.DocumentRule.objects.filter(pk__in=pks).values_list("pk", flat=True)):
+            raise forms.ValidationError(f"Unknown rules: {', '.join(map(str, sorted(missing)))}")
+        return self.rules
+
+
 @admin.register(models.Country)
 class CountryAdmin(admin.ModelAdmin[models.Country]):
     list_display = ["name", "code2", "code3", "number"]
@@ -85,15 +154,34 @@ class DocumentRuleAdmin(ExtraButtonsMixin, admin.ModelAdmin[models.DocumentRule]
     autocomplete_fields = ["country", "type"]
 
     @button()  # type: ignore[arg-type]
-    def scan_image(self, request: HttpRequest) -> HttpResponse:
+    def scan_image(self, request: HttpRequest) -> HttpResponseBase:
+        try:
+            if request.method == "POST" and get_admission().busy:
+                raise OCRBusyError("too many OCR calls waiting")
+            return self._scan_image(request)
+        except OCRBusyError as e:
+            self.message_user(request, f"OCR busy, please retry later ({e})", messages.ERROR)
+            ctx = self.get_common_context(request)
+            ctx["form"] = TestImageForm()
+            response = render(request, "hope_documents/test_image.html", ctx, status=503)
+            response["Retry-After"] = "10"
+            return response
+
+    def _scan_image(self, request: HttpRequest) -> HttpResponseBase:  # noqa: C901, PLR0912
         ctx = self.get_common_context(request)
-        extractions: list[ScanEntryInfo]
-        findings: list[SearchInfo]
+        results: list[ScanEntryInfo]
+        entries: Iterable[ScanEntryInfo]
         if request.method == "POST":
             form = TestImageForm(request.POST, request.FILES)
+            if form.is_valid() and form.cleaned_data["background"]:
+                job = submit_job(form.cleaned_data["image"], job_options(form.cleaned_data), owner=request.user)
+                self.message_user(request, f"Scan job #{job.pk} queued")
+                return HttpResponseRedirect(reverse("admin:archive_scanjob_change", args=[job.pk]))
             if form.is_valid():
                 with time_it() as m:
                     image_file = form.cleaned_data["image"]
+                    # decoded once, shared by all the loaders and by the preview
+                    image = load_pages(image_file)
 
                     ts_config = TSConfig(
                         psm=form.cleaned_data["psm"],
@@ -101,34 +189,178 @@ class DocumentRuleAdmin(ExtraButtonsMixin, admin.ModelAdmin[models.DocumentRule]
                         number_only=form.cleaned_data["number_only"],
                     )
                     cv2_config = CV2Config(threshold=form.cleaned_data["threshold"])
-                    p = Processor(ts_config=ts_config, cv2_config=cv2_config, loaders=form.cleaned_data["loaders"])
-                    image = Image.open(image_file)
-                    if form.cleaned_data["target"]:
-                        findings = list(
-                            p.find_text(
-                                image,
-                                form.cleaned_data["target"],
-                                mode=form.cleaned_data["mode"],
-                                max_errors=form.cleaned_data["max_errors"],
-                            )
+                    store = DatabaseResultStore() if form.cleaned_data["use_cache"] else None
+                    p = Processor(
+                        ts_config=ts_config,
+                        cv2_config=cv2_config,
+                        loaders=form.cleaned_data["loaders"],
+                        store=store,
+                        index=DatabaseFingerprintIndex() if store and form.cleaned_data["dedupe"] else None,
+                    )
+                    rule = form.cleaned_data["rule"]
+                    number_regex = rule.number_pattern if rule else None
+                    if rule:
+                        p = p.with_profile(rule.ocr_profile)
+                    ctx["infos"] = {"filename": image_file, "config": p.ts_config}
+                    ctx["image_src"] = get_thumbnail_base64(image, PREVIEW_SIZE)
+                    if search := bool(form.cleaned_data["target"] or number_regex):
+                        ctx["searched_text"] = form.cleaned_data["target"] or f"{rule} number"
+                        entries = p.find_text(
+                            image,
+                            form.cleaned_data["target"],
+                            mode=form.cleaned_data["mode"],
+                            max_errors=form.cleaned_data["max_errors"],
+                            number_regex=number_regex,
                         )
-                        if text_found := any(x.found for x in findings):
-                            self.message_user(request, "Text found")
-                        else:
-                            self.message_user(request, "Text not found", messages.WARNING)
-                        ctx["text_found"] = text_found
-                        ctx["searched_text"] = form.cleaned_data["target"]
-                        ctx["results"] = findings
                     else:
+                        entries = p.process(image)
+                    ctx["form"] = form
+                    if form.cleaned_data["stream"]:
+                        return self.stream_results(request, ctx, entries, store)
+
+                    results = list(entries)
+                    if p.duplicate_of:
+                        self.message_user(request, "Near duplicate of an already scanned image, its results are reused")
+                    text_found = any(x.found for x in results if isinstance(x, SearchInfo))
+                    if not search:
                         self.message_user(request, "Document processed")
-                        extractions = list(p.process(image_file))
-                        ctx["results"] = extractions
+                    elif text_found:
+                        self.message_user(request, "Text found")
+                    else:
+                        self.message_user(request, "Text not found", messages.WARNING)
+                    ctx["text_found"] = text_found
+                    ctx["results"] = results
+                    if store:
+                        store.flush()
+                    if form.cleaned_data["detect"]:
+                        ctx["candidates"] = detect(r.text for r in results if r.text)
 
                 ctx["total_time"] = m
-
-                ctx["infos"] = {"filename": image_file, "config": ts_config}
-                ctx["image_src"] = get_image_base64(image_file)
         else:
             form = TestImageForm()
         ctx["form"] = form
         return render(request, "hope_documents/test_image.html", ctx)
+
+    def stream_results(
+        self,
+        request: HttpRequest,
+        ctx: dict[str, Any],
+        entries: Iterable[ScanEntryInfo],
+        store: DatabaseResultStore | None,
+    ) -> StreamingHttpResponse:
+        """Send the page at once, then each result as soon as `entries` yields it."""
+        marker = "<!-- rows -->"
+        head, tail = render_to_string("hope_documents/test_image.html", {**ctx, "rows_marker": marker}, request).split(
+            marker, 1
+        )
+
+        def chunks() -> Generator[str, None, None]:
+            yield head
+            results = []
+            timer = Timer()
+            try:
+                for result in entries:
+                    results.append(result)
+                    yield render_to_string("hope_documents/scan_result.html", {**ctx, "result": result})
+            except OCRBusyError as e:
+                yield format_html('<tr class="error"><td colspan="6">OCR busy, please retry later ({})</td></tr>', e)
+            finally:
+                timer.stop()
+                if store:
+                    store.flush()
+            summary = {
+                **ctx,
+                "count": len(results),
+                "total_time": timer,
+                "text_found": any(r.found for r in results if isinstance(r, SearchInfo)),
+                "candidates": detect(r.text for r in results if r.text) if ctx["form"].cleaned_data["detect"] else None,
+            }
+            yield render_to_string("hope_documents/scan_summary.html", summary)
+            yield tail
+
+        response = StreamingHttpResponse(chunks(), content_type="text/html; charset=utf-8")
+        # ask the proxies (nginx) not to buffer the response
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @view(permission="archive.view_documentrule")
+    def ocr_metrics(self, request: HttpRequest) -> JsonResponse:
+        return JsonResponse(get_admission().metrics())
+
+    @view(http_basic_auth=True, decorators=[csrf_exempt], permission="archive.view_documentrule")  # type: ignore[arg-type]
+    def verify(self, request: HttpRequest) -> HttpResponseBase:
+        """
+        Verify the uploaded `image` files against the `target` and `rule` values; stream a JSON line each.
+
+        Meant for other systems: accepts HTTP basic auth and is CSRF exempt, it does not change any data.
+        """
+        if request.method != "POST":
+            return JsonResponse({"error": "POST required"}, status=405)
+        form = VerifyForm(request.POST, rules=request.POST.getlist("rule"))
+        if not form.is_valid():
+            return JsonResponse({"error": form.errors}, status=400)
+        entries = uploaded_entries(
+            request.FILES.getlist("image"), request.POST.getlist("target"), form.cleaned_data["rule"]
+        )
+        verdicts = verify_entries(
+            entries,
+            workers=form.cleaned_data["workers"],
+            timeout=form.cleaned_data["timeout"],
+            max_errors=form.cleaned_data["max_errors"],
+        )
+        return StreamingHttpResponse(
+            (json.dumps(v.as_dict()) + "\n" for v in verdicts), content_type="application/x-ndjson"
+        )
+
+
+@admin.register(models.ScanJob)
+class ScanJobAdmin(ExtraButtonsMixin, admin.ModelAdmin[models.ScanJob]):
+    list_display = ["id", "filename", "status", "created", "started", "finished"]
+    list_filter = ["status"]
+    search_fields = ["filename"]
+    exclude = ["image", "results"]
+    readonly_fields = ["filename", "status", "created", "started", "finished", "options", "error", "attempts"]
+    change_form_template = "hope_documents/scan_job.html"
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: models.ScanJob | None = None) -> bool:
+        return False
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[models.ScanJob]:
+        # the results hold the text of the documents: only their owner can see them
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        return qs.filter(owner=request.user.pk)
+
+    @admin.display()
+    def attempts(self, obj: models.ScanJob) -> str:
+        return format_html(
+            "<table><tr><th>Loader</th><th>Angle</th><th>Match</th><th>Distance</th><th>Time</th><th>Error</th></tr>"
+            "{}</table>",
+            format_html_join(
+                "",
+                "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>",
+                (
+                    (r["loader"], r.get("angle", ""), r.get("match", ""), r.get("distance", ""), r["time"], r["error"])
+                    for r in obj.results
+                ),
+            ),
+        )
+
+    @view(permission="archive.view_scanjob")
+    def progress(self, request: HttpRequest, pk: str) -> JsonResponse:
+        job = self.get_object(request, pk)
+        if job is None:
+            return JsonResponse({"error": "Not found"}, status=404)
+        return JsonResponse(
+            {
+                "id": job.pk,
+                "status": job.status,
+                "completed": job.completed,
+                "results": job.results,
+                "error": job.error,
+            }
+        )
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+
+from ..ocr.admission import configure
 
 
 class Config(AppConfig):
     name = "hope_documents.archive"
     verbose_name = "ID Documents"
+
+    def ready(self) -> None:
+        from . import detection  # noqa: F401, PLC0415
+
+        if options := getattr(settings, "HOPE_DOCUMENTS_OCR", None):
+            configure(**options)
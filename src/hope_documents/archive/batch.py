@@ -0,0 +1,57 @@
+from collections.abc import Generator, Iterable, Sequence
+from typing import IO, Any
+
+from django.core.files.uploadedfile import UploadedFile
+
+from ..ocr.batch import Verdict, VerifyItem, verify_batch
+from ..ocr.engine import CV2Config, Processor, TSConfig
+from .models import DocumentRule
+
+
+def get_items(entries: Iterable[dict[str, Any]]) -> Generator[VerifyItem, None, None]:
+    """
+    Build the `VerifyItem` of each entry.
+
+    Each entry holds `image` (path or file), `target` and optionally `key` and `rule` (pk);
+    the OCR profile and the number regex of the rule are applied.
+    """
+    rules: dict[Any, DocumentRule | None] = {}
+    for index, entry in enumerate(entries):
+        rule = None
+        if pk := entry.get("rule"):
+            if pk not in rules:
+                rules[pk] = DocumentRule.objects.filter(pk=pk).first()
+            rule = rules[pk]
+        yield VerifyItem(
+            source=entry["image"],
+            target=entry.get("target") or "",
+            key=str(entry.get("key", index)),
+            profile=rule.ocr_profile if rule else None,
+            number_regex=rule.number_pattern if rule else None,
+        )
+
+
+def verify_entries(
+    entries: Iterable[dict[str, Any]],
+    workers: int = 4,
+    timeout: float = 60.0,
+    max_errors: int = 5,
+) -> Generator[Verdict, None, None]:
+    """Verify each entry (see `get_items`) and yield its verdict, in the same order."""
+    processor = Processor(TSConfig(), CV2Config())
+    yield from verify_batch(processor, get_items(entries), workers=workers, timeout=timeout, max_errors=max_errors)
+
+
+def uploaded_entries(
+    files: Sequence[IO[bytes] | UploadedFile[Any]], targets: list[str], rules: list[str]
+) -> list[dict[str, Any]]:
+    """Pair the uploaded `files` with the `targets` and `rules` sent in the same order."""
+    return [
+        {
+            "image": f,
+            "target": targets[i] if i < len(targets) else "",
+            "rule": rules[i] if i < len(rules) else None,
+            "key": getattr(f, "name", str(i)),
+        }
+        for i, f in enumerate(files)
+    ]
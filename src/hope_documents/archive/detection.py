@@ -0,0 +1,140 @@
+import logging
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import regex
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import DocumentRule
+
+logger = logging.getLogger(__name__)
+
+INLINE_FLAGS = re.compile(r"^\(\?[aiLmsux]+\)")
+SCOPED_FLAGS = (("i", re.IGNORECASE), ("m", re.MULTILINE), ("s", re.DOTALL), ("x", re.VERBOSE))
+
+
+@dataclass(frozen=True)
+class Candidate:
+    rule: DocumentRule
+    hits: int
+    first: str
+
+    @property
+    def country(self) -> Any:
+        return self.rule.country
+
+    @property
+    def type(self) -> Any:
+        return self.rule.type
+
+
+class Detector:
+    """
+    Detect the document type of an OCR text.
+
+    The `match_regex` of all the rules are compiled into one pattern where each rule is
+    a lookahead with a named group (`r<pk>`), so the text is scanned once whatever the number
+    of rules and every rule is tried at each position where any of them matches.
+    The hits of a rule are its non-overlapping matches, as `finditer` of that rule alone would count them.
+    Patterns that match the empty string (eg. the default `.*`) cannot discriminate and are skipped.
+    """
+
+    def __init__(self, rules: Iterable[DocumentRule]) -> None:
+        self.rules: dict[str, DocumentRule] = {}
+        sources = []
+        for rule in rules:
+            if not rule.match_regex:
+                continue
+            group = f"r{rule.pk}"
+            source = self._source(rule.match_regex)
+            try:
+                compiled = regex.compile(source)
+            except regex.error as e:
+                logger.warning(f"Rule #{rule.pk} skipped: {e}")
+                continue
+            if compiled.fullmatch(""):
+                continue
+            self.rules[group] = rule
+            sources.append((group, source))
+        self.pattern = None
+        if sources:
+            # positions where no rule matches are skipped by the first lookahead
+            any_rule = "|".join(source for _, source in sources)
+            lookaheads = "".join(f"(?=(?P<{group}>{source}))?" for group, source in sources)
+            self.pattern = regex.compile(f"(?=(?:{any_rule})){lookaheads}")
+
+    @staticmethod
+    def _source(pattern: "re.Pattern[str]") -> str:
+        # global flags, inline or not, become scoped flags of the rule
+        source = INLINE_FLAGS.sub("", pattern.pattern)
+        flags = "".join(f for f, v in SCOPED_FLAGS if pattern.flags & v)
+        if flags:
+            return f"(?{flags}:{source})"
+        return f"(?:{source})"
+
+    def detect(self, text: str) -> list[Candidate]:
+        """Return the rules matching `text`, most hits first."""
+        if not self.pattern:
+            return []
+        hits: Counter[str] = Counter()
+        first: dict[str, str] = {}
+        # end of the last counted match of each rule
+        ends: dict[str, int] = {}
+        for m in self.pattern.finditer(text):
+            for group in self.rules:
+                start, end = m.span(group)
+                if end > start >= ends.get(group, 0):
+                    hits[group] += 1
+                    ends[group] = end
+                    first.setdefault(group, text[start:end])
+        return [Candidate(rule=self.rules[g], hits=n, first=first[g]) for g, n in hits.most_common()]
+
+
+_detector: Detector | None = None
+_detector_key: tuple[Any, ...] | None = None
+
+
+def rules_version() -> tuple[Any, ...]:
+    """Change whenever a rule is added, changed or deleted, by this process or any other."""
+    info = DocumentRule.objects.aggregate(count=Count("pk"), updated=Max("updated"))
+    return info["count"], info["updated"]
+
+
+def get_detector() -> Detector:
+    """
+    Return the process wide `Detector`, built on first use and rebuilt when the rules change.
+
+    The rules version is read from the database, so that the changes made by the other
+    processes (web and worker) are seen too.
+    """
+    global _detector, _detector_key  # noqa: PLW0603
+    key = rules_version()
+    if _detector is None or key != _detector_key:
+        _detector = Detector(DocumentRule.objects.select_related("country", "type").order_by("pk"))
+        _detector_key = key
+    return _detector
+
+
+@receiver(post_save, sender=DocumentRule)
+@receiver(post_delete, sender=DocumentRule)
+def reset_detector(**kwargs: Any) -> None:
+    global _detector  # noqa: PLW0603
+    _detector = None
+
+
+def detect(texts: Iterable[str]) -> list[Candidate]:
+    """Return the candidates found in all `texts`, ranked by the total number of hits."""
+    detector = get_detector()
+    total: Counter[str] = Counter()
+    first: dict[str, str] = {}
+    for text in texts:
+        for c in detector.detect(text):
+            group = f"r{c.rule.pk}"
+            total[group] += c.hits
+            first.setdefault(group, c.first)
+    return [Candidate(rule=detector.rules[g], hits=n, first=first[g]) for g, n in total.most_common()]
@@ -0,0 +1,137 @@
+import logging
+import time
+from datetime import timedelta
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
+
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..exceptions import DocumentError
+from ..ocr.engine import CV2Config, MatchMode, Processor, ScanEntryInfo, TSConfig
+from ..ocr.store import ResultStore
+from ..utils.language import fqn
+from .models import DocumentRule, ScanJob
+from .store import DatabaseFingerprintIndex, DatabaseResultStore
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+# seconds after which a running job is considered abandoned by its worker
+STALE_TIMEOUT = 3600
+
+
+def job_options(cleaned_data: dict[str, Any]) -> dict[str, Any]:
+    """Return the JSON serializable version of the `TestImageForm` cleaned data."""
+    return {
+        "psm": cleaned_data["psm"],
+        "oem": cleaned_data["oem"],
+        "number_only": cleaned_data["number_only"],
+        "threshold": cleaned_data["threshold"],
+        "loaders": [fqn(loader) for loader in cleaned_data["loaders"]],
+        "target": cleaned_data["target"],
+        "max_errors": cleaned_data["max_errors"],
+        "mode": cleaned_data["mode"].value,
+        "use_cache": cleaned_data.get("use_cache", False),
+        "dedupe": cleaned_data.get("dedupe", False),
+        "rule": cleaned_data["rule"].pk if cleaned_data.get("rule") else None,
+    }
+
+
+def get_processor(options: dict[str, Any], store: ResultStore | None = None) -> Processor:
+    ts_config = TSConfig(psm=options["psm"], oem=options["oem"], number_only=options["number_only"])
+    cv2_config = CV2Config(threshold=options["threshold"])
+    return Processor(
+        ts_config=ts_config,
+        cv2_config=cv2_config,
+        loaders=[import_string(p) for p in options["loaders"]],
+        store=store,
+        index=DatabaseFingerprintIndex() if store and options.get("dedupe") else None,
+    )
+
+
+def submit_job(image_file: UploadedFile[Any], options: dict[str, Any], owner: Any = None) -> ScanJob:
+    image_file.seek(0)
+    return ScanJob.objects.create(filename=str(image_file.name), image=image_file.read(), options=options, owner=owner)
+
+
+def requeue_stale_jobs(timeout: float = STALE_TIMEOUT) -> int:
+    """Queue again the jobs running for more than `timeout` seconds, their worker is gone."""
+    stale = timezone.now() - timedelta(seconds=timeout)
+    return ScanJob.objects.filter(status=ScanJob.Status.RUNNING, started__lt=stale).update(
+        status=ScanJob.Status.QUEUED, started=None, results=[]
+    )
+
+
+def claim_job(timeout: float = STALE_TIMEOUT) -> ScanJob | None:
+    """
+    Mark the oldest queued job as running and return it, None if the queue is empty.
+
+    The jobs left running for more than `timeout` seconds are queued again first.
+    """
+    requeue_stale_jobs(timeout)
+    candidates = ScanJob.objects.filter(status=ScanJob.Status.QUEUED).order_by("created").values_list("pk", flat=True)
+    for pk in candidates[:10]:
+        # conditional update: only one worker can win the job
+        if ScanJob.objects.filter(pk=pk, status=ScanJob.Status.QUEUED).update(
+            status=ScanJob.Status.RUNNING, started=timezone.now()
+        ):
+            return ScanJob.objects.get(pk=pk)
+    return None
+
+
+def process_job(job: ScanJob) -> None:
+    """Run the scan and save the result of each attempt as soon as it is available."""
+    options = job.options
+    store = DatabaseResultStore() if options.get("use_cache") else None
+    try:
+        processor = get_processor(options, store)
+        image = processor.load(BytesIO(job.image))
+        rule = DocumentRule.objects.filter(pk=options.get("rule")).first()
+        number_regex = rule.number_pattern if rule else None
+        if rule:
+            processor = processor.with_profile(rule.ocr_profile)
+        entries: Iterable[ScanEntryInfo]
+        if options["target"] or number_regex:
+            entries = processor.find_text(
+                image,
+                options["target"],
+                mode=MatchMode(options["mode"]),
+                max_errors=options["max_errors"],
+                number_regex=number_regex,
+            )
+        else:
+            entries = processor.process(image)
+        for entry in entries:
+            job.results.append(entry.as_dict())
+            job.save(update_fields=["results"])
+        job.status = ScanJob.Status.DONE
+    except DocumentError as e:
+        # not an Exception subclass, the image cannot be processed
+        job.status = ScanJob.Status.FAILED
+        job.error = f"{e.__class__.__name__}: {e}"
+    except Exception as e:  # noqa: BLE001
+        # whatever the error (database, decoder...), the job must not stay RUNNING
+        logger.exception(e)
+        job.status = ScanJob.Status.FAILED
+        job.error = f"{e.__class__.__name__}: {e}"
+    if store:
+        store.flush()
+    job.finished = timezone.now()
+    job.save(update_fields=["status", "error", "finished"])
+
+
+def run_worker(once: bool = False, sleep: float = 1.0) -> int:
+    """Process queued jobs, forever unless `once`. Return the number of processed jobs."""
+    processed = 0
+    while True:
+        if job := claim_job():
+            process_job(job)
+            processed += 1
+        elif once:
+            return processed
+        else:
+            time.sleep(sleep)
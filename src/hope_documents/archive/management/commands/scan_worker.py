@@ -0,0 +1,17 @@
+from typing import Any
+
+from django.core.management import BaseCommand, CommandParser
+
+from ...jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Process the queued scan jobs"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        processed = run_worker(once=options["once"], sleep=options["sleep"])
+        self.stdout.write(f"{processed} jobs processed")
@@ -0,0 +1,35 @@
+import argparse
+import json
+from collections.abc import Generator
+from typing import IO, Any
+
+from django.core.management import BaseCommand, CommandParser
+
+from ...batch import verify_entries
+
+
+def read_entries(stream: IO[str]) -> Generator[dict[str, Any], None, None]:
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = "Verify a batch of images. Read JSON lines with image, target, rule and key; write a JSON line verdict each"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "input", nargs="?", type=argparse.FileType("r"), default="-", help="JSON lines file, '-' for stdin"
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Number of concurrent verifications")
+        parser.add_argument("--timeout", type=float, default=60.0, help="Seconds allowed for each item")
+        parser.add_argument("--max-errors", type=int, default=5, help="Maximum number of errors allowed for a match")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for verdict in verify_entries(
+            read_entries(options["input"]),
+            workers=options["workers"],
+            timeout=options["timeout"],
+            max_errors=options["max_errors"],
+        ):
+            self.stdout.write(json.dumps(verdict.as_dict()))
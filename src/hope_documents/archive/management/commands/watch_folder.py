@@ -0,0 +1,48 @@
+import json
+from typing import Any
+
+from django.core.management import BaseCommand, CommandError, CommandParser
+
+from ....ocr.engine import CV2Config, Processor, TSConfig
+from ....ocr.scanner import Scanner
+from ....ocr.watch import Watcher, move_aside, watch_files
+from ...models import DocumentRule
+from ...store import DatabaseResultStore
+
+
+class Command(BaseCommand):
+    help = "Watch directories, extract the text of the new images into ScanResult and write a JSON line per file"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("directories", nargs="+", help="Directories to watch")
+        parser.add_argument("--rule", type=int, default=None, help="DocumentRule (pk) of the OCR profile")
+        parser.add_argument("--move-to", default=None, help="Move the processed files to this directory")
+        parser.add_argument("--errors-to", default=None, help="Move the files that failed to this directory")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between two scans")
+        parser.add_argument("--settle", type=float, default=1.0, help="Seconds a file must stay unchanged")
+        parser.add_argument("--workers", type=int, default=4, help="Number of concurrent extractions")
+        parser.add_argument("--once", action="store_true", help="Process the files present and exit")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rule = None
+        processor = Processor(TSConfig(), CV2Config())
+        if options["rule"]:
+            if not (rule := DocumentRule.objects.filter(pk=options["rule"]).first()):
+                raise CommandError(f"DocumentRule #{options['rule']} not found")
+            processor = processor.with_profile(rule.ocr_profile)
+        # the results are stored by this thread, the workers only run the OCR
+        store = DatabaseResultStore(rule=rule)
+        watcher = Watcher(Scanner(*options["directories"]), interval=options["interval"], settle=options["settle"])
+        try:
+            for result in watch_files(processor, watcher, workers=options["workers"], once=options["once"]):
+                for entry in result.entries:
+                    if (digest := result.digests.get(entry.page)) and not entry.error:
+                        store.add(digest, processor.config_key, 0, entry)
+                    self.stdout.write(json.dumps({"file": result.path, **entry.as_dict()}))
+                store.flush()
+                if target := (options["errors_to"] or options["move_to"]) if result.failed else options["move_to"]:
+                    move_aside(result.path, target)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("archive", "0002_scanjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScanResult",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("image_hash", models.CharField(db_index=True, max_length=64)),
+                ("config", models.CharField(max_length=255)),
+                ("loader", models.CharField(max_length=100)),
+                ("angle", models.IntegerField(default=0)),
+                ("text", models.TextField(blank=True)),
+                ("match", models.CharField(blank=True, db_index=True, max_length=255)),
+                ("distance", models.FloatField(blank=True, null=True)),
+                ("time", models.CharField(blank=True, max_length=20)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "country",
+                    models.ForeignKey(
+                        blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="archive.country"
+                    ),
+                ),
+                (
+                    "rule",
+                    models.ForeignKey(
+                        blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="archive.documentrule"
+                    ),
+                ),
+                (
+                    "type",
+                    models.ForeignKey(
+                        blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="archive.documenttype"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Scan Results",
+                "ordering": ("-created",),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("image_hash", "config", "loader", "angle"), name="unique_scan_result"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("archive", "0003_scanresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentrule",
+            name="ocr_lang",
+            field=models.CharField(
+                default="eng",
+                help_text="Tesseract language(s), eg. 'eng' or 'ara+eng'",
+                max_length=100,
+                validators=[django.core.validators.RegexValidator("^[a-z_]+(\\+[a-z_]+)*$")],
+            ),
+        ),
+        migrations.AddField(
+            model_name="documentrule",
+            name="ocr_loaders",
+            field=models.JSONField(blank=True, default=list, help_text="Loader names to use, all if empty"),
+        ),
+        migrations.AddField(
+            model_name="documentrule",
+            name="ocr_psm",
+            field=models.IntegerField(blank=True, help_text="Page segmentation mode, default if empty", null=True),
+        ),
+        migrations.AddField(
+            model_name="documentrule",
+            name="ocr_rotations",
+            field=models.JSONField(blank=True, default=list, help_text="Angles to try, default if empty"),
+        ),
+        migrations.AddField(
+            model_name="documentrule",
+            name="ocr_whitelist",
+            field=models.CharField(
+                blank=True,
+                help_text="Only recognize these characters, eg. '0123456789'",
+                max_length=255,
+                validators=[django.core.validators.RegexValidator("^\\S*$")],
+            ),
+        ),
+    ]
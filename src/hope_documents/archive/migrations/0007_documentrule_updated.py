@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("archive", "0006_scanjob_owner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentrule",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,8 +1,17 @@
+from typing import TYPE_CHECKING
+
+from django.conf import settings
 from django.core.validators import RegexValidator
 from django.db import models
 from django.utils.translation import gettext as _
 from django_regex.fields import RegexField
 
+from ..ocr.diff import number_pattern
+from ..ocr.engine import OCRProfile
+
+if TYPE_CHECKING:
+    import re
+
 
 class Country(models.Model):
     name = models.CharField(max_length=255)
@@ -36,9 +45,109 @@ class DocumentRule(models.Model):
     match_regex = RegexField(default=".*")
     number_regex = RegexField(default=".*")
 
+    ocr_lang = models.CharField(
+        max_length=100,
+        default="eng",
+        validators=[RegexValidator(r"^[a-z_]+(\+[a-z_]+)*$")],
+        help_text=_("Tesseract language(s), eg. 'eng' or 'ara+eng'"),
+    )
+    ocr_psm = models.IntegerField(null=True, blank=True, help_text=_("Page segmentation mode, default if empty"))
+    ocr_whitelist = models.CharField(
+        max_length=255,
+        blank=True,
+        validators=[RegexValidator(r"^\S*$")],
+        help_text=_("Only recognize these characters, eg. '0123456789'"),
+    )
+    ocr_loaders = models.JSONField(default=list, blank=True, help_text=_("Loader names to use, all if empty"))
+    ocr_rotations = models.JSONField(default=list, blank=True, help_text=_("Angles to try, default if empty"))
+    updated = models.DateTimeField(auto_now=True)
+
     class Meta:
         verbose_name_plural = _("Document Rules")
         ordering = ("country__name", "type__name")
 
     def __str__(self) -> str:
         return f"{self.type.name} {self.country.name}"
+
+    @property
+    def number_pattern(self) -> "re.Pattern[str] | None":
+        """The `number_regex`, None if it cannot extract a number (eg. the `.*` default)."""
+        return number_pattern(self.number_regex)
+
+    @property
+    def ocr_profile(self) -> OCRProfile:
+        return OCRProfile(
+            lang=self.ocr_lang,
+            psm=self.ocr_psm,
+            whitelist=self.ocr_whitelist,
+            loaders=self.ocr_loaders,
+            rotations=self.ocr_rotations,
+        )
+
+
+class ScanJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", _("Queued")
+        RUNNING = "RUNNING", _("Running")
+        DONE = "DONE", _("Done")
+        FAILED = "FAILED", _("Failed")
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED, db_index=True)
+    filename = models.CharField(max_length=255)
+    image = models.BinaryField()
+    options = models.JSONField(default=dict)
+    results = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name_plural = _("Scan Jobs")
+        ordering = ("-created",)
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.filename}"
+
+    @property
+    def completed(self) -> bool:
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+
+class ScanResult(models.Model):
+    image_hash = models.CharField(max_length=64, db_index=True)
+    config = models.CharField(max_length=255)
+    loader = models.CharField(max_length=100)
+    angle = models.IntegerField(default=0)
+    rule = models.ForeignKey(DocumentRule, on_delete=models.SET_NULL, null=True, blank=True)
+    country = models.ForeignKey(Country, on_delete=models.SET_NULL, null=True, blank=True)
+    type = models.ForeignKey(DocumentType, on_delete=models.SET_NULL, null=True, blank=True)
+    text = models.TextField(blank=True)
+    match = models.CharField(max_length=255, blank=True, db_index=True)
+    distance = models.FloatField(null=True, blank=True)
+    time = models.CharField(max_length=20, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = _("Scan Results")
+        ordering = ("-created",)
+        constraints = [
+            models.UniqueConstraint(fields=["image_hash", "config", "loader", "angle"], name="unique_scan_result"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.image_hash[:12]} {self.loader} {self.angle}"
+
+
+class ImageFingerprint(models.Model):
+    image_hash = models.CharField(max_length=64, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = _("Image Fingerprints")
+        ordering = ("-created",)
+
+    def __str__(self) -> str:
+        return self.image_hash[:12]
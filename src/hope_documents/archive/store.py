@@ -0,0 +1,111 @@
+import threading
+from typing import TYPE_CHECKING
+
+from django.db.models import Count, Max
+
+from ..ocr.store import FingerprintIndex, MemoryFingerprintIndex, ResultStore
+from .models import DocumentRule, ImageFingerprint, ScanResult
+
+if TYPE_CHECKING:
+    from ..ocr.engine import ScanEntryInfo
+
+
+class DatabaseResultStore(ResultStore):
+    """
+    Persist the OCR results in `ScanResult`.
+
+    New results are buffered and written with `bulk_create` every `batch_size` entries
+    and on `flush()`; the stored results of an image are fetched with one query.
+    """
+
+    def __init__(self, rule: DocumentRule | None = None, batch_size: int = 500) -> None:
+        self.rule = rule
+        self.batch_size = batch_size
+        self.pending: list[ScanResult] = []
+        self._digest = ""
+        self._results: dict[tuple[str, str, int], str] = {}
+
+    def get(self, digest: str, config: str, loader: str, angle: int) -> str | None:
+        if digest != self._digest:
+            self._digest = digest
+            self._results = {
+                (c, lo, a): t
+                for c, lo, a, t in ScanResult.objects.filter(image_hash=digest).values_list(
+                    "config", "loader", "angle", "text"
+                )
+            }
+        return self._results.get((config, loader, angle))
+
+    def add(self, digest: str, config: str, angle: int, info: "ScanEntryInfo") -> None:
+        match = getattr(info, "match", None)
+        self.pending.append(
+            ScanResult(
+                image_hash=digest,
+                config=config,
+                loader=info.loader,
+                angle=angle,
+                rule=self.rule,
+                country_id=self.rule.country_id if self.rule else None,
+                type_id=self.rule.type_id if self.rule else None,
+                text=info.text,
+                match=match.text[:255] if match else "",
+                distance=match.distance if match else None,
+                time=info.time,
+            )
+        )
+        if digest == self._digest:
+            self._results[(config, info.loader, angle)] = info.text
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            ScanResult.objects.bulk_create(self.pending, batch_size=self.batch_size, ignore_conflicts=True)
+            self.pending = []
+
+
+_fingerprints = MemoryFingerprintIndex()
+# number of rows and last pk loaded in `_fingerprints`
+_fingerprints_key: tuple[int, int] = (0, 0)
+_fingerprints_lock = threading.Lock()
+
+
+def refresh_fingerprints() -> MemoryFingerprintIndex:
+    """
+    Return the process wide copy of `ImageFingerprint`, kept in memory across requests and jobs.
+
+    Only the rows added since the previous call, by this process or any other, are loaded;
+    the whole table is reloaded if rows were deleted. Call it with `_fingerprints_lock` held.
+    """
+    global _fingerprints, _fingerprints_key  # noqa: PLW0603
+    info = ImageFingerprint.objects.aggregate(count=Count("pk"), last=Max("pk"))
+    key = (info["count"], info["last"] or 0)
+    if key == _fingerprints_key:
+        return _fingerprints
+    count, last = _fingerprints_key
+    rows = list(ImageFingerprint.objects.filter(pk__gt=last).order_by("pk").values_list("fingerprint", "image_hash"))
+    if count + len(rows) != key[0]:
+        _fingerprints = MemoryFingerprintIndex()
+        rows = list(ImageFingerprint.objects.order_by("pk").values_list("fingerprint", "image_hash"))
+    for fp, digest in rows:
+        _fingerprints.add(fp, digest)
+    _fingerprints_key = key
+    return _fingerprints
+
+
+class DatabaseFingerprintIndex(FingerprintIndex):
+    """
+    Persist the fingerprints in `ImageFingerprint`.
+
+    The lookups search the process wide copy of the table, see `refresh_fingerprints`.
+    """
+
+    def lookup(self, fingerprint: str, max_distance: int) -> str | None:
+        with _fingerprints_lock:
+            return refresh_fingerprints().lookup(fingerprint, max_distance)
+
+    def add(self, fingerprint: str, digest: str) -> None:
+        # loaded by the next lookup
+        ImageFingerprint.objects.bulk_create(
+            [ImageFingerprint(image_hash=digest, fingerprint=fingerprint)], ignore_conflicts=True
+        )
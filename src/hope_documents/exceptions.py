@@ -8,3 +8,7 @@ class InvalidImageError(DocumentError):
 
 class ExtractionError(DocumentError):
     pass
+
+
+class OCRBusyError(DocumentError):
+    pass
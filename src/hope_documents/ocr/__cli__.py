@@ -1,9 +1,13 @@
 import csv
+import json
 import logging
 import os
-from collections.abc import Iterable
+import re
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 import click
 from PIL.ExifTags import TAGS
@@ -12,9 +16,31 @@ from humanize import naturalsize
 from jinja2 import Template
 
 from hope_documents.exceptions import InvalidImageError
-from hope_documents.ocr.engine import CV2Config, MatchMode, Processor, ScanEntryInfo, Scanner, SearchInfo, TSConfig
-from hope_documents.utils.image import get_image, get_image_base64
-from hope_documents.utils.language import parse_bool
+from hope_documents.ocr.admission import configure
+from hope_documents.ocr.checkpoint import Checkpoint
+from hope_documents.ocr.diff import number_pattern
+from hope_documents.ocr.engine import (
+    CV2Config,
+    JsonLinesSink,
+    MatchMode,
+    OCRProfile,
+    Processor,
+    ScanEntryInfo,
+    SearchInfo,
+    TSConfig,
+    TraceLevel,
+    Tracer,
+)
+from hope_documents.ocr.loaders import Loader, loader_registry
+from hope_documents.ocr.manifest import Manifest, dump_row, load_row
+from hope_documents.ocr.pruning import LoaderStats
+from hope_documents.ocr.scanner import Scanner, parse_shard
+from hope_documents.ocr.store import MemoryFingerprintIndex, MemoryResultStore
+from hope_documents.ocr.tune import DEFAULT_GRID, TuneCache, Tuner, best_config
+from hope_documents.ocr.watch import Watcher, move_aside, watch_files
+from hope_documents.utils.bundle import path_stat
+from hope_documents.utils.image import as_buffer, get_image, get_image_base64, get_thumbnail_base64
+from hope_documents.utils.language import Peekable, parse_bool
 from hope_documents.utils.logging import LevelFormatter
 from hope_documents.utils.timeit import time_it
 
@@ -35,12 +61,85 @@ def configure_logging(debug: bool, loggers: Iterable[str] = ("hope_documents",))
             logr.addHandler(ch)
 
 
+OUTPUT_FORMATS = ["text", "jsonl"]
+REPORT_FORMATS = ["html", "jsonl"]
+
+
 def write_report(output_filename: str, template_name: str, context: dict[str, Any]) -> None:
     report = Path(".") / output_filename
     click.echo(f"Writing report to {report}")
     template = Template((Path(__file__).parent / template_name).read_text(encoding="utf-8"))
     with Path(report).open("w", encoding="utf-8") as f:
-        f.write(template.render(context))
+        # rows are rendered and written as soon as they are produced
+        f.writelines(template.generate(context))
+
+
+def search_status(si: SearchInfo | None) -> str:
+    if si and si.match and si.match.distance == 0:
+        return "success"
+    if si and si.match and si.match.distance > 0:
+        return "warning"
+    return "error"
+
+
+def report_record(line: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "file": line["filename"],
+        "search_text": line["search_text"],
+        "status": line["status"],
+        "size": line["info"],
+        **(line["si"].as_dict() if line["si"] else {}),
+    }
+
+
+def report_page_name(basename: str, page: int) -> str:
+    return f"{basename}.html" if page == 1 else f"{basename}.{page}.html"
+
+
+def open_checkpoint(path: str | None, resume: bool) -> Checkpoint | None:
+    if resume and not path:
+        click.get_current_context().fail("--resume requires --checkpoint")
+    return Checkpoint(Path(path), resume=resume) if path else None
+
+
+def validate_shard(ctx: click.Context, param: click.Parameter, value: str | None) -> tuple[int, int] | None:
+    try:
+        return parse_shard(value) if value else None
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+
+
+def scan_options(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Options selecting the files to process, see `Scanner`."""
+    options = [
+        click.option("--ext", "extensions", multiple=True, help="Only process files with this extension"),
+        click.option("--include", multiple=True, help="Only process files matching this glob"),
+        click.option("--exclude", multiple=True, help="Skip files matching this glob"),
+        click.option("--mime", "mime_types", multiple=True, help="Only process images of this type (magic bytes)"),
+        click.option("--images-only", is_flag=True, help="Skip the files that are not images (magic bytes)"),
+        click.option("--hidden", is_flag=True, help="Include files and directories starting with a dot"),
+        click.option("--shard", callback=validate_shard, default=None, help="Only process the shard i/n (0 <= i < n)"),
+        click.option("--scan-workers", default=1, help="Threads walking the directories"),
+        click.option("--archives", is_flag=True, help="Process the members of the tar and zip archives in place"),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_scanner(filepaths: Iterable[Any], options: dict[str, Any]) -> Scanner:
+    return Scanner(
+        *filepaths,
+        extensions=options["extensions"],
+        include=options["include"],
+        exclude=options["exclude"],
+        mime_types=options["mime_types"],
+        images_only=options["images_only"],
+        hidden=options["hidden"],
+        shard=options["shard"],
+        workers=options["scan_workers"],
+        archives=options["archives"],
+    )
 
 
 def load_expectations(filename: str) -> dict[str, tuple[str, bool, float]]:
@@ -53,9 +152,87 @@ def load_expectations(filename: str) -> dict[str, tuple[str, bool, float]]:
     return expected_values
 
 
+def load_loader_config(filename: str | None) -> dict[str, dict[str, Any]] | None:
+    """Load the loader parameters written by `doc tune`."""
+    if not filename:
+        return None
+    try:
+        config = json.loads(Path(filename).read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise click.BadParameter(f"{filename}: {e}", param_hint="'--loader-config'") from None
+    if not isinstance(config, dict) or not all(isinstance(v, dict) for v in config.values()):
+        raise click.BadParameter(f"{filename}: expected an object of loader parameters", param_hint="'--loader-config'")
+    return config
+
+
+def validate_loaders(ctx: click.Context, param: click.Parameter, value: tuple[str, ...]) -> list[type[Loader]]:
+    by_name = {loader.__name__: loader for loader in loader_registry}
+    if unknown := [name for name in value if name not in by_name]:
+        raise click.BadParameter(f"Unknown loaders: {', '.join(unknown)}")
+    return [by_name[name] for name in value]
+
+
+def expected_samples(filepaths: Iterable[Any], expectations: str, options: dict[str, Any]) -> list[tuple[str, str]]:
+    """Return the files to scan expected to be found, with their expected text."""
+    expected_values = load_expectations(expectations)
+    samples = []
+    for filename in get_scanner(filepaths, options).files:
+        file_label = str(Path(filename).absolute().relative_to(os.getcwd()))
+        if (entry := expected_values.get(file_label)) and entry[1] and entry[0]:
+            samples.append((filename, entry[0]))
+    if not samples:
+        click.get_current_context().fail("No file with an expected text")
+    return samples
+
+
+def echo_entry(info: ScanEntryInfo) -> None:
+    click.echo(f"{Fore.YELLOW}Loader: {Fore.LIGHTWHITE_EX}{info.loader}{Fore.RESET}")
+    if err := info.error:
+        click.echo(f"{Fore.RED}{err}{Fore.RESET}")
+    click.echo(f"{Fore.GREEN}{info.text}{Fore.RESET}")
+    click.echo(f"{Fore.LIGHTWHITE_EX}========{Fore.RESET}")
+
+
+def echo_search(info: SearchInfo) -> None:
+    click.echo(f"{Fore.YELLOW}Loader: {Fore.LIGHTWHITE_EX}{info.loader}{Fore.RESET}")
+    if err := info.error:
+        click.echo(f"{Fore.RED}{err}{Fore.RESET}")
+    click.echo(f"Match: {Fore.GREEN}{info.match.text if info.match else 'N/A'}{Fore.RESET}")
+    click.echo(f"Distance: {Fore.GREEN}{info.match.distance if info.match else 'N/A'}{Fore.RESET}")
+    click.echo(f"{Fore.LIGHTWHITE_EX}========{Fore.RESET}")
+
+
 @click.group(name="doc")
-def cli() -> None:
-    pass
+@click.option("--ocr-concurrency", type=int, default=None, help="Max concurrent OCR processes [default: cores]")
+@click.option("--ocr-threads", type=int, default=None, help="OpenMP threads of each OCR process")
+def cli(ocr_concurrency: int | None, ocr_threads: int | None) -> None:
+    configure(max_concurrent=ocr_concurrency, threads=ocr_threads)
+
+
+def search_file(  # noqa: PLR0913
+    p: Processor,
+    file: str,
+    pattern: str,
+    rotate: int,
+    number_regex: "re.Pattern[str] | None",
+    cb: Callable[[SearchInfo], None],
+) -> int:
+    """Search `pattern` in `file`, `cb` receives the matches or, if none, the last attempt."""
+    missing = SearchInfo(loader="")
+    try:
+        image = get_image(file)
+    except InvalidImageError as e:
+        missing.error = f"{e.__class__.__name__}: {str(e)}"
+        cb(missing)
+        return 1
+    found = False
+    for findings in p.find_text(image, pattern, rotations=[rotate], number_regex=number_regex):
+        found = True
+        cb(findings)
+    if not found:
+        # one record for each file, the last attempt carries its error and elapsed time
+        cb(p.debug_info.last or missing)
+    return 0
 
 
 @cli.command()
@@ -67,41 +244,63 @@ def cli() -> None:
 @click.option("-n", "--number-only", default=False, is_flag=True, help="Only extract numbers")
 @click.option("-r", "--rotate", default=0, help="Rotate image")
 @click.option("-s", "--pattern", default="", help="Pattern to search")
+@click.option("--number-regex", default="", help="Regex extracting the document number, compared to the pattern first")
+@click.option(
+    "-f", "--format", "output_format", default="text", type=click.Choice(OUTPUT_FORMATS), help="Output format"
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False, allow_dash=True), default="-", help="Output file (appended on --resume)"
+)
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None, help="Log the completed files here")
+@click.option("--resume", is_flag=True, help="Skip the files completed in --checkpoint")
+@scan_options
 @click.option("--debug", is_flag=True, help="Debug mode")
-def extract(filepaths: list[click.Path], debug: bool, **kwargs: Any) -> None:
+def extract(  # noqa: C901, PLR0913
+    filepaths: list[click.Path],
+    output_format: str,
+    output: str,
+    checkpoint: str | None,
+    resume: bool,
+    debug: bool,
+    **kwargs: Any,
+) -> None:
     configure_logging(debug)
     ret_code = 0
-
-    def cb(info: ScanEntryInfo) -> None:
-        click.echo(f"{Fore.YELLOW}Loader: {Fore.LIGHTWHITE_EX}{info.loader}{Fore.RESET}")
-        if err := info.error:
-            click.echo(f"{Fore.RED}{err}{Fore.RESET}")
-        click.echo(f"{Fore.GREEN}{info.text}{Fore.RESET}")
-        click.echo(f"{Fore.LIGHTWHITE_EX}========{Fore.RESET}")
-
-    def cb1(info: SearchInfo) -> None:
-        click.echo(f"{Fore.YELLOW}Loader: {Fore.LIGHTWHITE_EX}{info.loader}{Fore.RESET}")
-        if err := info.error:
-            click.echo(f"{Fore.RED}{err}{Fore.RESET}")
-        click.echo(f"Match: {Fore.GREEN}{info.match.text if info.match else 'N/A'}{Fore.RESET}")
-        click.echo(f"Distance: {Fore.GREEN}{info.match.distance if info.match else 'N/A'}{Fore.RESET}")
-        click.echo(f"{Fore.LIGHTWHITE_EX}========{Fore.RESET}")
+    done = open_checkpoint(checkpoint, resume)
+    # the records of the files completed before the resume are kept
+    stream = click.open_file(output, "a" if resume else "w", encoding="utf-8")
+    jsonl = output_format == "jsonl"
+    number_regex = number_pattern(re.compile(kwargs["number_regex"])) if kwargs["number_regex"] else None
 
     ts_config = TSConfig(oem=kwargs["oem"], psm=kwargs["psm"], number_only=kwargs["number_only"])
     p = Processor(ts_config=ts_config, cv2_config=CV2Config(threshold=kwargs["threshold"]))
-    click.echo(f"{Fore.YELLOW}Config: {Fore.LIGHTWHITE_EX}{ts_config}{Fore.RESET}")
-    scanner = Scanner(*filepaths)
+    if not jsonl:
+        click.echo(f"{Fore.YELLOW}Config: {Fore.LIGHTWHITE_EX}{ts_config}{Fore.RESET}")
+    scanner = get_scanner(filepaths, kwargs)
     for file in scanner.files:
-        click.echo(f"{Fore.YELLOW}File: {Fore.LIGHTWHITE_EX}{file}{Fore.RESET}")
-        if kwargs["pattern"]:
-            image = get_image(file)
-            for findings in p.find_text(image, kwargs["pattern"], rotations=[kwargs["rotate"]]):
-                cb1(findings)
+        if done and file in done:
+            ret_code |= done.done[file]["ret_code"]
+            continue
+        file_code = 0
+        cb: Callable[[ScanEntryInfo], None] = echo_entry
+        cb1: Callable[[SearchInfo], None] = echo_search
+        if jsonl:
+            cb = cb1 = JsonLinesSink(stream, file=file)
+        else:
+            click.echo(f"{Fore.YELLOW}File: {Fore.LIGHTWHITE_EX}{file}{Fore.RESET}")
+        if kwargs["pattern"] or number_regex:
+            file_code = search_file(p, file, kwargs["pattern"], kwargs["rotate"], number_regex, cb1)
         else:
             for extracted in p.process(file, rotate=kwargs["rotate"]):
                 cb(extracted)
                 if extracted.error != "":
-                    ret_code = 1
+                    file_code = 1
+        ret_code |= file_code
+        if done:
+            done.add(file, {"ret_code": file_code})
+    if done:
+        done.close()
+    stream.close()
     click.get_current_context().exit(ret_code)
 
 
@@ -109,68 +308,184 @@ def extract(filepaths: list[click.Path], debug: bool, **kwargs: Any) -> None:
 @click.argument("filepaths", nargs=-1, type=click.Path(exists=True), required=True)
 @click.option("-e", "--expectations", type=click.File("r"), required=True)
 @click.option("-m", "--mode", "mode", default=MatchMode.FIRST.name, type=click.Choice(MatchMode), help="Match mode")
+@click.option("--trace", "trace", default=TraceLevel.SUMMARY.name, type=click.Choice(TraceLevel), help="Trace level")
+@click.option("--trace-text", default=2048, help="Max number of OCR chars kept for each traced attempt")
+@click.option("--trace-file", type=click.File("w"), default=None, help="Stream every attempt to this file (JSONL)")
+@click.option("--page-size", default=0, help="Split the report in pages of this many rows (0: single page)")
+@click.option("--thumbnail-size", default=320, help="Max width/height of the embedded thumbnails")
+@click.option(
+    "--thumbnail-format", default="JPEG", type=click.Choice(["JPEG", "WEBP", "PNG"]), help="Thumbnails format"
+)
+@click.option(
+    "-f", "--format", "output_format", default="html", type=click.Choice(REPORT_FORMATS), help="Output format"
+)
+@click.option("--output", type=click.File("w"), default="-", help="Output file (jsonl format only)")
+@click.option("--dedupe", is_flag=True, help="Reuse the OCR results of near duplicate images")
+@click.option("--trust-orientation", is_flag=True, help="Do not rotate the images turned upright from their EXIF")
+@click.option("--decode-size", type=int, default=None, help="Decode larger images at a reduced size [default: full]")
+@click.option(
+    "--loader-config", type=click.Path(exists=True, dir_okay=False), default=None, help="Loader parameters (doc tune)"
+)
+@click.option(
+    "-l", "--loader", "loaders", multiple=True, callback=validate_loaders, help="Loaders to try, in order (doc loaders)"
+)
+@click.option("--incremental", is_flag=True, help="Only process the files changed since the previous report")
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None, help="Log the completed rows to this file")
+@click.option("--resume", is_flag=True, help="Reuse the rows completed in --checkpoint")
+@scan_options
 @click.option("--debug", is_flag=True, help="Debug mode")
-def report(filepaths: list[click.Path], mode: MatchMode, expectations: click.File, debug: bool, **kwargs: Any) -> None:
-    lines = []
-    errors = []
-    warnings = []
-    success = []
+def report(  # noqa: C901, PLR0913, PLR0915
+    filepaths: list[click.Path],
+    mode: MatchMode,
+    expectations: click.File,
+    trace: TraceLevel,
+    trace_text: int,
+    trace_file: TextIO | None,
+    page_size: int,
+    thumbnail_size: int,
+    thumbnail_format: str,
+    output_format: str,
+    output: TextIO,
+    dedupe: bool,
+    trust_orientation: bool,
+    decode_size: int | None,
+    loader_config: str | None,
+    loaders: list[type[Loader]],
+    incremental: bool,
+    checkpoint: str | None,
+    resume: bool,
+    debug: bool,
+    **kwargs: Any,
+) -> None:
+    done = open_checkpoint(checkpoint, resume)
+    stats = {"total": 0, "error": 0, "warning": 0, "success": 0, "duplicate": 0, "reused": 0}
     expected_values = load_expectations(expectations.name)
-    scanner = Scanner(*filepaths)
-    processor = Processor(ts_config=TSConfig(), cv2_config=CV2Config())
-    with time_it() as m:
+    scanner = get_scanner(filepaths, kwargs)
+    tracer = Tracer(trace, max_text=trace_text)
+    processor = Processor(
+        ts_config=TSConfig(),
+        cv2_config=CV2Config(loaders=load_loader_config(loader_config)),
+        loaders=loaders,
+        tracer=tracer,
+        store=MemoryResultStore() if dedupe else None,
+        index=MemoryFingerprintIndex() if dedupe else None,
+    )
+    processor.trust_orientation = trust_orientation
+    processor.decode_size = decode_size
+    manifest = None
+    if incremental:
+        manifest = Manifest(
+            Path(f".report_{mode.name}.manifest.json"),
+            {
+                "processor": processor.config_key,
+                "loaders": [loader.__class__.__name__ for loader in processor.loaders],
+                "mode": mode.name,
+                "trust_orientation": trust_orientation,
+                "decode_size": decode_size,
+                "trace": [trace.name, trace_text],
+                "thumbnail": [thumbnail_size, thumbnail_format],
+            },
+        )
+
+    def reuse(row: dict[str, Any], filename: str) -> dict[str, Any]:
+        if row["info"]:
+            stats[row["status"]] += 1
+        stats["total"] += 1
+        stats["reused"] += 1
+        return {**row, "index": stats["total"], "filename": filename}
+
+    def lines() -> Generator[dict[str, Any], None, None]:  # noqa: C901
         for filename in scanner.files:
             target = Path(filename)
             file_label = str(target.absolute().relative_to(os.getcwd()))
 
             if entry := expected_values.get(file_label):
                 text, found, distance = entry
-                size = target.stat().st_size / 1024.0
+                if manifest:
+                    inputs = manifest.inputs(file_label, target, entry)
+                if done and (data := done.get(file_label)):
+                    row = load_row(data)
+                    if manifest:
+                        manifest.set(file_label, inputs, row)
+                    yield reuse(row, filename)
+                    continue
+                if manifest and (cached := manifest.get(file_label, inputs)):
+                    if done:
+                        done.add(file_label, dump_row(cached))
+                    yield reuse(cached, filename)
+                    continue
+                if trace_file:
+                    tracer.sink = JsonLinesSink(trace_file, filename=file_label)
+                size = path_stat(filename)[0] / 1024.0
                 try:
-                    image = get_image(str(target))
-                    width, height = image.size
+                    image = processor.load(str(target))
+                    width, height = as_buffer(image).size
                     info = f"{int(width)}x{int(height)}"
-                    base64 = get_image_base64(image)
+                    base64 = get_thumbnail_base64(image, thumbnail_size, thumbnail_format)
                 except InvalidImageError:
                     si = info = None
                     base64 = ""
+                    status = "error"
                 else:
-                    findings = list(processor.find_text(image, text, mode=mode, debug=True))
-                    if findings and not findings[0].match:
-                        errors.append(findings)
-                        si = findings[0]
-                    elif findings and findings[0].match and findings[0].match.distance == 0:
-                        success.append(findings)
-                        si = findings[0]
-                    elif findings and findings[0].match and findings[0].match.distance > 0:
-                        warnings.append(findings)
-                        si = findings[0]
-                    else:
-                        errors.append(findings)
-                        si = processor.debug_info.iterations[-1]
-
-                lines.append(
-                    {
-                        "filename": filename,
-                        "filesize": naturalsize(size, False, True, "%.3f"),
-                        "search_text": text,
-                        "image": base64,
-                        "info": info,
-                        "si": si,
-                    }
-                )
-        write_report(
-            f".report_{mode.name}.html",
-            "report.html",
-            {
-                "lines": lines,
-                "timing": m,
-                "mode": mode,
-                "errors": errors,
-                "warnings": warnings,
-                "success": success,
-            },
-        )
+                    findings = list(processor.find_text(image, text, mode=mode))
+                    si = next((f for f in findings if f.match), findings[0] if findings else processor.debug_info.last)
+                    status = search_status(si)
+                    stats[status] += 1
+                    stats["duplicate"] += bool(processor.duplicate_of)
+                stats["total"] += 1
+                row = {
+                    "index": stats["total"],
+                    "filename": filename,
+                    "filesize": naturalsize(size, False, True, "%.3f"),
+                    "search_text": text,
+                    "image": base64,
+                    "info": info,
+                    "si": si,
+                    "status": status,
+                }
+                if manifest:
+                    manifest.set(file_label, inputs, row)
+                if done:
+                    done.add(file_label, dump_row(row))
+                yield row
+
+    rows = Peekable(lines())
+    if output_format == "jsonl":
+        sink = JsonLinesSink(output)
+        for line in rows:
+            sink.write(report_record(line))
+        if manifest:
+            manifest.save()
+        if done:
+            done.close()
+        return
+
+    page = 1
+    with time_it() as m:
+        while True:
+            page_rows = islice(rows, page_size) if page_size else rows
+            write_report(
+                report_page_name(f".report_{mode.name}", page),
+                "report.html",
+                {
+                    "lines": page_rows,
+                    "timing": m,
+                    "mode": mode,
+                    "stats": stats,
+                    "page": page,
+                    "previous_page": report_page_name(f".report_{mode.name}", page - 1) if page > 1 else None,
+                    "next_page": report_page_name(f".report_{mode.name}", page + 1) if page_size else None,
+                    "has_next": rows.has_next,
+                },
+            )
+            if not (page_size and rows.has_next()):
+                break
+            page += 1
+    if manifest:
+        manifest.save()
+        click.echo(f"{manifest.reused} unchanged files reused")
+    if done:
+        done.close()
 
 
 @cli.command()
@@ -236,3 +551,169 @@ def inspect(filepath: click.File, mode: MatchMode, expectations: click.File, deb
                 "image_info": image_info,
             },
         )
+
+
+@cli.command()
+@click.argument("directories", nargs=-1, type=click.Path(exists=True, file_okay=False), required=True)
+@click.option("--output", type=click.File("w"), default="-", help="Output file (JSONL)")
+@click.option("--move-to", default=None, help="Move the processed files to this directory (outside the watched ones)")
+@click.option("--errors-to", default=None, help="Move the files that failed to this directory [default: --move-to]")
+@click.option("--interval", default=2.0, help="Seconds between two scans of the directories")
+@click.option("--settle", default=1.0, help="Seconds a file must stay unchanged before being processed")
+@click.option("--workers", default=4, help="Number of concurrent extractions")
+@click.option("--once", is_flag=True, help="Process the files present and exit")
+@scan_options
+@click.option("--debug", is_flag=True, help="Debug mode")
+def watch(  # noqa: PLR0913
+    directories: list[str],
+    output: TextIO,
+    move_to: str | None,
+    errors_to: str | None,
+    interval: float,
+    settle: float,
+    workers: int,
+    once: bool,
+    debug: bool,
+    **kwargs: Any,
+) -> None:
+    if (move_to or errors_to) and kwargs["archives"]:
+        # the members of an archive cannot be moved on their own
+        raise click.UsageError("--move-to and --errors-to cannot be used with --archives")
+    configure_logging(debug)
+    processor = Processor(ts_config=TSConfig(), cv2_config=CV2Config())
+    watcher = Watcher(get_scanner(directories, kwargs), interval=interval, settle=settle)
+    sink = JsonLinesSink(output)
+    try:
+        for result in watch_files(processor, watcher, workers=workers, once=once):
+            for entry in result.entries:
+                sink.write({"file": result.path, **entry.as_dict()})
+            if target := (errors_to or move_to) if result.failed else move_to:
+                move_aside(result.path, target)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+@cli.command()
+@click.argument("filepaths", nargs=-1, type=click.Path(exists=True), required=True)
+@click.option("-e", "--expectations", type=click.File("r"), required=True)
+@click.option("-g", "--grid", type=click.File("r"), default=None, help="Parameter grid (JSON) [default: built-in]")
+@click.option("-l", "--loader", "loaders", multiple=True, help="Only tune these loaders of the grid")
+@click.option("--max-errors", default=5, help="Max distance of a hit from the expected text")
+@click.option("--workers", default=4, help="Number of images processed at once")
+@click.option("--cache", type=click.Path(dir_okay=False), default=".tune_cache.json", help="OCR results cache")
+@click.option("--no-cache", is_flag=True, help="Do not read nor write the cache")
+@click.option("--top", default=10, help="Number of candidates listed")
+@click.option("--results", type=click.File("w"), default=None, help="Write every candidate to this file (JSONL)")
+@click.option("--output", type=click.File("w"), default="-", help="Best configuration (JSON, see --loader-config)")
+@scan_options
+@click.option("--debug", is_flag=True, help="Debug mode")
+def tune(  # noqa: PLR0913
+    filepaths: list[str],
+    expectations: click.File,
+    grid: TextIO | None,
+    loaders: tuple[str, ...],
+    max_errors: int,
+    workers: int,
+    cache: str,
+    no_cache: bool,
+    top: int,
+    results: TextIO | None,
+    output: TextIO,
+    debug: bool,
+    **kwargs: Any,
+) -> None:
+    """Search the loader parameters that find the expected texts with the least OCR time."""
+    configure_logging(debug)
+    samples = expected_samples(filepaths, expectations.name, kwargs)
+
+    parameters = json.load(grid) if grid else DEFAULT_GRID
+    if loaders:
+        parameters = {name: values for name, values in parameters.items() if name in loaders}
+    processor = Processor(ts_config=TSConfig(), cv2_config=CV2Config())
+    try:
+        tuner = Tuner(
+            processor,
+            parameters,
+            cache=TuneCache(None if no_cache else Path(cache)),
+            workers=workers,
+            max_errors=max_errors,
+        )
+    except ValueError as e:
+        click.get_current_context().fail(str(e))
+
+    click.echo(f"Tuning {len(tuner.candidates)} candidates on {len(samples)} files", err=True)
+    ranking = tuner.run(samples)
+    for result in ranking[:top]:
+        click.echo(
+            f"{result.loader:<16} {json.dumps(result.params, sort_keys=True):<40} "
+            f"hits {result.hits}/{result.total} ({result.hit_rate:.0%}) "
+            f"attempts {result.attempts} ocr {result.seconds:.2f}s score {result.score:.3f}",
+            err=True,
+        )
+    click.echo(f"Cached attempts reused: {tuner.cache.hits}", err=True)
+    if results:
+        sink = JsonLinesSink(results)
+        for result in ranking:
+            sink.write(result.as_dict())
+    output.write(json.dumps(best_config(ranking), indent=2, sort_keys=True) + "\n")
+
+
+@cli.command(name="loaders")
+@click.argument("filepaths", nargs=-1, type=click.Path(exists=True), required=True)
+@click.option("-e", "--expectations", type=click.File("r"), required=True)
+@click.option("--coverage", type=click.FloatRange(0, 1), default=1.0, help="Share of the solved files to keep solving")
+@click.option("--max-errors", default=5, help="Max distance of a match from the expected text")
+@click.option("--workers", default=4, help="Number of files processed at once")
+@click.option(
+    "--loader-config", type=click.Path(exists=True, dir_okay=False), default=None, help="Loader parameters (doc tune)"
+)
+@click.option("--output", type=click.File("w"), default=None, help="Write the pruned loaders and the stats (JSON)")
+@scan_options
+@click.option("--debug", is_flag=True, help="Debug mode")
+def loader_stats(  # noqa: PLR0913
+    filepaths: list[str],
+    expectations: click.File,
+    coverage: float,
+    max_errors: int,
+    workers: int,
+    loader_config: str | None,
+    output: TextIO | None,
+    debug: bool,
+    **kwargs: Any,
+) -> None:
+    """Run every loader on the expected documents and report the cost and the unique wins of each."""
+    configure_logging(debug)
+    samples = expected_samples(filepaths, expectations.name, kwargs)
+
+    stats = LoaderStats()
+    processor = Processor(ts_config=TSConfig(), cv2_config=CV2Config(loaders=load_loader_config(loader_config)))
+    processor.stats = stats
+
+    def search(sample: tuple[str, str]) -> None:
+        worker = processor.with_profile(OCRProfile())
+        try:
+            # ALL runs every loader, so that the documents solved by a single one are known
+            for _ in worker.find_text(worker.load(sample[0]), sample[1], mode=MatchMode.ALL, max_errors=max_errors):
+                pass
+        except (OSError, InvalidImageError) as e:
+            logger.warning(f"Skipping {sample[0]}: {e}")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loaders") as executor:
+        list(executor.map(search, samples))
+
+    pruned = stats.prune(coverage)
+    click.echo(f"Solved {stats.solved}/{stats.searches} files")
+    click.echo(
+        f"{'Loader':<16} {'Attempts':>8} {'OCR (s)':>9} {'Cost (s)':>9} {'Wins':>6} {'First':>6} {'Unique':>6}  Kept"
+    )
+    for name in sorted(stats.loaders, key=lambda n: (n not in pruned, pruned.index(n) if n in pruned else 0, n)):
+        usage = stats.loaders[name]
+        click.echo(
+            f"{name:<16} {usage.attempts:>8} {usage.seconds:>9.2f} {usage.cost:>9.3f} "
+            f"{usage.wins:>6} {usage.first:>6} {usage.unique:>6}  {'yes' if name in pruned else 'no'}"
+        )
+    click.echo(f"Pruned loaders: {' '.join(f'-l {name}' for name in pruned)}")
+    if output:
+        output.write(json.dumps({"pruned": pruned, "coverage": coverage, **stats.as_dict()}, indent=2) + "\n")
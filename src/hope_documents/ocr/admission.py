@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any
+
+from hope_documents.exceptions import OCRBusyError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = os.cpu_count() or 1
+
+
+class Admission:
+    """
+    Process wide admission control of the OCR calls.
+
+    At most `max_concurrent` tesseract processes run at once; callers wait for a free slot
+    up to `wait_timeout` seconds, and are rejected at once with `OCRBusyError`
+    when `max_waiting` callers are already waiting. `max_waiting=0` means no limit.
+    """
+
+    def __init__(
+        self, max_concurrent: int = DEFAULT_CONCURRENCY, max_waiting: int = 0, wait_timeout: float = 0
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.max_waiting and self.waiting >= self.max_waiting)
+
+    def _reject(self, reason: str) -> None:
+        with self._lock:
+            self.rejected += 1
+        logger.warning(f"OCR rejected: {reason}")
+        raise OCRBusyError(reason)
+
+    @contextmanager
+    def slot(self) -> Generator[None, None, None]:
+        with self._lock:
+            busy = self.busy
+            if not busy:
+                self.waiting += 1
+        if busy:
+            self._reject(f"{self.waiting} OCR calls already waiting")
+        start = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.wait_timeout or None)
+        waited = time.monotonic() - start
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.running += 1
+                self.admitted += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+        if not acquired:
+            self._reject(f"no OCR slot available after {waited:.1f}s")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": self.running,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+
+admission: Admission | None = None
+# the OMP_THREAD_LIMIT set by `configure`, a different value was set outside and is kept
+thread_limit: str | None = None
+
+
+def set_thread_limit(threads: int) -> None:
+    """Set the OpenMP threads of each tesseract process (inherited by the subprocesses)."""
+    global thread_limit  # noqa: PLW0603
+    thread_limit = str(threads)
+    os.environ["OMP_THREAD_LIMIT"] = thread_limit
+
+
+def configure(
+    max_concurrent: int | None = None,
+    max_waiting: int = 0,
+    wait_timeout: float = 0,
+    threads: int | None = None,
+) -> Admission:
+    """
+    Replace the process wide `Admission` and limit the OpenMP threads of each tesseract process.
+
+    With `threads` each tesseract process uses that many threads. With an explicit `max_concurrent`
+    (and no OMP_THREAD_LIMIT set outside) the cores are shared among the concurrent calls,
+    so that `max_concurrent * threads` does not exceed the number of cores. Otherwise tesseract
+    keeps its own default, all the cores.
+    """
+    global admission  # noqa: PLW0603
+    admission = Admission(max_concurrent or DEFAULT_CONCURRENCY, max_waiting=max_waiting, wait_timeout=wait_timeout)
+    if threads:
+        set_thread_limit(threads)
+    elif max_concurrent and os.environ.get("OMP_THREAD_LIMIT") in (None, thread_limit):
+        set_thread_limit(max(1, DEFAULT_CONCURRENCY // max_concurrent))
+    return admission
+
+
+def get_admission() -> Admission:
+    global admission  # noqa: PLW0603
+    if admission is None:
+        # the lazy default does not touch the environment
+        admission = Admission()
+    return admission
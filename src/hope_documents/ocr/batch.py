@@ -0,0 +1,140 @@
+import logging
+import time
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any
+
+from hope_documents.exceptions import ExtractionError, InvalidImageError, OCRBusyError
+from hope_documents.ocr.engine import MatchMode, OCRProfile, Processor
+from hope_documents.ocr.reader import BaseReader
+from hope_documents.utils.image import ImageBuffer
+from hope_documents.utils.timeit import format_elapsed_time
+
+if TYPE_CHECKING:
+    import re
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VerifyItem:
+    source: str | IO[bytes] | ImageBuffer
+    target: str
+    key: str = ""
+    profile: OCRProfile | None = None
+    number_regex: "re.Pattern[str] | None" = None
+
+
+@dataclass
+class Verdict:
+    key: str
+    target: str
+    status: str = "not_found"
+    match: str | None = None
+    distance: float | None = None
+    loader: str = ""
+    angle: int = 0
+    error: str = ""
+    time: str = ""
+
+    FOUND = "found"
+    NOT_FOUND = "not_found"
+    TIMEOUT = "timeout"
+    BUSY = "busy"
+    ERROR = "error"
+
+    @property
+    def found(self) -> bool:
+        return self.status == self.FOUND
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "target": self.target,
+            "status": self.status,
+            "match": self.match,
+            "distance": self.distance,
+            "loader": self.loader,
+            "angle": self.angle,
+            "error": self.error,
+            "time": self.time,
+        }
+
+
+class DeadlineReader(BaseReader):
+    """Wrap a reader and refuse to start an OCR call once `deadline` (monotonic) has passed."""
+
+    def __init__(self, reader: BaseReader, deadline: float) -> None:
+        super().__init__(reader.config)
+        self.reader = reader
+        self.deadline = deadline
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() > self.deadline
+
+    def extract(self, image: Any) -> str:
+        if self.expired:
+            raise ExtractionError("timeout")
+        return self.reader.extract(image)
+
+
+def verify(processor: Processor, item: VerifyItem, max_errors: int = 5, timeout: float = 60.0) -> Verdict:
+    """
+    Search `item.target` in `item.source` and return the verdict.
+
+    The item gets its own `Processor` (narrowed by `item.profile`), so that it can run in any thread.
+    `timeout` is cooperative: no OCR call is started once it is exceeded, the running one is bound
+    by the `Reader` timeout.
+    """
+    start = time.monotonic()
+    worker = processor.with_profile(item.profile or OCRProfile())
+    reader = DeadlineReader(worker.reader, start + timeout)
+    worker.reader = reader
+    verdict = Verdict(key=item.key, target=item.target)
+    try:
+        image = worker.load(item.source)
+        for info in worker.find_text(
+            image, item.target, mode=MatchMode.FIRST, max_errors=max_errors, number_regex=item.number_regex
+        ):
+            if info.match:
+                verdict.status = Verdict.FOUND
+                verdict.match = info.match.text
+                verdict.distance = info.match.distance
+                verdict.loader = info.loader
+                verdict.angle = info.angle
+        if not verdict.found and reader.expired:
+            verdict.status = Verdict.TIMEOUT
+    except OCRBusyError as e:
+        verdict.status = Verdict.BUSY
+        verdict.error = f"{e.__class__.__name__}: {e}"
+    except (InvalidImageError, ExtractionError, OSError) as e:
+        verdict.status = Verdict.ERROR
+        verdict.error = f"{e.__class__.__name__}: {e}"
+    verdict.time = format_elapsed_time(time.monotonic() - start)
+    return verdict
+
+
+def verify_batch(
+    processor: Processor,
+    items: Iterable[VerifyItem],
+    workers: int = 4,
+    timeout: float = 60.0,
+    max_errors: int = 5,
+) -> Generator[Verdict, None, None]:
+    """
+    Verify `items` with a pool of `workers` threads and yield the verdicts in the order of `items`.
+
+    At most `2 * workers` items are in flight, so `items` can be a lazy iterable of any length.
+    Tesseract runs in a subprocess, threads are enough to keep all the workers busy.
+    """
+    pending: deque[Future[Verdict]] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify") as executor:
+        for item in items:
+            pending.append(executor.submit(verify, processor, item, max_errors, timeout))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
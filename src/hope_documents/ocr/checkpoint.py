@@ -0,0 +1,59 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Self
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of the files completed by a batch run.
+
+    Each record is written and flushed as soon as the file is completed, so that a run that
+    crashes or is killed can be resumed: with `resume=True` the previous records are loaded
+    (a last line truncated by the crash is dropped) and the new ones are appended.
+    Without `resume` the log is started afresh.
+    """
+
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        self.path = path
+        self.done: dict[str, dict[str, Any]] = {}
+        if resume and path.exists():
+            self._load()
+        else:
+            path.write_text("", encoding="utf-8")
+        self.stream = path.open("a", encoding="utf-8")
+
+    def _load(self) -> None:
+        lines = []
+        for line in self.path.read_text(encoding="utf-8").splitlines(keepends=True):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Invalid checkpoint record in {self.path}, ignored")
+                continue
+            self.done[record["file"]] = record["data"]
+            lines.append(line if line.endswith("\n") else f"{line}\n")
+        # rewrite without the invalid lines, so that the next record starts on its own line
+        self.path.write_text("".join(lines), encoding="utf-8")
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.done
+
+    def get(self, label: str) -> dict[str, Any] | None:
+        return self.done.get(label)
+
+    def add(self, label: str, data: dict[str, Any]) -> None:
+        self.done[label] = data
+        self.stream.write(json.dumps({"file": label, "data": data}) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -1,4 +1,13 @@
 from .common import Match
-from .impl1 import find_similar
+from .impl1 import batch_distances, find_similar, window_distances
+from .numbers import extract_numbers, find_number, number_pattern
 
-__all__ = ["find_similar", "Match"]
+__all__ = [
+    "find_similar",
+    "find_number",
+    "extract_numbers",
+    "number_pattern",
+    "batch_distances",
+    "window_distances",
+    "Match",
+]
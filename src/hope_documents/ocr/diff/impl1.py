@@ -1,5 +1,7 @@
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 from hope_documents.ocr.diff.common import Match, _normalize_homoglyphs
 
 if TYPE_CHECKING:
@@ -26,6 +28,71 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     return previous_row[-1]
 
 
+def _code_points(s: str) -> np.ndarray:
+    return np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _levenshtein_rows(pattern: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Run the Levenshtein DP of `pattern` against every row of `targets` at once.
+
+    `targets` is a 2D array (one candidate per row, all of the same width);
+    the result holds, for each row, the last DP row (distance to every prefix of the candidate).
+    """
+    rows, width = targets.shape
+    offsets = np.arange(width + 1, dtype=np.int64)
+    previous = np.broadcast_to(offsets, (rows, width + 1)).copy()
+    current = np.empty_like(previous)
+    for i, code in enumerate(pattern):
+        cost = (targets != code).astype(np.int64)
+        current[:, 0] = i + 1
+        # insertions and substitutions only depend on the previous row
+        np.minimum(previous[:, 1:] + 1, previous[:, :-1] + cost, out=current[:, 1:])
+        # deletions chain along the row: current[j] = min_k(current[k] + j - k)
+        np.minimum.accumulate(current - offsets, axis=1, out=current)
+        current += offsets
+        previous, current = current, previous
+    return previous
+
+
+def window_distances(pattern: str, text: str, window_size: int) -> np.ndarray:
+    """Return the edit distance between `pattern` and every `window_size` long window of `text`."""
+    if window_size <= 0 or len(text) < window_size:
+        return np.empty(0, dtype=np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(_code_points(text), window_size)
+    if not pattern:
+        return np.full(len(windows), window_size, dtype=np.int64)
+    return _levenshtein_rows(_code_points(pattern), windows)[:, -1]
+
+
+def batch_distances(patterns: "Sequence[str]", texts: "Sequence[str]") -> np.ndarray:
+    """
+    Return the edit distance of each (pattern, text) pair.
+
+    All pairs sharing the same pattern are scored in a single vectorized pass,
+    texts are right-padded so that a pattern can be matched against many texts at once.
+    """
+    if len(patterns) != len(texts):
+        raise ValueError("patterns and texts must have the same length")
+    result = np.empty(len(texts), dtype=np.int64)
+    groups: dict[str, list[int]] = {}
+    for index, pattern in enumerate(patterns):
+        groups.setdefault(pattern, []).append(index)
+
+    for pattern, indexes in groups.items():
+        lengths = np.array([len(texts[i]) for i in indexes], dtype=np.int64)
+        if not pattern:
+            result[indexes] = lengths
+            continue
+        width = int(lengths.max())
+        padded = np.full((len(indexes), width), -1, dtype=np.int64)
+        for row, i in enumerate(indexes):
+            padded[row, : lengths[row]] = _code_points(texts[i])
+        last_row = _levenshtein_rows(_code_points(pattern), padded)
+        result[indexes] = last_row[np.arange(len(indexes)), lengths]
+    return result
+
+
 def find_similar(pattern: str, text: str, max_distance: int = 0) -> Match | None:
     if not pattern:
         return None
@@ -51,27 +118,30 @@ def find_similar(pattern: str, text: str, max_distance: int = 0) -> Match | None
     pattern_len = len(pattern_norm)
 
     # The window size can vary from pattern_len - max_distance to pattern_len + max_distance
+    # all the windows of a given size are scored at once, the first best one is selected
     for window_size in range(max(1, pattern_len - max_distance), pattern_len + max_distance + 1):
-        for i in range(len(text_clean_norm) - window_size + 1):
-            substring_clean_norm = text_clean_norm[i : i + window_size]
-            distance = levenshtein_distance(pattern_norm, substring_clean_norm)
-
-            if distance <= max_distance and (
-                best_match is None
-                or distance < min_distance
-                or (distance == min_distance and abs(window_size - pattern_len) < abs(best_window_size - pattern_len))
-            ):
-                min_distance = distance
-                best_window_size = window_size
-
-                start_original_index = original_indices[i]
-                end_original_index_in_clean = i + window_size - 1
-                end_original_index = original_indices[end_original_index_in_clean]
-                matched_text = text[start_original_index : end_original_index + 1]
-
-                best_match = Match(text=matched_text, distance=distance)
-
-                if distance == 0:
-                    return best_match
+        distances = window_distances(pattern_norm, text_clean_norm, window_size)
+        if not distances.size:
+            continue
+        i = int(distances.argmin())
+        distance = int(distances[i])
+
+        if distance <= max_distance and (
+            best_match is None
+            or distance < min_distance
+            or (distance == min_distance and abs(window_size - pattern_len) < abs(best_window_size - pattern_len))
+        ):
+            min_distance = distance
+            best_window_size = window_size
+
+            start_original_index = original_indices[i]
+            end_original_index_in_clean = i + window_size - 1
+            end_original_index = original_indices[end_original_index_in_clean]
+            matched_text = text[start_original_index : end_original_index + 1]
+
+            best_match = Match(text=matched_text, distance=distance)
+
+            if distance == 0:
+                return best_match
 
     return best_match
@@ -0,0 +1,64 @@
+from typing import TYPE_CHECKING
+
+from hope_documents.ocr.diff.common import Match, _normalize_homoglyphs
+from hope_documents.ocr.diff.impl1 import batch_distances, find_similar
+
+if TYPE_CHECKING:
+    import re
+
+SEPARATORS = " -./"
+
+
+def _canonical(s: str) -> str:
+    return _normalize_homoglyphs("".join(c for c in s if c not in SEPARATORS))
+
+
+def number_pattern(pattern: "re.Pattern[str] | None") -> "re.Pattern[str] | None":
+    """Return `pattern`, None if it matches the empty string (eg. the `.*` default): it cannot extract a number."""
+    if pattern is None or pattern.fullmatch(""):
+        return None
+    return pattern
+
+
+def extract_numbers(number_regex: "re.Pattern[str]", text: str) -> list[str]:
+    """
+    Return the distinct numbers found by `number_regex` in `text`, in order of appearance.
+
+    The `number` named group is used if present, then the first group, then the whole match.
+    """
+    numbers: dict[str, None] = {}
+    for m in number_regex.finditer(text):
+        if "number" in number_regex.groupindex:
+            value = m.group("number")
+        elif number_regex.groups:
+            value = m.group(1)
+        else:
+            value = m.group(0)
+        if value and value.strip():
+            numbers[value.strip()] = None
+    return list(numbers)
+
+
+def find_number(number_regex: "re.Pattern[str]", target: str, text: str, max_distance: int = 0) -> Match | None:
+    """
+    Search `target` among the numbers extracted from `text` by `number_regex`.
+
+    Candidates equal to the target, once separators and homoglyphs are normalized, are exact matches;
+    otherwise the closest candidate within `max_distance` wins, and only when no candidate
+    is close enough the whole text is searched with `find_similar`.
+    Without a target the first extracted number is returned.
+    """
+    candidates = extract_numbers(number_regex, text)
+    if not target:
+        return Match(text=candidates[0], distance=0) if candidates else None
+    expected = _canonical(target)
+    normalized = [_canonical(c) for c in candidates]
+    for candidate, norm in zip(candidates, normalized, strict=True):
+        if norm == expected:
+            return Match(text=candidate, distance=0)
+    if candidates and max_distance:
+        distances = batch_distances([expected] * len(normalized), normalized)
+        best = int(distances.argmin())
+        if distances[best] <= max_distance:
+            return Match(text=candidates[best], distance=int(distances[best]))
+    return find_similar(target, text, max_distance=max_distance)
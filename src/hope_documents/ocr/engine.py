@@ -1,15 +1,20 @@
+import json
 import logging
-from collections.abc import Generator, Sequence
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Generator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import copy
 from dataclasses import dataclass
 from enum import Enum
 from functools import cached_property
-from pathlib import Path
-from typing import Any
+from typing import IO, TYPE_CHECKING, Any
 
 from PIL import Image
 
 from hope_documents.exceptions import ExtractionError, InvalidImageError
-from hope_documents.ocr.diff import Match, find_similar
+from hope_documents.ocr.diff import Match, find_number, find_similar
 from hope_documents.ocr.loaders import (
     BWLoader,
     CV2Loader,
@@ -18,10 +23,19 @@ from hope_documents.ocr.loaders import (
     Loader,
     PILLoader,
     SmartLoader,
+    loader_registry,
 )
 from hope_documents.ocr.reader import BaseReader, Reader
+from hope_documents.ocr.scanner import Scanner  # noqa: F401
+from hope_documents.ocr.store import FingerprintIndex, ResultStore, same_text
+from hope_documents.utils.image import ImageBuffer, ImagePages, as_buffer, iter_pages, load_pages
 from hope_documents.utils.timeit import format_elapsed_time, time_it
 
+if TYPE_CHECKING:
+    import re
+
+    from hope_documents.ocr.pruning import LoaderStats
+
 logger = logging.getLogger(__name__)
 
 SEARCH_TEST_PATTERN = "||doc-test||"
@@ -29,21 +43,25 @@ SEARCH_TEST_PATTERN = "||doc-test||"
 
 @dataclass
 class ScanEntryInfo:
-    __slots__ = ["loader", "text", "error", "time"]
+    __slots__ = ["loader", "text", "error", "time", "page"]
 
     def __init__(self, *, loader: str) -> None:
         self.loader = loader
         self.text: str = ""
         self.error: str = ""
         self.time: str = ""
+        self.page: int = 1
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.loader})"
 
+    def as_dict(self) -> dict[str, Any]:
+        return {"loader": self.loader, "text": self.text, "error": self.error, "time": self.time, "page": self.page}
+
 
 @dataclass
 class SearchInfo(ScanEntryInfo):
-    __slots__ = ["loader", "text", "error", "time", "match", "angle", "iterations"]
+    __slots__ = ["loader", "text", "error", "time", "page", "match", "angle", "iterations"]
 
     def __init__(
         self,
@@ -64,11 +82,20 @@ class SearchInfo(ScanEntryInfo):
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.loader}):{self.match!r}:{self.angle!r}:{self.time!r}"
 
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "angle": self.angle,
+            "match": self.match.text if self.match else None,
+            "distance": self.match.distance if self.match else None,
+        }
+
 
 @dataclass
 class ScanInfo:
-    def __init__(self) -> None:
-        self.iterations: list[SearchInfo] = []
+    def __init__(self, max_entries: int | None = None) -> None:
+        self.iterations: deque[SearchInfo] = deque(maxlen=max_entries)
+        self.last: SearchInfo | None = None
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.iterations!r})"
@@ -80,6 +107,8 @@ class TSConfig:
         self.psm: int = 11
         self.oem: int = 3
         self.number_only: bool = False
+        self.whitelist: str = ""
+        self.lang: str = "eng"
         self.extra: str = ""
         for k, v in kwargs.items():
             setattr(self, k, v)
@@ -89,6 +118,8 @@ class TSConfig:
         extra = ""
         if self.number_only:
             extra = "tessedit_char_whitelist=0123456789"
+        elif self.whitelist:
+            extra = f"tessedit_char_whitelist={self.whitelist}"
         if extra:
             cfg = f"{cfg} -c {extra}"
         return cfg
@@ -96,26 +127,97 @@ class TSConfig:
 
 @dataclass
 class CV2Config:
-    def __init__(self, threshold: int = 120) -> None:
+    """Image processing settings: `threshold` for every loader, `loaders` per loader keyword arguments."""
+
+    def __init__(self, threshold: int = 120, loaders: dict[str, dict[str, Any]] | None = None) -> None:
         self.threshold = threshold
+        self.loaders = loaders or {}
 
     def as_dict(self) -> dict[str, Any]:
+        if self.loaders:
+            return {"threshold": self.threshold, "loaders": self.loaders}
         return {"threshold": self.threshold}
 
+    def options(self, loader: str) -> dict[str, Any]:
+        return {"threshold": self.threshold, **self.loaders.get(loader, {})}
 
-class Scanner:
-    def __init__(self, *args: Any) -> None:
-        self.filepaths = args
 
-    @property
-    def files(self) -> Generator[str, None, None]:
-        for arg in self.filepaths:
-            entry = Path(str(arg))
-            if entry.is_dir():
-                for filename in entry.rglob("*.*"):
-                    yield str(filename)
-            else:
-                yield str(entry)
+@dataclass
+class OCRProfile:
+    """OCR settings of a kind of document, empty values keep the `Processor` ones."""
+
+    lang: str = ""
+    psm: int | None = None
+    whitelist: str = ""
+    loaders: Sequence[str] = ()
+    rotations: Sequence[int] = ()
+
+
+class TraceLevel(Enum):
+    OFF = 0
+    SUMMARY = 1
+    FULL = 2
+
+    @classmethod
+    def choices(cls) -> tuple[tuple[int, str], ...]:
+        return tuple((i.value, i.name) for i in cls)
+
+
+class Tracer:
+    """Record the attempts of each search, at most `max_entries`, each passed to `sink` if any."""
+
+    def __init__(
+        self,
+        level: TraceLevel = TraceLevel.SUMMARY,
+        max_text: int = 2048,
+        max_entries: int = 50,
+        sink: Callable[[SearchInfo], None] | None = None,
+    ) -> None:
+        self.level = level
+        self.max_text = max_text
+        self.max_entries = max_entries
+        self.sink = sink
+
+    def with_level(self, level: TraceLevel) -> "Tracer":
+        return Tracer(level, max_text=self.max_text, max_entries=self.max_entries, sink=self.sink)
+
+    def synchronized(self) -> "Tracer":
+        """Return a Tracer whose `sink` can be shared by several threads."""
+        if self.sink is None:
+            return self
+        sink = self.sink
+        lock = threading.Lock()
+
+        def locked(info: SearchInfo) -> None:
+            with lock:
+                sink(info)
+
+        return Tracer(self.level, max_text=self.max_text, max_entries=self.max_entries, sink=locked)
+
+    def attempt(self, info: SearchInfo) -> dict[str, Any] | None:
+        if self.level == TraceLevel.OFF:
+            return None
+        if self.sink:
+            self.sink(info)
+        entry: dict[str, Any] = {"angle": info.angle, "match": info.match, "error": info.error}
+        if self.level == TraceLevel.FULL:
+            entry["text"] = info.text[: self.max_text]
+        return entry
+
+
+class JsonLinesSink:
+    """Write each received entry as a JSON line."""
+
+    def __init__(self, stream: IO[str], **extra: Any) -> None:
+        self.stream = stream
+        self.extra = extra
+
+    def __call__(self, info: ScanEntryInfo) -> None:
+        self.write(info.as_dict())
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.stream.write(json.dumps({**self.extra, **record}) + "\n")
+        self.stream.flush()
 
 
 class MatchMode(Enum):
@@ -129,7 +231,18 @@ class MatchMode(Enum):
 
 
 class Processor:
-    def __init__(self, ts_config: TSConfig, cv2_config: CV2Config, loaders: list[type[Loader]] | None = None) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        ts_config: TSConfig,
+        cv2_config: CV2Config,
+        loaders: list[type[Loader]] | None = None,
+        tracer: Tracer | None = None,
+        store: ResultStore | None = None,
+        index: FingerprintIndex | None = None,
+        max_distance: int = 32,
+    ) -> None:
+        if index is not None and store is None:
+            raise ValueError("A fingerprint index requires a result store")
         self.loader_classes = loaders or [
             Loader,
             PILLoader,
@@ -139,18 +252,119 @@ class Processor:
             BWLoader,
             ImprovedLoader,
         ]
+        self.ts_settings = ts_config
         self.ts_config = str(ts_config)
         self.cv2_config = cv2_config
+        self.tracer = tracer or Tracer()
+        self.store = store
+        self.index = index
+        self.max_distance = max_distance
+        self.duplicate_of: str | None = None
+        self.rotations: Sequence[int] = (270, 0)
+        self.page_workers = 1
+        # only try the upright angle on images turned upright from their EXIF orientation
+        self.trust_orientation = False
+        # decode the images larger than this at a reduced size (None: full resolution)
+        self.decode_size: int | None = None
+        # records the cost and the contribution of each loader (see `ocr.pruning`)
+        self.stats: LoaderStats | None = None
+        self.debug_info = ScanInfo()
+
+    def with_profile(self, profile: OCRProfile) -> "Processor":
+        """Return a Processor with the same configuration, narrowed by `profile`."""
+        ts_config = copy(self.ts_settings)
+        ts_config.lang = profile.lang or ts_config.lang
+        ts_config.psm = ts_config.psm if profile.psm is None else profile.psm
+        ts_config.whitelist = profile.whitelist or ts_config.whitelist
+        by_name = {loader.__name__: loader for loader in loader_registry}
+        loaders = [by_name[name] for name in profile.loaders if name in by_name]
+        processor = Processor(
+            ts_config,
+            self.cv2_config,
+            loaders=loaders or self.loader_classes,
+            tracer=self.tracer,
+            store=self.store,
+            index=self.index,
+            max_distance=self.max_distance,
+        )
+        processor.rotations = tuple(profile.rotations) or self.rotations
+        processor.page_workers = self.page_workers
+        processor.trust_orientation = self.trust_orientation
+        processor.decode_size = self.decode_size
+        processor.stats = self.stats
+        return processor
 
     @cached_property
     def loaders(self) -> list[Loader]:
-        return [loader(**self.cv2_config.as_dict()) for loader in self.loader_classes]
+        return [loader(**self.cv2_config.options(loader.__name__)) for loader in self.loader_classes]
 
     @cached_property
     def reader(self) -> BaseReader:
-        return Reader(str(self.ts_config))
+        return Reader(str(self.ts_config), lang=self.ts_settings.lang)
 
-    def find_single(self, image: Image.Image, target: str, max_errors: int = 5) -> tuple[str, Match | None]:
+    @cached_property
+    def config_key(self) -> str:
+        config = f"{self.ts_settings.lang} {self.ts_config.strip()}"
+        return f"{config} {json.dumps(self.cv2_config.as_dict(), sort_keys=True)}"
+
+    def load(self, source: str | IO[bytes] | Image.Image | ImageBuffer | ImagePages) -> ImageBuffer | ImagePages:
+        return load_pages(source, max_size=self.decode_size)
+
+    def get_rotations(self, image: ImageBuffer) -> Sequence[int]:
+        """Return the angles to try on `image`, as is first if it was turned upright from EXIF."""
+        if not image.oriented:
+            return self.rotations
+        if self.trust_orientation:
+            return (0,)
+        return (0, *(angle for angle in self.rotations if angle % 360))
+
+    def _digest(self, original: ImageBuffer, angle: int) -> str:
+        """Return the key of the stored results of `original`, the digest of a confirmed near duplicate if any."""
+        digest = original.digest
+        self.duplicate_of = None
+        if self.index is None or self.store is None:
+            return digest
+        fingerprint = original.fingerprint()
+        prior = self.index.lookup(fingerprint, self.max_distance)
+        if prior is not None and (prior == digest or self._confirm(original, angle, prior)):
+            self.duplicate_of = prior
+            return prior
+        self.index.add(fingerprint, digest)
+        return digest
+
+    def _confirm(self, original: ImageBuffer, angle: int, prior: str) -> bool:
+        """Whether the first loader reads on `original` the text stored for `prior`."""
+        loader = self.loaders[0]
+        stored = self.store.get(prior, self.config_key, loader.__class__.__name__, angle) if self.store else None
+        if stored is None:
+            return False
+        try:
+            text = self.reader.extract(loader.process(original.rotate(angle)))
+        except (InvalidImageError, ExtractionError):
+            return False
+        return same_text(text, stored)
+
+    def _extract(self, original: ImageBuffer, loader: Loader, angle: int, digest: str) -> tuple[str, bool]:
+        """Return the text read by `loader` at `angle` and whether it comes from the store."""
+        if self.store:
+            text = self.store.get(digest, self.config_key, loader.__class__.__name__, angle)
+            if text is not None:
+                return text, True
+        return self.reader.extract(loader.process(original.rotate(angle))), False
+
+    def _failed[T: ScanEntryInfo](self, error: InvalidImageError, page: int, info_class: type[T]) -> list[T]:
+        """Return an entry reporting `error` for each loader."""
+        entries = []
+        for loader in self.loaders:
+            ret = info_class(loader=loader.__class__.__name__)
+            ret.error = f"{error.__class__.__name__}: {str(error)}"
+            ret.page = page
+            entries.append(ret)
+        return entries
+
+    def find_single(
+        self, image: Image.Image | ImageBuffer, target: str, max_errors: int = 5
+    ) -> tuple[str, Match | None]:
         text = self.reader.extract(image)
         try:
             match = find_similar(target, text, max_distance=max_errors)
@@ -158,33 +372,142 @@ class Processor:
             match = None
         return text, match
 
-    def find_text(  # noqa: C901, PLR0913, PLR0912
+    def _search_pages(
+        self, pages: ImagePages, target: str, mode: MatchMode, options: dict[str, Any]
+    ) -> Generator[tuple[int, list[SearchInfo], ScanInfo, str | None], None, None]:
+        """Yield the results of each page, in page order, with `page_workers` pages processed at once."""
+        if self.page_workers <= 1:
+            for page in range(1, len(pages) + 1):
+                try:
+                    image = pages[page - 1]
+                except InvalidImageError as e:
+                    yield page, self._failed(e, page, SearchInfo), ScanInfo(), None
+                    continue
+                results = list(self.find_text(image, target, mode=mode, **options))
+                yield page, results, self.debug_info, self.duplicate_of
+            return
+        tracer = self.tracer.synchronized()
+
+        def search(image: ImageBuffer, digest: str) -> tuple[list[SearchInfo], ScanInfo]:
+            worker = self.with_profile(OCRProfile())
+            # shared, so that a wrapped reader (eg. with a deadline) still applies
+            worker.reader = self.reader
+            worker.tracer = tracer
+            worker.index = None
+            return list(worker.find_text(image, target, mode=mode, digest=digest, **options)), worker.debug_info
+
+        executor = ThreadPoolExecutor(max_workers=self.page_workers, thread_name_prefix="page")
+        pending: deque[tuple[int, str | None, Future[tuple[list[SearchInfo], ScanInfo]]]] = deque()
+        try:
+            for index in range(1, len(pages) + 1):
+                try:
+                    image = pages[index - 1]
+                except InvalidImageError as e:
+                    failed: Future[tuple[list[SearchInfo], ScanInfo]] = Future()
+                    failed.set_result((self._failed(e, index, SearchInfo), ScanInfo()))
+                    pending.append((index, None, failed))
+                else:
+                    angle = (options.get("rotations") or self.get_rotations(image))[0]
+                    digest = self._digest(image, angle) if self.store else ""
+                    pending.append((index, self.duplicate_of, executor.submit(search, image, digest)))
+                if len(pending) >= self.page_workers:
+                    page, duplicate_of, future = pending.popleft()
+                    yield page, *future.result(), duplicate_of
+            while pending:
+                page, duplicate_of, future = pending.popleft()
+                yield page, *future.result(), duplicate_of
+        finally:
+            # on early stop the pages not started yet are dropped
+            executor.shutdown(cancel_futures=True)
+
+    def find_pages(
+        self, pages: ImagePages, target: str, mode: MatchMode = MatchMode.FIRST, **options: Any
+    ) -> Generator[SearchInfo, None, None]:
+        """Search `target` in each page of a multi-frame image, see `find_text` for `options`."""
+        best: SearchInfo | None = None
+        duplicate_of = None
+        for page, results, debug_info, page_duplicate_of in self._search_pages(pages, target, mode, options):
+            self.debug_info = debug_info
+            # the document is a near duplicate if any of its pages is
+            duplicate_of = duplicate_of or page_duplicate_of
+            self.duplicate_of = duplicate_of
+            for ret in results:
+                ret.page = page
+            if mode != MatchMode.BEST:
+                yield from results
+                if mode == MatchMode.FIRST and any(r.match for r in results):
+                    return
+                continue
+            for ret in results:
+                if ret.match and (best is None or best.match is None or ret.match.distance < best.match.distance):
+                    best = ret
+            if best and best.match and best.match.distance == 0:
+                break
+        if best:
+            yield best
+
+    def find_text(  # noqa: C901, PLR0913, PLR0912, PLR0915
         self,
-        original: Image.Image,
+        original: Image.Image | ImageBuffer | ImagePages,
         target: str,
         mode: MatchMode = MatchMode.FIRST,
         debug: bool = False,
         max_errors: int = 5,
-        rotations: Sequence[int] = (270, 0),
+        rotations: Sequence[int] | None = None,
+        number_regex: "re.Pattern[str] | None" = None,
+        digest: str | None = None,
     ) -> Generator[SearchInfo, Any, None]:
+        """Search `target` in the text extracted by each loader at each angle."""
+        if isinstance(original, ImagePages) and len(original) > 1:
+            yield from self.find_pages(
+                original,
+                target,
+                mode=mode,
+                debug=debug,
+                max_errors=max_errors,
+                rotations=rotations,
+                number_regex=number_regex,
+            )
+            return
         all_matches = []
-        self.debug_info = ScanInfo()
+        # `debug` forces the full trace, still bounded by the tracer limits
+        tracer = self.tracer.with_level(TraceLevel.FULL) if debug else self.tracer
+        self.debug_info = ScanInfo(max_entries=tracer.max_entries)
         iterations: list[dict[str, Any]] = []
+        # loader, seconds and match of each attempt, for `stats`
+        attempts: list[tuple[str, float, bool]] = []
+        # decode once, all the loaders share the same buffer
+        original = as_buffer(original)
+        if rotations is None:
+            rotations = self.get_rotations(original)
+        if digest is None:
+            digest = self._digest(original, rotations[0]) if self.store else ""
 
         with time_it() as timer1:
             for loader in self.loaders:
                 stop_loader_iteration = False
-                loader.rotations = rotations
-                iterations.append({"loader": loader.__class__.__name__, "angles": []})
-                for image, angle in loader.rotate(original):
+                if tracer.level != TraceLevel.OFF:
+                    iterations.append({"loader": loader.__class__.__name__, "angles": []})
+                for angle in rotations:
                     ret = SearchInfo(loader=loader.__class__.__name__, angle=angle)
+                    cached = True
+                    start = time.perf_counter()
                     try:
-                        ret.text, ret.match = self.find_single(image, target, max_errors=max_errors)
+                        ret.text, cached = self._extract(original, loader, angle, digest)
+                        if number_regex:
+                            ret.match = find_number(number_regex, target, ret.text, max_distance=max_errors)
+                        else:
+                            ret.match = find_similar(target, ret.text, max_distance=max_errors)
                     except (InvalidImageError, ExtractionError) as e:
                         ret.error = f"{e.__class__.__name__}: {str(e)}"
-                    iterations[-1]["angles"].append(ret)
-                    ret.iterations = iterations
                     ret.time = format_elapsed_time(timer1.get_partial())
+                    attempts.append((ret.loader, time.perf_counter() - start, ret.match is not None))
+                    if self.store and not cached:
+                        self.store.add(digest, self.config_key, angle, ret)
+                    if attempt := tracer.attempt(ret):
+                        iterations[-1]["angles"].append(attempt)
+                    ret.iterations = iterations
+                    self.debug_info.last = ret
                     if debug:
                         self.debug_info.iterations.append(ret)
                     if ret.match:
@@ -195,6 +518,8 @@ class Processor:
                                     stop_loader_iteration = True
                                     break
                             case MatchMode.FIRST:
+                                if self.stats:
+                                    self.stats.record(attempts)
                                 yield ret
                                 return
                             case MatchMode.ALL:
@@ -202,6 +527,8 @@ class Processor:
 
                 if stop_loader_iteration:
                     break
+        if self.stats:
+            self.stats.record(attempts)
         if mode == MatchMode.BEST and all_matches:
             best_match = min(all_matches, key=lambda item: item.match.distance if item.match else 99999)
             best_match.time = format_elapsed_time(timer1.get_partial())
@@ -209,17 +536,31 @@ class Processor:
         elif target == SEARCH_TEST_PATTERN and ret:
             yield ret
 
-    def process(self, filepath: str, rotate: int = 0) -> Generator[ScanEntryInfo]:
-        for loader in self.loaders:
-            ret = ScanEntryInfo(loader=loader.__class__.__name__)
+    def process(
+        self, source: str | IO[bytes] | Image.Image | ImageBuffer | ImagePages, rotate: int = 0
+    ) -> Generator[ScanEntryInfo, None, None]:
+        """Extract the text with each loader, `source` is decoded only once."""
+        try:
+            pages = iter_pages(self.load(source))
+        except InvalidImageError as e:
+            yield from self._failed(e, 1, ScanEntryInfo)
+            return
+        for page in range(1, len(pages) + 1):
             try:
-                with time_it() as m:
-                    image = loader.load(filepath)
-                    if rotate:
-                        image = image.rotate(rotate, expand=True)
-                    text = self.reader.extract(image)
-                    ret.text = text
-                ret.time = m.human
-            except (InvalidImageError, ExtractionError) as e:
-                ret.error = f"{e.__class__.__name__}: {str(e)}"
-            yield ret
+                original = pages[page - 1]
+            except InvalidImageError as e:
+                yield from self._failed(e, page, ScanEntryInfo)
+                continue
+            digest = self._digest(original, rotate) if self.store else ""
+            for loader in self.loaders:
+                ret = ScanEntryInfo(loader=loader.__class__.__name__)
+                ret.page = page
+                try:
+                    with time_it() as m:
+                        ret.text, cached = self._extract(original, loader, rotate, digest)
+                    ret.time = m.human
+                    if self.store and not cached:
+                        self.store.add(digest, self.config_key, rotate, ret)
+                except (InvalidImageError, ExtractionError) as e:
+                    ret.error = f"{e.__class__.__name__}: {str(e)}"
+                yield ret
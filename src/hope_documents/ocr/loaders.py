@@ -5,11 +5,10 @@ from typing import Any
 import cv2
 import matplotlib as mpl
 import matplotlib.pyplot as plt
-import numpy as np
-from PIL import Image, ImageOps, UnidentifiedImageError
+from PIL import Image, UnidentifiedImageError
 
 from hope_documents.exceptions import InvalidImageError
-from hope_documents.utils.image import get_image
+from hope_documents.utils.image import ImageBuffer, as_buffer, load_image
 
 mpl.use("agg")
 loader_registry = []
@@ -24,37 +23,33 @@ class LoaderMetaClass(ABCMeta):
 
 class Loader(metaclass=LoaderMetaClass):
     def __init__(self, max_size: tuple[int, int] | None = None, **kwargs: Any) -> None:  # noqa B027
-        self._image: Image.Image | None = None
+        self._image: ImageBuffer | None = None
         self.max_size = max_size
         self.rotations: Sequence[int] = [270, 0]
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}()"
 
-    def load(self, filepath: str) -> Image.Image:
+    def load(self, filepath: str) -> ImageBuffer:
         try:
-            image = get_image(filepath)
-            self._image = self.process(image)
+            self._image = self.process(load_image(filepath))
             return self._image
         except (UnidentifiedImageError, InvalidImageError) as e:
             raise InvalidImageError(filepath) from e
 
-    def process(self, image: Image.Image) -> Image.Image:
+    def process(self, image: ImageBuffer) -> ImageBuffer:
         return image
 
-    def rotate(self, image: Image.Image) -> Generator[tuple[Image.Image, int], None, None]:
+    def rotate(self, image: Image.Image | ImageBuffer) -> Generator[tuple[ImageBuffer, int], None, None]:
+        original = as_buffer(image)
         for angle in self.rotations:
-            if angle == 0:
-                rotated_image = image
-            else:
-                rotated_image = image.rotate(angle, expand=True)
-            self._image = self.process(rotated_image)
+            self._image = self.process(original.rotate(angle))
             yield self._image, angle
 
 
 class PILLoader(Loader):
-    def process(self, image: Image.Image) -> Image.Image:
-        return ImageOps.grayscale(image)
+    def process(self, image: ImageBuffer) -> ImageBuffer:
+        return image.gray()
 
 
 class CV2Loader(Loader):
@@ -62,11 +57,11 @@ class CV2Loader(Loader):
         super().__init__(**kwargs)
         self.threshold = threshold
 
-    def process(self, image: Image.Image) -> Image.Image:
-        gray_image = np.array(image.convert("L"))
+    def process(self, image: ImageBuffer) -> ImageBuffer:
+        gray_image = image.gray().array
 
         _, binary_image = cv2.threshold(gray_image, self.threshold, 255, cv2.THRESH_BINARY)
-        return Image.fromarray(binary_image)
+        return ImageBuffer(binary_image, mode="L", info=image.info)
 
 
 class SmartLoader(Loader):
@@ -75,12 +70,12 @@ class SmartLoader(Loader):
         self.block_size = block_size
         self.c = c
 
-    def process(self, image: Image.Image) -> Image.Image:
-        gray_image = np.array(image.convert("L"))
+    def process(self, image: ImageBuffer) -> ImageBuffer:
+        gray_image = image.gray().array
         binary_image = cv2.adaptiveThreshold(
             gray_image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, self.block_size, self.c
         )
-        return Image.fromarray(binary_image)
+        return ImageBuffer(binary_image, mode="L", info=image.info)
 
 
 class BWLoader(Loader):
@@ -89,12 +84,12 @@ class BWLoader(Loader):
         self.block_size = block_size
         self.c = c
 
-    def process(self, image: Image.Image) -> Image.Image:
-        gray_image = np.array(image.convert("L"))
+    def process(self, image: ImageBuffer) -> ImageBuffer:
+        gray_image = image.gray().array
         binary_image = cv2.adaptiveThreshold(
             gray_image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, self.block_size, self.c
         )
-        return Image.fromarray(binary_image)
+        return ImageBuffer(binary_image, mode="L", info=image.info)
 
 
 class EnhancedLoader(Loader):
@@ -106,10 +101,9 @@ class EnhancedLoader(Loader):
     clean black and white image.
     """
 
-    def process(self, image: Image.Image) -> Image.Image:
+    def process(self, image: ImageBuffer) -> ImageBuffer:
         """Load and process an image to make text more readable."""
-        rgb_image = np.array(image)
-        gray = cv2.cvtColor(rgb_image, cv2.COLOR_BGR2GRAY)
+        gray = image.gray().array
         plt.subplot(2, 3, 2)
         plt.axis("off")
         scale_factor = 2
@@ -123,7 +117,7 @@ class EnhancedLoader(Loader):
         plt.subplot(2, 3, 5)
         plt.axis("off")
         plt.tight_layout()
-        return Image.fromarray(thresh)
+        return ImageBuffer(thresh, mode="L", info=image.info)
 
 
 class ImprovedLoader(Loader):
@@ -141,9 +135,9 @@ class ImprovedLoader(Loader):
         # Ensure blur kernel size is odd
         self.blur_kernel_size = blur_kernel_size if blur_kernel_size % 2 != 0 else blur_kernel_size + 1
 
-    def process(self, image: Image.Image) -> Image.Image:
+    def process(self, image: ImageBuffer) -> ImageBuffer:
         """Load and process an image to make text more readable."""
-        gray = np.array(image.convert("L"))
+        gray = image.gray().array
 
         # Upscale the image for better OCR results on small text
         if self.scale_factor > 1.0:
@@ -157,4 +151,4 @@ class ImprovedLoader(Loader):
         # Apply Otsu's thresholding to automatically find the best threshold
         _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-        return Image.fromarray(thresh)
+        return ImageBuffer(thresh, mode="L", info=image.info)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+from dataclasses import asdict
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from hope_documents.ocr.diff import Match
+from hope_documents.ocr.engine import SearchInfo
+from hope_documents.utils.bundle import open_path, path_stat
+
+logger = logging.getLogger(__name__)
+
+
+def get_version() -> str:
+    try:
+        return version("hope-documents")
+    except PackageNotFoundError:
+        return "dev"
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open_path(path) as f:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dump_search_info(si: SearchInfo | None) -> dict[str, Any] | None:
+    if si is None:
+        return None
+    iterations = [
+        {
+            "loader": iteration["loader"],
+            "angles": [
+                {**attempt, "match": asdict(attempt["match"]) if attempt["match"] else None}
+                for attempt in iteration["angles"]
+            ],
+        }
+        for iteration in si.iterations
+    ]
+    return {
+        "loader": si.loader,
+        "text": si.text,
+        "error": si.error,
+        "time": si.time,
+        "page": si.page,
+        "angle": si.angle,
+        "match": asdict(si.match) if si.match else None,
+        "iterations": iterations,
+    }
+
+
+def load_search_info(data: dict[str, Any] | None) -> SearchInfo | None:
+    if data is None:
+        return None
+    si = SearchInfo(loader=data["loader"], match=Match(**data["match"]) if data["match"] else None, angle=data["angle"])
+    si.text = data["text"]
+    si.error = data["error"]
+    si.time = data["time"]
+    si.page = data.get("page", 1)
+    si.iterations = [
+        {
+            "loader": iteration["loader"],
+            "angles": [
+                {**attempt, "match": Match(**attempt["match"]) if attempt["match"] else None}
+                for attempt in iteration["angles"]
+            ],
+        }
+        for iteration in data["iterations"]
+    ]
+    return si
+
+
+def dump_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Return a JSON serializable copy of a report row."""
+    return {**row, "si": dump_search_info(row["si"])}
+
+
+def load_row(data: dict[str, Any]) -> dict[str, Any]:
+    return {**data, "si": load_search_info(data["si"])}
+
+
+class Manifest:
+    """
+    Inputs and rows of a report, used to only reprocess the changed entries on the next run.
+
+    An entry is reused when the content hash of its file and its expectation row are unchanged;
+    all the entries are discarded when `config` (OCR configuration, report options, library version) changes.
+    The content hash is only recomputed when the size or the modification time of the file changes.
+    """
+
+    def __init__(self, path: Path, config: dict[str, Any]) -> None:
+        self.path = path
+        self.config = {**config, "version": get_version()}
+        self.previous: dict[str, dict[str, Any]] = {}
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.reused = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                logger.warning(f"Invalid manifest {path}, ignored")
+            else:
+                if data.get("config") == self.config:
+                    self.previous = data["entries"]
+
+    def inputs(self, label: str, path: Path, expectation: Any) -> dict[str, Any]:
+        size, mtime = path_stat(path)
+        inputs = {"size": size, "mtime": mtime, "expectation": list(expectation)}
+        previous = self.previous.get(label, {}).get("inputs", {})
+        if previous.get("size") == size and previous.get("mtime") == mtime:
+            inputs["hash"] = previous["hash"]
+        else:
+            inputs["hash"] = file_hash(path)
+        return inputs
+
+    def get(self, label: str, inputs: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the previous row of `label` if its inputs did not change."""
+        previous = self.previous.get(label)
+        if not previous or {**previous["inputs"], "mtime": 0} != {**inputs, "mtime": 0}:
+            return None
+        self.entries[label] = previous
+        self.reused += 1
+        return load_row(previous["row"])
+
+    def set(self, label: str, inputs: dict[str, Any], row: dict[str, Any]) -> None:
+        self.entries[label] = {"inputs": inputs, "row": dump_row(row)}
+
+    def save(self) -> None:
+        """Write the entries of this run, the ones of the files no longer reported are dropped."""
+        self.path.write_text(json.dumps({"config": self.config, "entries": self.entries}), encoding="utf-8")
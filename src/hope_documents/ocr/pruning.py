@@ -0,0 +1,96 @@
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class LoaderUsage:
+    attempts: int = 0
+    # OCR seconds of all the attempts
+    seconds: float = 0.0
+    # searches matched by the loader, by the loader before any other, by the loader only
+    wins: int = 0
+    first: int = 0
+    unique: int = 0
+
+    @property
+    def cost(self) -> float:
+        """Mean seconds of an attempt."""
+        return self.seconds / self.attempts if self.attempts else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "seconds": round(self.seconds, 3),
+            "cost": round(self.cost, 4),
+            "wins": self.wins,
+            "first": self.first,
+            "unique": self.unique,
+        }
+
+
+class LoaderStats:
+    """
+    Record the cost and the contribution of each loader, see `Processor.stats`.
+
+    Each search reports its attempts in order: `(loader, seconds, matched)`.
+    The marginal contribution of a loader (`unique`: the searches only that loader matched)
+    is only meaningful when every loader runs on every document, ie. with `MatchMode.ALL`.
+    """
+
+    def __init__(self) -> None:
+        self.loaders: dict[str, LoaderUsage] = {}
+        self.searches = 0
+        # the loaders that matched, for each solved search
+        self.solutions: list[frozenset[str]] = []
+        self.lock = threading.Lock()
+
+    def record(self, attempts: Sequence[tuple[str, float, bool]]) -> None:
+        winners = [name for name, _, matched in attempts if matched]
+        solved_by = frozenset(winners)
+        with self.lock:
+            self.searches += 1
+            for name, seconds, _ in attempts:
+                usage = self.loaders.setdefault(name, LoaderUsage())
+                usage.attempts += 1
+                usage.seconds += seconds
+            if not winners:
+                return
+            self.solutions.append(solved_by)
+            for name in solved_by:
+                self.loaders[name].wins += 1
+            self.loaders[winners[0]].first += 1
+            if len(solved_by) == 1:
+                self.loaders[winners[0]].unique += 1
+
+    @property
+    def solved(self) -> int:
+        return len(self.solutions)
+
+    def prune(self, coverage: float = 1.0) -> list[str]:
+        """
+        Return the cheapest loaders that solve `coverage` of the solved searches, in trial order.
+
+        Greedy weighted set cover: the next loader is the one solving the most searches not
+        solved yet per second of OCR, which is also the order that gets to the first hit soonest.
+        """
+        pending = list(self.solutions)
+        target = len(pending) * (1.0 - coverage)
+        selected: list[str] = []
+        while len(pending) > target:
+            candidates = {name: usage for name, usage in self.loaders.items() if name not in selected}
+            gains = {name: sum(name in solution for solution in pending) for name in candidates}
+            best = max(candidates, key=lambda n: (gains[n] / (candidates[n].cost or 1e-9), -candidates[n].cost))
+            if not gains[best]:
+                break
+            selected.append(best)
+            pending = [solution for solution in pending if best not in solution]
+        return selected
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "searches": self.searches,
+            "solved": self.solved,
+            "loaders": {name: usage.as_dict() for name, usage in self.loaders.items()},
+        }
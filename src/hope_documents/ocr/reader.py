@@ -6,6 +6,8 @@ from PIL.Image import Image
 from pytesseract import TesseractError
 
 from hope_documents.exceptions import ExtractionError
+from hope_documents.ocr.admission import get_admission
+from hope_documents.utils.image import ImageBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +17,23 @@ class BaseReader:
         logger.debug(config)
         self.config = config
 
-    def extract(self, image: Image) -> str:
+    def extract(self, image: Image | ImageBuffer) -> str:
         raise NotImplementedError()
 
 
 class Reader(BaseReader):
     lang = "eng"
 
-    def extract(self, image: Image) -> str:
+    def __init__(self, config: str, lang: str = "") -> None:
+        super().__init__(config)
+        self.lang = lang or self.lang
+
+    def extract(self, image: Image | ImageBuffer) -> str:
+        # pytesseract converts the array with Image.fromarray itself
+        source = image.data if isinstance(image, ImageBuffer) else image
         try:
-            text = pytesseract.image_to_string(image, lang=self.lang, config=self.config, timeout=10)
+            with get_admission().slot():
+                text = pytesseract.image_to_string(source, lang=self.lang, config=self.config, timeout=10)
             return "\n".join([line for line in text.splitlines() if line])
         except (TesseractError, RuntimeError, TimeoutExpired) as e:
             raise ExtractionError() from e
@@ -0,0 +1,155 @@
+import logging
+import os
+import zlib
+from collections.abc import Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+from hope_documents.exceptions import InvalidImageError
+from hope_documents.utils.bundle import MEMBER_SEPARATOR, get_bundle, is_bundle
+from hope_documents.utils.image import sniff_image
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a `i/n` shard specification, `0 <= i < n`."""
+    try:
+        index, count = (int(v) for v in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/n") from None
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{value}', expected 0 <= i < n")
+    return index, count
+
+
+class Scanner:
+    """
+    Enumerate the files to process from a list of files and directories.
+
+    Directories are walked recursively, only the files with an extension are yielded.
+    Files and directories starting with a dot are skipped unless `hidden` is set.
+    The optional filters are:
+
+    - `extensions`: the file extension (eg. `.png`), case insensitive
+    - `include` / `exclude`: glob patterns matched against the path relative to the scanned
+      directory and against the file name
+    - `mime_types`: the type detected from the magic bytes (see `sniff_image`); `images_only`
+      accepts any image type. Sniffing reads the file, so it runs in the walking threads.
+
+    With `sort` (default) the files of each argument are yielded in path order, otherwise
+    as soon as they are found. `shard=(i, n)` only yields the files whose relative path hashes
+    to `i` modulo `n`: the split is deterministic and independent of the order and of the other files.
+    `workers > 1` walks the directories concurrently, which hides the latency of network file systems.
+    With `archives` the members of the uncompressed tar and of the zip archives are yielded
+    (as `<archive>!/<member>`, see `utils.bundle`) instead of the archives themselves.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *args: Any,
+        extensions: Iterable[str] = (),
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        mime_types: Iterable[str] = (),
+        images_only: bool = False,
+        hidden: bool = False,
+        sort: bool = True,
+        shard: tuple[int, int] | None = None,
+        workers: int = 1,
+        archives: bool = False,
+    ) -> None:
+        self.filepaths = args
+        self.extensions = {e.lower() if e.startswith(".") else f".{e.lower()}" for e in extensions}
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.mime_types = set(mime_types)
+        self.images_only = images_only
+        self.hidden = hidden
+        self.sort = sort
+        self.shard = shard
+        self.workers = workers
+        self.archives = archives
+
+    def accept(self, path: str, relative: str) -> bool:
+        name = os.path.basename(path)
+        if self.extensions and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        if self.include and not any(fnmatch(relative, p) or fnmatch(name, p) for p in self.include):
+            return False
+        if any(fnmatch(relative, p) or fnmatch(name, p) for p in self.exclude):
+            return False
+        if self.shard and zlib.crc32(relative.encode()) % self.shard[1] != self.shard[0]:
+            return False
+        if self.images_only or self.mime_types:
+            mime_type = sniff_image(path)
+            if not mime_type or (self.mime_types and mime_type not in self.mime_types):
+                logger.debug(f"Skipping {path}: {mime_type or 'not an image'}")
+                return False
+        return True
+
+    def members(self, path: str, relative: str) -> list[str]:
+        """Return the accepted members of the archive `path`, its index is built once."""
+        try:
+            bundle = get_bundle(path)
+        except (OSError, InvalidImageError) as e:
+            logger.warning(f"Cannot read {path}: {e}")
+            return []
+        return [
+            f"{path}{MEMBER_SEPARATOR}{name}"
+            for name in bundle
+            if "." in os.path.basename(name)
+            and self.accept(f"{path}{MEMBER_SEPARATOR}{name}", f"{relative}{MEMBER_SEPARATOR}{name}")
+        ]
+
+    def _scan_dir(self, root: str, directory: str) -> tuple[list[str], list[str]]:
+        files, dirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not self.hidden and entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif "." in entry.name and entry.is_file():
+                        relative = Path(os.path.relpath(entry.path, root)).as_posix()
+                        if self.archives and is_bundle(entry.name):
+                            files.extend(self.members(entry.path, relative))
+                        elif self.accept(entry.path, relative):
+                            files.append(entry.path)
+        except OSError as e:
+            logger.warning(f"Cannot scan {directory}: {e}")
+        return files, dirs
+
+    def walk(self, root: str) -> Generator[str, None, None]:
+        """Yield the accepted files of the `root` tree, in no particular order."""
+        if self.workers <= 1:
+            pending = [root]
+            while pending:
+                files, dirs = self._scan_dir(root, pending.pop())
+                yield from files
+                pending.extend(dirs)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan") as executor:
+            futures: set[Future[tuple[list[str], list[str]]]] = {executor.submit(self._scan_dir, root, root)}
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, dirs = future.result()
+                    futures.update(executor.submit(self._scan_dir, root, d) for d in dirs)
+                    yield from files
+
+    @property
+    def files(self) -> Generator[str, None, None]:
+        for arg in self.filepaths:
+            entry = Path(str(arg))
+            if entry.is_dir():
+                found = self.walk(str(entry))
+                yield from sorted(found) if self.sort else found
+            elif self.archives and is_bundle(entry):
+                members = self.members(str(entry), entry.name)
+                yield from sorted(members) if self.sort else members
+            elif self.accept(str(entry), entry.name):
+                yield str(entry)
@@ -0,0 +1,97 @@
+import re
+from typing import TYPE_CHECKING, Any, Self
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from hope_documents.ocr.engine import ScanEntryInfo
+
+
+class ResultStore:
+    """
+    Store of OCR results, consulted by `Processor` before running the OCR.
+
+    Results are keyed by image digest, OCR configuration, loader and angle.
+    """
+
+    def get(self, digest: str, config: str, loader: str, angle: int) -> str | None:
+        raise NotImplementedError()
+
+    def add(self, digest: str, config: str, angle: int, info: "ScanEntryInfo") -> None:
+        raise NotImplementedError()
+
+    def flush(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.flush()
+
+
+class MemoryResultStore(ResultStore):
+    def __init__(self) -> None:
+        self.results: dict[tuple[str, str, str, int], str] = {}
+
+    def get(self, digest: str, config: str, loader: str, angle: int) -> str | None:
+        return self.results.get((digest, config, loader, angle))
+
+    def add(self, digest: str, config: str, angle: int, info: "ScanEntryInfo") -> None:
+        self.results[(digest, config, info.loader, angle)] = info.text
+
+
+# words compared by `same_text`
+WORD = re.compile(r"\w{4,}")
+MIN_WORDS = 3
+
+
+def same_text(text: str, stored: str) -> bool:
+    """Whether `text` reads the same document as `stored`: every word of it is in `stored`."""
+    words = set(WORD.findall(text.upper()))
+    return len(words) >= MIN_WORDS and words <= set(WORD.findall(stored.upper()))
+
+
+class FingerprintIndex:
+    """
+    Index of the fingerprints (see `ImageBuffer.fingerprint`) of the scanned images.
+
+    `Processor` looks up each new image: the digest of a near duplicate is used
+    in place of its own one, so that the stored results of the duplicate are reused.
+
+    The nearest fingerprint is only a candidate. Resizes and re-encodings stay within a few bits,
+    but a 1% crop already moves about 30 bits of 256 and a 2% crop about 50, while unrelated
+    documents can be 20 bits apart. The candidate is confirmed by reading the image with the first
+    loader and comparing the text with the stored one (see `same_text`).
+    """
+
+    def lookup(self, fingerprint: str, max_distance: int) -> str | None:
+        raise NotImplementedError()
+
+    def add(self, fingerprint: str, digest: str) -> None:
+        raise NotImplementedError()
+
+
+class MemoryFingerprintIndex(FingerprintIndex):
+    def __init__(self) -> None:
+        self.digests: list[str] = []
+        self.fingerprints: list[bytes] = []
+        self._matrix: np.ndarray | None = None
+
+    def lookup(self, fingerprint: str, max_distance: int) -> str | None:
+        if not self.digests:
+            return None
+        if self._matrix is None:
+            self._matrix = np.frombuffer(b"".join(self.fingerprints), dtype=np.uint8).reshape(len(self.digests), -1)
+        query = np.frombuffer(bytes.fromhex(fingerprint), dtype=np.uint8)
+        if query.size != self._matrix.shape[1]:
+            return None
+        # Hamming distance from every indexed fingerprint at once
+        distances = np.unpackbits(self._matrix ^ query, axis=1).sum(axis=1)
+        best = int(distances.argmin())
+        return self.digests[best] if distances[best] <= max_distance else None
+
+    def add(self, fingerprint: str, digest: str) -> None:
+        self.digests.append(digest)
+        self.fingerprints.append(bytes.fromhex(fingerprint))
+        self._matrix = None
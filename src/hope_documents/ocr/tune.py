@@ -0,0 +1,209 @@
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from pathlib import Path
+from typing import Any
+
+from hope_documents.exceptions import ExtractionError, InvalidImageError
+from hope_documents.ocr.diff import find_similar
+from hope_documents.ocr.engine import Processor
+from hope_documents.ocr.loaders import Loader, loader_registry
+from hope_documents.utils.image import ImageBuffer, as_buffer
+
+logger = logging.getLogger(__name__)
+
+# the values tried for each parameter of the tunable loaders
+DEFAULT_GRID: dict[str, dict[str, list[Any]]] = {
+    "CV2Loader": {"threshold": [96, 128, 160]},
+    "SmartLoader": {"block_size": [11, 21, 31], "c": [2, 4, 8]},
+    "BWLoader": {"block_size": [11, 21, 31], "c": [2, 4, 8]},
+    "ImprovedLoader": {"scale_factor": [1.0, 1.5, 2.0], "blur_kernel_size": [3, 5, 7]},
+}
+
+
+def iter_candidates(grid: dict[str, dict[str, list[Any]]]) -> list[tuple[str, dict[str, Any]]]:
+    """Return every `(loader, params)` combination of `grid`."""
+    return [
+        (loader, dict(zip(parameters, values, strict=True)))
+        for loader, parameters in grid.items()
+        for values in product(*parameters.values())
+    ]
+
+
+class TuneCache:
+    """
+    OCR results of the tuning runs, saved as JSON: the text and the time of each attempt.
+
+    An attempt is keyed by image digest, OCR config, loader, parameters and angle, so that
+    a new run with a larger grid or corpus only runs the OCR for the new combinations.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self.entries: dict[str, tuple[str, float]] = {}
+        self.hits = 0
+        self.lock = threading.Lock()
+        if path and path.exists():
+            try:
+                self.entries = {k: (v[0], v[1]) for k, v in json.loads(path.read_text(encoding="utf-8")).items()}
+            except (ValueError, IndexError, AttributeError):
+                logger.warning(f"Invalid tune cache {path}, ignored")
+
+    @staticmethod
+    def key(digest: str, config: str, loader: str, params: dict[str, Any], angle: int) -> str:
+        return f"{digest} {config} {loader} {json.dumps(params, sort_keys=True)} {angle}"
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        with self.lock:
+            if (entry := self.entries.get(key)) is not None:
+                self.hits += 1
+            return entry
+
+    def set(self, key: str, text: str, seconds: float) -> None:
+        with self.lock:
+            self.entries[key] = (text, seconds)
+
+    def save(self) -> None:
+        if self.path:
+            with self.lock:
+                self.path.write_text(json.dumps(self.entries), encoding="utf-8")
+
+
+@dataclass
+class TuneResult:
+    loader: str
+    params: dict[str, Any]
+    total: int = 0
+    hits: int = 0
+    attempts: int = 0
+    # OCR seconds, up to the hit or all the angles
+    seconds: float = 0.0
+    missed: list[str] = field(default_factory=list)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+
+    @property
+    def score(self) -> float:
+        """Hits per OCR second."""
+        return self.hits / self.seconds if self.seconds else float(self.hits)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "loader": self.loader,
+            "params": self.params,
+            "total": self.total,
+            "hits": self.hits,
+            "hit_rate": round(self.hit_rate, 4),
+            "attempts": self.attempts,
+            "seconds": round(self.seconds, 3),
+            "score": round(self.score, 4),
+        }
+
+
+class Tuner:
+    """
+    Grid search of the loader parameters on a corpus of images with their expected text.
+
+    Each candidate (a loader with one combination of its parameters) searches the expected
+    text in every image, trying the angles of `processor` in turn as `MatchMode.FIRST` does.
+    Candidates are ranked by hits per OCR second, so that a setting that finds the text
+    slightly less often but much faster can win. The images are processed by `workers` threads;
+    each image is decoded once for all the candidates.
+    """
+
+    def __init__(
+        self,
+        processor: Processor,
+        grid: dict[str, dict[str, list[Any]]] | None = None,
+        cache: TuneCache | None = None,
+        workers: int = 4,
+        max_errors: int = 5,
+    ) -> None:
+        self.processor = processor
+        self.grid = DEFAULT_GRID if grid is None else grid
+        by_name = {loader.__name__: loader for loader in loader_registry}
+        if unknown := [name for name in self.grid if name not in by_name]:
+            raise ValueError(f"Unknown loaders: {', '.join(unknown)}")
+        self.candidates = iter_candidates(self.grid)
+        self.loaders: list[Loader] = [
+            by_name[name](**{**processor.cv2_config.options(name), **params}) for name, params in self.candidates
+        ]
+        self.cache = cache or TuneCache()
+        self.workers = workers
+        self.max_errors = max_errors
+
+    def _attempt(self, image: ImageBuffer, digest: str, index: int, angle: int) -> tuple[str, float]:
+        name, params = self.candidates[index]
+        key = self.cache.key(digest, self.processor.config_key, name, params, angle)
+        if (cached := self.cache.get(key)) is not None:
+            return cached
+        start = time.perf_counter()
+        try:
+            text = self.processor.reader.extract(self.loaders[index].process(image.rotate(angle)))
+        except (InvalidImageError, ExtractionError) as e:
+            logger.debug(f"{name} {params}: {e}")
+            text = ""
+        seconds = time.perf_counter() - start
+        self.cache.set(key, text, seconds)
+        return text, seconds
+
+    def evaluate(self, path: str, target: str) -> list[tuple[bool, int, float]]:
+        """Return `(hit, attempts, seconds)` of each candidate on the image `path`."""
+        # the first page, as the expectations are per file
+        image = as_buffer(self.processor.load(path))
+        digest = image.digest
+        results = []
+        for index in range(len(self.candidates)):
+            hit, attempts, seconds = False, 0, 0.0
+            for angle in self.processor.get_rotations(image):
+                text, elapsed = self._attempt(image, digest, index, angle)
+                attempts += 1
+                seconds += elapsed
+                if find_similar(target, text, max_distance=self.max_errors):
+                    hit = True
+                    break
+            results.append((hit, attempts, seconds))
+        return results
+
+    def run(self, samples: Iterable[tuple[str, str]]) -> list[TuneResult]:
+        """Evaluate the candidates on `samples` (`(path, expected text)`), best first."""
+        results = [TuneResult(name, params) for name, params in self.candidates]
+        samples = list(samples)
+
+        def evaluate(sample: tuple[str, str]) -> list[tuple[bool, int, float]] | None:
+            try:
+                return self.evaluate(*sample)
+            except (OSError, InvalidImageError) as e:
+                logger.warning(f"Skipping {sample[0]}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tune") as executor:
+            for (path, _), outcome in zip(samples, executor.map(evaluate, samples), strict=True):
+                if outcome is None:
+                    continue
+                for result, (hit, attempts, seconds) in zip(results, outcome, strict=True):
+                    result.total += 1
+                    result.hits += hit
+                    result.attempts += attempts
+                    result.seconds += seconds
+                    if not hit:
+                        result.missed.append(path)
+        self.cache.save()
+        return sorted(results, key=lambda r: (-r.score, -r.hit_rate, r.seconds))
+
+
+def best_config(results: Sequence[TuneResult]) -> dict[str, dict[str, Any]]:
+    """Return the best parameters of each loader, in the `CV2Config(loaders=...)` format."""
+    best: dict[str, TuneResult] = {}
+    for result in results:
+        current = best.get(result.loader)
+        if current is None or (result.score, result.hit_rate) > (current.score, current.hit_rate):
+            best[result.loader] = result
+    return {name: result.params for name, result in best.items()}
@@ -0,0 +1,209 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import shutil
+import sys
+import time
+from collections.abc import Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from hope_documents.exceptions import DocumentError, InvalidImageError
+from hope_documents.ocr.engine import OCRProfile, Processor, ScanEntryInfo
+from hope_documents.ocr.scanner import Scanner
+from hope_documents.utils.bundle import path_stat
+from hope_documents.utils.image import iter_pages
+
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+
+class Notifier:
+    """Wait for the creation of files in `directories` (not their subdirectories) with Linux inotify."""
+
+    def __init__(self, directories: Iterable[str]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        for directory in directories:
+            if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        """Return True if some event happened within `timeout` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            # the events are only a wake-up call, the directories are scanned anyway
+            with suppress(BlockingIOError):
+                while os.read(self.fd, 65536):
+                    pass
+        return bool(ready)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def get_notifier(directories: Iterable[str]) -> Notifier | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return Notifier(directories)
+    except (OSError, AttributeError) as e:
+        logger.info(f"inotify not available ({e}), polling")
+        return None
+
+
+class Watcher:
+    """
+    Poll the files of `scanner` and return the new or modified ones once completely written.
+
+    A file is ready when its size and modification time did not change for `settle` seconds,
+    so that the files still being written (or copied) are not processed. Files are returned
+    once, unless they change again. The directories are scanned every `interval` seconds;
+    where inotify is available a new file in a watched directory triggers a scan at once.
+    """
+
+    def __init__(self, scanner: Scanner, interval: float = 2.0, settle: float = 1.0) -> None:
+        self.scanner = scanner
+        self.interval = interval
+        self.settle = settle
+        self.seen: dict[str, tuple[int, int]] = {}
+        self.unsettled: dict[str, tuple[tuple[int, int], float]] = {}
+        self.notifier = get_notifier(str(p) for p in scanner.filepaths if Path(str(p)).is_dir())
+
+    def poll(self) -> list[str]:
+        now = time.monotonic()
+        ready = []
+        current = set()
+        for path in self.scanner.files:
+            try:
+                signature = path_stat(path)
+            except (OSError, KeyError):
+                continue
+            current.add(path)
+            if self.seen.get(path) == signature:
+                continue
+            previous = self.unsettled.get(path)
+            if not previous or previous[0] != signature:
+                self.unsettled[path] = (signature, now)
+            elif now - previous[1] >= self.settle:
+                del self.unsettled[path]
+                self.seen[path] = signature
+                ready.append(path)
+        # forget the files moved away, so that a new file with the same name is processed
+        self.seen = {p: s for p, s in self.seen.items() if p in current}
+        self.unsettled = {p: s for p, s in self.unsettled.items() if p in current}
+        return ready
+
+    @property
+    def timeout(self) -> float:
+        """Seconds until the next scan is due."""
+        return min(self.interval, self.settle) if self.unsettled else self.interval
+
+    def wait(self, timeout: float) -> None:
+        if self.notifier:
+            self.notifier.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def close(self) -> None:
+        if self.notifier:
+            self.notifier.close()
+            self.notifier = None
+
+
+@dataclass
+class WatchResult:
+    path: str
+    entries: list[ScanEntryInfo] = field(default_factory=list)
+    # digest of the pixels of each page
+    digests: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> bool:
+        return not self.entries or any(e.error for e in self.entries)
+
+
+def failed_result(path: str, error: BaseException) -> WatchResult:
+    entry = ScanEntryInfo(loader="")
+    entry.error = f"{error.__class__.__name__}: {error}"
+    return WatchResult(path, [entry])
+
+
+def extract_file(processor: Processor, path: str) -> WatchResult:
+    worker = processor.with_profile(OCRProfile())
+    try:
+        pages = iter_pages(worker.load(path))
+    except InvalidImageError:
+        # `process` reports the error of each loader
+        return WatchResult(path, list(worker.process(path)))
+    except OSError as e:
+        return failed_result(path, e)
+    result = WatchResult(path)
+    for page in range(1, len(pages) + 1):
+        try:
+            image = pages[page - 1]
+        except InvalidImageError as e:
+            entry = failed_result(path, e).entries[0]
+            entry.page = page
+            result.entries.append(entry)
+            continue
+        result.digests[page] = image.digest
+        for entry in worker.process(image):
+            entry.page = page
+            result.entries.append(entry)
+    return result
+
+
+def watch_files(
+    processor: Processor, watcher: Watcher, workers: int = 4, once: bool = False
+) -> Generator[WatchResult, None, None]:
+    """
+    Extract the text of the files returned by `watcher` and yield the results as they complete.
+
+    The files are processed by a pool of `workers` threads that lives as long as the watch.
+    With `once`, return when the files present at start (and those appeared meanwhile) are processed.
+    """
+    pending: dict[Future[WatchResult], str] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="watch") as executor:
+        while True:
+            pending.update((executor.submit(extract_file, processor, path), path) for path in watcher.poll())
+            if once and not pending and not watcher.unsettled:
+                return
+            if pending:
+                done, __ = wait(pending, timeout=watcher.timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except DocumentError as e:
+                        result = failed_result(path, e)
+                    except Exception as e:  # noqa: BLE001
+                        # one bad file must not stop the watch
+                        logger.exception(f"{path}: {e}")
+                        result = failed_result(path, e)
+                    yield result
+            else:
+                watcher.wait(watcher.timeout)
+
+
+def move_aside(path: str, directory: str) -> Path:
+    """Move `path` into `directory`, a numeric suffix is added if the name is already taken."""
+    source = Path(path)
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    target = Path(directory) / source.name
+    counter = 1
+    while target.exists():
+        target = Path(directory) / f"{source.stem}.{counter}{source.suffix}"
+        counter += 1
+    shutil.move(source, target)
+    return target
@@ -0,0 +1,152 @@
+import io
+import mmap
+import os
+import struct
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, cast
+
+from hope_documents.exceptions import InvalidImageError
+
+# `<archive>!/<member>` addresses a member of a bundle
+MEMBER_SEPARATOR = "!/"
+BUNDLE_EXTENSIONS = (".tar", ".zip")
+ZIP_LOCAL_HEADER = b"PK\x03\x04"
+ZIP_LOCAL_HEADER_SIZE = 30
+
+
+class MemberReader(io.BufferedIOBase):
+    """Read-only, seekable file over a slice of a memory map: reads copy only the requested bytes."""
+
+    def __init__(self, view: memoryview, name: str = "") -> None:
+        super().__init__()
+        self.view = view
+        self.name = name
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self.position, os.SEEK_END: len(self.view)}[whence]
+        self.position = max(0, base + offset)
+        return self.position
+
+    def read(self, size: int | None = -1) -> bytes:
+        end = len(self.view) if size is None or size < 0 else min(len(self.view), self.position + size)
+        data = self.view[self.position : end].tobytes()
+        self.position = max(self.position, end)
+        return data
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+class Bundle:
+    """
+    An uncompressed tar or a zip archive, read in place through a memory map.
+
+    The offsets of the members are indexed once, when the bundle is opened, then the members
+    are read straight from the mapped file: nothing is extracted nor copied as a whole.
+    Deflated zip members are decompressed in memory; compressed tar archives are not supported.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        self.members: dict[str, tuple[int, int]] = {}
+        self.zip: zipfile.ZipFile | None = None
+        with Path(path).open("rb") as f:
+            try:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise InvalidImageError(f"{path}: empty archive") from e
+        if zipfile.is_zipfile(self.path):
+            self._index_zip()
+        else:
+            self._index_tar()
+
+    def _index_tar(self) -> None:
+        try:
+            with tarfile.open(self.path, "r:") as tar:
+                for member in tar:
+                    if member.isfile():
+                        self.members[member.name] = (member.offset_data, member.size)
+        except tarfile.ReadError as e:
+            raise InvalidImageError(f"{self.path}: not an uncompressed tar or a zip archive") from e
+
+    def _index_zip(self) -> None:
+        self.zip = zipfile.ZipFile(self.path)
+        for info in self.zip.infolist():
+            if info.is_dir():
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                # read through `zipfile`
+                self.members[info.filename] = (-1, info.file_size)
+                continue
+            offset = info.header_offset
+            if self.mmap[offset : offset + 4] != ZIP_LOCAL_HEADER:
+                raise InvalidImageError(f"{self.path}: invalid zip member {info.filename}")
+            name_length, extra_length = struct.unpack_from("<HH", self.mmap, offset + 26)
+            self.members[info.filename] = (offset + ZIP_LOCAL_HEADER_SIZE + name_length + extra_length, info.file_size)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.members)
+
+    def size(self, name: str) -> int:
+        return self.members[name][1]
+
+    def open(self, name: str) -> IO[bytes]:
+        try:
+            offset, size = self.members[name]
+        except KeyError:
+            raise FileNotFoundError(f"{self.path}{MEMBER_SEPARATOR}{name}") from None
+        if offset < 0 and self.zip:
+            return io.BytesIO(self.zip.read(name))
+        view = memoryview(self.mmap)[offset : offset + size]
+        reader = MemberReader(view, name=f"{self.path}{MEMBER_SEPARATOR}{name}")
+        # `io.BufferedIOBase` implements the `IO[bytes]` protocol, typeshed just does not declare it
+        return cast("IO[bytes]", reader)
+
+
+@lru_cache(maxsize=32)
+def get_bundle(path: str) -> Bundle:
+    """Return the `Bundle` of `path`, indexed once and kept open for the next members."""
+    return Bundle(path)
+
+
+def is_bundle(path: str | Path) -> bool:
+    return str(path).lower().endswith(BUNDLE_EXTENSIONS)
+
+
+def split_member(path: str | Path) -> tuple[str, str] | None:
+    """Return the archive and the member name of a `<archive>!/<member>` path, None for a plain path."""
+    archive, sep, member = str(path).partition(MEMBER_SEPARATOR)
+    return (archive, member) if sep else None
+
+
+def open_path(path: str | Path) -> IO[bytes]:
+    """Open a file or a bundle member for reading."""
+    if member := split_member(path):
+        return get_bundle(member[0]).open(member[1])
+    return Path(path).open("rb")
+
+
+def path_stat(path: str | Path) -> tuple[int, int]:
+    """Return the size and the modification time (ns) of a file or a bundle member (the time of its archive)."""
+    if member := split_member(path):
+        archive, name = member
+        return get_bundle(archive).size(name), os.stat(archive).st_mtime_ns
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
@@ -1,13 +1,189 @@
 import base64
+import hashlib
+import math
+from collections.abc import Generator
+from dataclasses import dataclass, field
 from io import BufferedReader, BytesIO
 from pathlib import Path
+from typing import IO, Any
 
-from PIL import Image, UnidentifiedImageError
+import cv2
+import numpy as np
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
 
 from hope_documents.exceptions import InvalidImageError
+from hope_documents.utils.bundle import open_path, split_member
 
+GRAYSCALE_MODES = ("1", "L", "LA", "La", "I", "I;16", "F")
+FINGERPRINT_SIZE = 16
+# modes supported by `Image.reduce`
+REDUCE_MODES = ("L", "LA", "RGB", "RGBA", "CMYK", "I", "F")
+# magic bytes of the image formats, WEBP is checked apart (RIFF container)
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"BM", "image/bmp"),
+)
 
-def get_image_base64(input_data: Path | Image.Image | BufferedReader) -> str:
+
+@dataclass(eq=False)
+class ImageBuffer:
+    """A decoded image held as a NumPy array ("L" or "RGB")."""
+
+    data: np.ndarray
+    mode: str = "RGB"
+    info: dict[str, Any] = field(default_factory=dict)
+    _gray: "ImageBuffer | None" = field(default=None, repr=False)
+    _rotation: "tuple[ImageBuffer, int] | None" = field(default=None, repr=False)
+
+    @classmethod
+    def from_pil(cls, image: Image.Image, max_size: int | None = None) -> "ImageBuffer":
+        """Decode `image`, at a reduced size if it is larger than `max_size` (see `reduce_image`)."""
+        scale = 1.0
+        if max_size and max(image.size) > max_size:
+            image, scale = reduce_image(image, max_size)
+        # phone photos are often stored rotated, with the EXIF orientation telling how to display them
+        orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+        if orientation != 1:
+            image = ImageOps.exif_transpose(image)
+        if "A" in image.getbands():
+            # flatten transparency on a white background, as tesseract would do
+            mode = "L" if image.mode in GRAYSCALE_MODES else "RGB"
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            image = background.convert(mode)
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("L" if image.mode in GRAYSCALE_MODES else "RGB")
+        info = {str(k): v for k, v in image.info.items()}
+        if scale != 1.0:
+            info["decode_scale"] = scale
+        if orientation != 1:
+            # the EXIF orientation applied, the buffer is upright
+            info["exif_orientation"] = orientation
+        return cls(np.asarray(image), mode=image.mode, info=info)
+
+    @property
+    def oriented(self) -> bool:
+        """Whether the image was turned upright from its EXIF orientation."""
+        return "exif_orientation" in self.info
+
+    @property
+    def size(self) -> tuple[int, int]:
+        height, width = self.data.shape[:2]
+        return width, height
+
+    @property
+    def digest(self) -> str:
+        """Return the SHA-256 of the pixels, stable across re-encodings of the same image."""
+        h = hashlib.sha256(f"{self.mode}:{self.data.shape}".encode())
+        h.update(self.array)
+        return h.hexdigest()
+
+    def fingerprint(self, hash_size: int = FINGERPRINT_SIZE) -> str:
+        """Return the difference hash (dHash) of the image as a hex string."""
+        small = cv2.resize(self.gray().array, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+        return np.packbits(small[:, 1:] > small[:, :-1]).tobytes().hex()
+
+    @property
+    def array(self) -> np.ndarray:
+        """Return the pixels as a C-contiguous array, as required by OpenCV."""
+        return np.ascontiguousarray(self.data)
+
+    def gray(self) -> "ImageBuffer":
+        if self.mode == "L":
+            return self
+        if self._gray is None:
+            if self._rotation:
+                parent, k = self._rotation
+                self._gray = ImageBuffer(np.rot90(parent.gray().data, k), mode="L", info=self.info)
+            else:
+                self._gray = ImageBuffer(cv2.cvtColor(self.array, cv2.COLOR_RGB2GRAY), mode="L", info=self.info)
+        return self._gray
+
+    def rotate(self, angle: int) -> "ImageBuffer":
+        """Rotate counter-clockwise, expanding the canvas like `Image.rotate(angle, expand=True)`."""
+        if angle % 360 == 0:
+            return self
+        if angle % 90 == 0:
+            k = (angle // 90) % 4
+            return ImageBuffer(np.rot90(self.data, k), mode=self.mode, info=self.info, _rotation=(self, k))
+        return ImageBuffer.from_pil(self.to_pil().rotate(angle, expand=True))
+
+    def to_pil(self) -> Image.Image:
+        return Image.fromarray(self.array)
+
+
+def fingerprint_distance(fingerprint1: str, fingerprint2: str) -> int:
+    return (int(fingerprint1, 16) ^ int(fingerprint2, 16)).bit_count()
+
+
+def reduce_image(image: Image.Image, max_size: int) -> tuple[Image.Image, float]:
+    """Return `image` reduced by the largest integer factor that keeps it >= `max_size`, and the factor."""
+    width, height = image.size
+    ratio = max_size / max(width, height)
+    if image.format == "JPEG":
+        image.draft(image.mode, (math.ceil(width * ratio), math.ceil(height * ratio)))
+    if (factor := max(image.size) // max_size) > 1:
+        if image.mode not in REDUCE_MODES:
+            image = image.convert("L" if image.mode in GRAYSCALE_MODES else "RGBA")
+        image = image.reduce(factor)
+    return image, width / image.width
+
+
+class ImagePages:
+    """The pages of a multi-frame image, decoded one at a time."""
+
+    def __init__(self, image: Image.Image, max_size: int | None = None) -> None:
+        self.image = image
+        self.max_size = max_size
+        self._first: ImageBuffer | None = None
+
+    def __len__(self) -> int:
+        return getattr(self.image, "n_frames", 1)
+
+    def page(self, index: int) -> ImageBuffer:
+        try:
+            self.image.seek(index)
+            return ImageBuffer.from_pil(self.image, max_size=self.max_size)
+        except (EOFError, OSError, ValueError) as e:
+            # ValueError: a truncated frame ("buffer is not large enough")
+            raise InvalidImageError(f"{getattr(self.image, 'filename', '') or 'image'} page {index + 1}") from e
+
+    @property
+    def first(self) -> ImageBuffer:
+        if self._first is None:
+            self._first = self.page(0)
+        return self._first
+
+    def __getitem__(self, index: int) -> ImageBuffer:
+        return self.first if index == 0 else self.page(index)
+
+    def __iter__(self) -> Generator[ImageBuffer, None, None]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def iter_pages(image: "ImageBuffer | ImagePages") -> "ImagePages | tuple[ImageBuffer]":
+    return image if isinstance(image, ImagePages) else (image,)
+
+
+def as_buffer(image: "Image.Image | ImageBuffer | ImagePages") -> ImageBuffer:
+    """Return the decoded image, the first page of a multi-frame one."""
+    if isinstance(image, ImageBuffer):
+        return image
+    if isinstance(image, ImagePages):
+        return image.first
+    return ImageBuffer.from_pil(image)
+
+
+def get_image_base64(input_data: Path | Image.Image | ImageBuffer | BufferedReader) -> str:
+    if isinstance(input_data, ImageBuffer):
+        input_data = input_data.to_pil()
     if isinstance(input_data, Path | str):
         image_data = Path(input_data).read_bytes()
     elif isinstance(input_data, Image.Image):
@@ -28,8 +204,69 @@ def get_image_base64(input_data: Path | Image.Image | BufferedReader) -> str:
     return f"data:{image_content_type};base64,{base64_string}"
 
 
-def get_image(filepath: str) -> Image.Image:
+def get_thumbnail_base64(
+    image: "Image.Image | ImageBuffer | ImagePages", max_size: int = 320, image_format: str = "JPEG"
+) -> str:
+    """Return a data URI of the image scaled down to fit in `max_size` x `max_size`."""
+    buffer = as_buffer(image)
+    width, height = buffer.size
+    scale = min(1.0, max_size / max(width, height, 1))
+    data = buffer.array
+    if scale < 1.0:
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        data = cv2.resize(data, size, interpolation=cv2.INTER_AREA)
+    image_file = BytesIO()
+    Image.fromarray(data).save(image_file, format=image_format, quality=75)
+    base64_string = base64.b64encode(image_file.getvalue()).decode("utf-8")
+    return f"data:image/{image_format.lower()};base64,{base64_string}"
+
+
+def sniff_image(filepath: str | Path) -> str | None:
+    """Return the MIME type of the image in `filepath` from its magic bytes, None if it is not an image."""
     try:
+        with open_path(filepath) as f:
+            header = f.read(16)
+    except (OSError, InvalidImageError):
+        return None
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    return None
+
+
+def get_image(filepath: str | Path | IO[bytes]) -> Image.Image:
+    """Open `filepath` (a path, a bundle member `<archive>!/<member>` or a file), the pixels are decoded on use."""
+    try:
+        if isinstance(filepath, str | Path) and split_member(filepath):
+            return Image.open(open_path(filepath))
         return Image.open(filepath)
     except UnidentifiedImageError as e:
-        raise InvalidImageError(filepath) from e
+        raise InvalidImageError(str(getattr(filepath, "name", filepath))) from e
+
+
+def load_pages(
+    source: "str | Path | IO[bytes] | Image.Image | ImageBuffer | ImagePages", max_size: int | None = None
+) -> "ImageBuffer | ImagePages":
+    """Like `load_image`, but multi-frame images are returned as `ImagePages`."""
+    if isinstance(source, ImageBuffer | ImagePages):
+        return source
+    image = source if isinstance(source, Image.Image) else get_image(source)
+    if getattr(image, "n_frames", 1) > 1:
+        return ImagePages(image, max_size=max_size)
+    try:
+        return ImageBuffer.from_pil(image, max_size=max_size)
+    except OSError as e:
+        raise InvalidImageError(str(getattr(source, "name", source))) from e
+
+
+def load_image(source: "str | Path | IO[bytes] | Image.Image | ImageBuffer") -> ImageBuffer:
+    """Decode `source` once, the returned buffer can be shared by all the loaders."""
+    if isinstance(source, Image.Image | ImageBuffer):
+        return as_buffer(source)
+    image = get_image(source)
+    try:
+        return ImageBuffer.from_pil(image)
+    except OSError as e:
+        raise InvalidImageError(str(getattr(source, "name", source))) from e
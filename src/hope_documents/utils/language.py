@@ -1,3 +1,4 @@
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 
@@ -8,3 +9,24 @@ def fqn(obj: Any) -> str:
 
 def parse_bool(v: Any) -> bool:
     return v in ["True", "true", "1", True, "y", "Y", "yes", "Yes"]
+
+
+class Peekable[T](Iterator[T]):
+    """Iterator that can tell whether more items are available without losing them."""
+
+    def __init__(self, iterable: Iterable[T]) -> None:
+        self._iterator = iter(iterable)
+        self._head: list[T] = []
+
+    def __next__(self) -> T:
+        if self._head:
+            return self._head.pop()
+        return next(self._iterator)
+
+    def has_next(self) -> bool:
+        if not self._head:
+            try:
+                self._head.append(next(self._iterator))
+            except StopIteration:
+                return False
+        return True
@@ -11,16 +11,18 @@ class Timer:
     def __init__(self) -> None:
         self.start = time.process_time()
         self.elapsed = 0.0
+        self.stopped = False
 
     def stop(self) -> None:
         self.elapsed = time.process_time() - self.start
+        self.stopped = True
 
     def get_partial(self) -> float:
         return time.process_time() - self.start
 
     @property
     def human(self) -> str:
-        return format_elapsed_time(self.elapsed)
+        return format_elapsed_time(self.elapsed if self.stopped else self.get_partial())
 
 
 @contextmanager
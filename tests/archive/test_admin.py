@@ -1,9 +1,13 @@
 from pathlib import Path
+from unittest import mock
 
 import pytest
+from demo.factories import get_factory_for_model
 from django.urls import reverse
 from webtest import Upload
 
+from hope_documents.archive.models import DocumentRule
+from hope_documents.ocr import admission
 from hope_documents.ocr.engine import MatchMode
 
 
@@ -51,6 +55,21 @@ def test_scan_image_search_not_found(django_app, admin_user, document1):
     assert b"Text not found" in res.content
 
 
+def test_scan_image_default_rule(django_app, admin_user, document1):
+    # the default number_regex `.*` cannot extract a number: the document is only processed
+    rule = get_factory_for_model(DocumentRule)()
+    assert rule.number_pattern is None
+    url = reverse("admin:archive_documentrule_scan_image")
+    res = django_app.get(url, user=admin_user)
+    res.forms["scan-form"]["image"] = document1
+    res.forms["scan-form"]["rule"] = rule.pk
+    with mock.patch("pytesseract.image_to_string", return_value="REPUBBLICA ITALIANA"):
+        res = res.forms["scan-form"].submit()
+    assert res.status_code == 200
+    assert b"Document processed" in res.content
+    assert b"Text found" not in res.content
+
+
 def test_scan_image_form_invalid(django_app, admin_user, document1):
     url = reverse("admin:archive_documentrule_scan_image")
 
@@ -70,3 +89,57 @@ def test_scan_image_search_all(django_app, admin_user, document1):
     res = res.forms["scan-form"].submit()
     assert res.status_code == 200
     assert b"Text found" in res.content
+
+
+def test_scan_image_detect(django_app, admin_user, document1):
+    rule = get_factory_for_model(DocumentRule)()
+    rule.match_regex = "PATENTE"
+    rule.save()
+    url = reverse("admin:archive_documentrule_scan_image")
+
+    res = django_app.get(url, user=admin_user)
+    res.forms["scan-form"]["image"] = document1
+    res.forms["scan-form"]["detect"] = True
+    with mock.patch("pytesseract.image_to_string", return_value="PATENTE DI GUIDA"):
+        res = res.forms["scan-form"].submit()
+    assert res.status_code == 200
+    assert str(rule.country) in res.pyquery("#candidates").text()
+
+
+@pytest.mark.parametrize(("target", "message"), [("", b"results in"), ("MO1699252K", b"Text found")])
+def test_scan_image_stream(django_app, admin_user, document1, target, message):
+    url = reverse("admin:archive_documentrule_scan_image")
+
+    res = django_app.get(url, user=admin_user)
+    res.forms["scan-form"]["image"] = document1
+    res.forms["scan-form"]["target"] = target
+    res.forms["scan-form"]["mode"] = MatchMode.ALL.value
+    res.forms["scan-form"]["stream"] = True
+    res.forms["scan-form"]["detect"] = True
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        res = res.forms["scan-form"].submit()
+    assert res.status_code == 200
+    assert res.headers["X-Accel-Buffering"] == "no"
+    assert message in res.content
+    assert b"Detected:" in res.content
+    assert len(res.pyquery("textarea")) > 1
+
+
+def test_scan_image_busy(django_app, admin_user, document1, monkeypatch):
+    monkeypatch.setattr(admission, "admission", admission.Admission(max_concurrent=1, max_waiting=1))
+    admission.admission.waiting = 1
+    url = reverse("admin:archive_documentrule_scan_image")
+    res = django_app.get(url, user=admin_user)
+    res.forms["scan-form"]["image"] = document1
+    res = res.forms["scan-form"].submit(expect_errors=True)
+    assert res.status_code == 503
+    assert b"OCR busy" in res.content
+
+    res = django_app.get(reverse("admin:archive_documentrule_ocr_metrics"), user=admin_user)
+    assert res.json["waiting"] == 1
+
+
+def test_ocr_metrics_permission(django_app, django_user_model, db):
+    user = django_user_model.objects.create_user("user", password="password", is_staff=True)
+    res = django_app.get(reverse("admin:archive_documentrule_ocr_metrics"), user=user, expect_errors=True)
+    assert res.status_code == 403
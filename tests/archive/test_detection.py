@@ -0,0 +1,73 @@
+import pytest
+from demo.factories import get_factory_for_model
+from django.utils import timezone
+
+from hope_documents.archive import detection
+from hope_documents.archive.detection import Detector, detect, get_detector
+from hope_documents.archive.models import Country, DocumentRule, DocumentType
+
+
+@pytest.fixture
+def rules(db):
+    countries = get_factory_for_model(Country).create_batch(2)
+    types = get_factory_for_model(DocumentType).create_batch(2)
+    return [
+        DocumentRule.objects.create(country=countries[0], type=types[0], match_regex=r"PATENTE"),
+        DocumentRule.objects.create(country=countries[0], type=types[1], match_regex=r"(?i)carta d.identit."),
+        DocumentRule.objects.create(country=countries[1], type=types[1], match_regex=r"CARTE"),
+        DocumentRule.objects.create(country=countries[1], type=types[0], match_regex=r".*"),
+    ]
+
+
+def test_detector(rules):
+    detector = Detector(rules)
+    assert len(detector.rules) == 3
+    candidates = detector.detect("PATENTE DI GUIDA\nCarta d'identità PATENTE")
+    assert [c.rule for c in candidates] == [rules[0], rules[1]]
+    assert candidates[0].hits == 2
+    assert candidates[1].first == "Carta d'identità"
+    assert detector.detect("nothing") == []
+
+
+def test_detector_hits(db):
+    country = get_factory_for_model(Country)()
+    types = get_factory_for_model(DocumentType).create_batch(3)
+    rules = [
+        DocumentRule.objects.create(country=country, type=types[0], match_regex=r"CARTA.*"),
+        DocumentRule.objects.create(country=country, type=types[1], match_regex=r"\w+"),
+        DocumentRule.objects.create(country=country, type=types[2], match_regex=r"CARTA"),
+    ]
+    candidates = {c.rule: c for c in Detector(rules).detect("CARTA IDENTITA\nCARTA")}
+    # non-overlapping matches, not one per start offset
+    assert candidates[rules[0]].hits == 2
+    assert candidates[rules[0]].first == "CARTA IDENTITA"
+    assert candidates[rules[1]].hits == 3
+    # matches at the same positions as the other rules
+    assert candidates[rules[2]].hits == 2
+
+
+def test_detector_empty():
+    assert Detector([]).detect("PATENTE") == []
+
+
+def test_detect_is_cached(rules, django_assert_num_queries):
+    detection.reset_detector()
+    with django_assert_num_queries(2):
+        assert detect(["CARTE", "CARTE"])[0].hits == 2
+    # only the rules version is read
+    with django_assert_num_queries(2):
+        assert get_detector() is get_detector()
+
+    rules[2].match_regex = "NOPE"
+    rules[2].save()
+    assert detect(["CARTE"]) == []
+    rules[0].delete()
+    assert detect(["PATENTE"]) == []
+
+
+def test_detect_other_process(rules):
+    detector = get_detector()
+    # a change made by another process: no signal in this one
+    DocumentRule.objects.filter(pk=rules[2].pk).update(match_regex="NOPE", updated=timezone.now())
+    assert get_detector() is not detector
+    assert detect(["CARTE"]) == []
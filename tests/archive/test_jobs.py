@@ -0,0 +1,130 @@
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from webtest import Upload
+
+from hope_documents.archive.jobs import STALE_TIMEOUT, claim_job, run_worker
+from hope_documents.archive.models import ScanJob
+from hope_documents.ocr.engine import MatchMode
+
+
+@pytest.fixture
+def document1(images_dir):
+    image_file = Path(images_dir / "ita/dl1.png")
+    with image_file.open("b+r") as f:
+        return Upload(str(image_file.absolute()), f.read(), "image/png")
+
+
+@pytest.fixture
+def ocr():
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K") as m:
+        yield m
+
+
+def submit(django_app, admin_user, document, target=""):
+    url = reverse("admin:archive_documentrule_scan_image")
+    res = django_app.get(url, user=admin_user)
+    res.forms["scan-form"]["image"] = document
+    res.forms["scan-form"]["target"] = target
+    res.forms["scan-form"]["mode"] = MatchMode.ALL.value
+    res.forms["scan-form"]["background"] = True
+    return res.forms["scan-form"].submit()
+
+
+@pytest.mark.parametrize("target", ["", "MO1699252K"])
+def test_scan_image_background(django_app, admin_user, document1, ocr, target):
+    res = submit(django_app, admin_user, document1, target)
+    assert res.status_code == 302
+    job = ScanJob.objects.get()
+    assert job.status == ScanJob.Status.QUEUED
+    assert not ocr.called
+
+    res = res.follow()
+    assert b'http-equiv="refresh"' in res.content
+
+    assert run_worker(once=True) == 1
+    job.refresh_from_db()
+    assert job.status == ScanJob.Status.DONE
+    assert job.results
+    assert all(r["error"] == "" for r in job.results)
+
+    res = django_app.get(reverse("admin:archive_scanjob_change", args=[job.pk]), user=admin_user)
+    assert b'http-equiv="refresh"' not in res.content
+    res = django_app.get(reverse("admin:archive_scanjob_progress", args=[job.pk]), user=admin_user)
+    assert res.json["completed"]
+    assert len(res.json["results"]) == len(job.results)
+    assert job.owner == admin_user
+
+
+def test_scan_job_progress_owner(django_app, admin_user, django_user_model, db):
+    job = ScanJob.objects.create(filename="a.png", image=b"", options={"target": "", **OPTIONS}, owner=admin_user)
+    url = reverse("admin:archive_scanjob_progress", args=[job.pk])
+    user = django_user_model.objects.create_user("user", password="password", is_staff=True)
+    # no permission
+    assert django_app.get(url, user=user, expect_errors=True).status_code == 403
+    user.user_permissions.add(Permission.objects.get(codename="view_scanjob"))
+    # the job of another user
+    assert django_app.get(url, user=user, expect_errors=True).status_code == 404
+    job.owner = user
+    job.save()
+    assert django_app.get(url, user=user).json["id"] == job.pk
+
+
+@pytest.mark.django_db
+def test_scan_job_invalid_image():
+    ScanJob.objects.create(filename="a.png", image=b"invalid", options={"target": "", **OPTIONS})
+    ScanJob.objects.create(filename="b.png", image=b"invalid", options={"target": "123", **OPTIONS})
+    call_command("scan_worker", once=True)
+    for job in ScanJob.objects.all():
+        assert job.status == ScanJob.Status.FAILED
+        assert job.error.startswith("InvalidImageError")
+        assert not job.results
+
+
+@pytest.mark.django_db
+def test_claim_job_empty():
+    assert claim_job() is None
+
+
+@pytest.mark.django_db
+def test_scan_job_unexpected_error():
+    job = ScanJob.objects.create(filename="a.png", image=b"invalid", options={"target": "", **OPTIONS})
+    with mock.patch("hope_documents.archive.jobs.get_processor", side_effect=RuntimeError("boom")):
+        assert run_worker(once=True) == 1
+    job.refresh_from_db()
+    assert job.status == ScanJob.Status.FAILED
+    assert job.error == "RuntimeError: boom"
+
+
+@pytest.mark.django_db
+def test_claim_job_stale():
+    started = timezone.now() - timedelta(seconds=STALE_TIMEOUT + 1)
+    stale = ScanJob.objects.create(
+        filename="a.png", image=b"", options={}, status=ScanJob.Status.RUNNING, started=started, results=[{}]
+    )
+    running = ScanJob.objects.create(
+        filename="b.png", image=b"", options={}, status=ScanJob.Status.RUNNING, started=timezone.now()
+    )
+    job = claim_job()
+    assert job == stale
+    assert job.results == []
+    running.refresh_from_db()
+    assert running.status == ScanJob.Status.RUNNING
+    assert claim_job() is None
+
+
+OPTIONS = {
+    "psm": 11,
+    "oem": 3,
+    "number_only": False,
+    "threshold": 128,
+    "loaders": ["hope_documents.ocr.loaders.Loader"],
+    "max_errors": 5,
+    "mode": MatchMode.FIRST.value,
+}
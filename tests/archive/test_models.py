@@ -2,6 +2,8 @@ import pytest
 from demo.factories import get_factory_for_model
 from django.apps import apps
 
+from hope_documents.ocr.engine import OCRProfile
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize("model", ["Country", "DocumentType", "DocumentRule"])
@@ -9,3 +11,11 @@ def test_str(model):
     m = apps.get_model("archive", model)
     f = get_factory_for_model(m)
     assert str(f())
+
+
+@pytest.mark.django_db
+def test_ocr_profile():
+    rule = get_factory_for_model(apps.get_model("archive", "DocumentRule"))()
+    rule.ocr_lang = "ara"
+    rule.ocr_loaders = ["BWLoader"]
+    assert rule.ocr_profile == OCRProfile(lang="ara", psm=None, whitelist="", loaders=["BWLoader"], rotations=[])
@@ -0,0 +1,94 @@
+import pytest
+from PIL import Image
+
+from hope_documents.archive import store as archive_store
+from hope_documents.archive.models import ImageFingerprint, ScanResult
+from hope_documents.archive.store import DatabaseFingerprintIndex, DatabaseResultStore
+from hope_documents.ocr.diff import Match
+from hope_documents.ocr.engine import CV2Config, Processor, SearchInfo, TSConfig
+from hope_documents.ocr.loaders import Loader
+from hope_documents.ocr.store import MemoryFingerprintIndex
+
+
+def search_info(text, match=None):
+    info = SearchInfo(loader="Loader", match=match)
+    info.text = text
+    return info
+
+
+class FakeReader:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def extract(self, image):
+        self.calls += 1
+        return self.text
+
+
+@pytest.mark.django_db
+def test_store_batches():
+    store = DatabaseResultStore(batch_size=2)
+    info = search_info("abc", Match(text="abc", distance=1))
+    store.add("digest", "config", 0, info)
+    assert not ScanResult.objects.exists()
+    store.add("digest", "config", 90, info)
+    assert ScanResult.objects.count() == 2
+    store.add("digest", "config", 90, info)
+    store.flush()
+    assert ScanResult.objects.count() == 2
+    assert ScanResult.objects.filter(match="abc", distance=1).count() == 2
+
+
+@pytest.mark.django_db
+def test_store_lookup(django_assert_num_queries):
+    with DatabaseResultStore() as store:
+        store.add("digest", "config", 0, search_info("abc"))
+    store = DatabaseResultStore()
+    with django_assert_num_queries(1):
+        assert store.get("digest", "config", "Loader", 0) == "abc"
+        assert store.get("digest", "config", "Loader", 90) is None
+        assert store.get("digest", "other", "Loader", 0) is None
+
+
+@pytest.mark.django_db
+def test_processor_reuses_results():
+    image = Image.new("L", (4, 4))
+    reader = FakeReader("abcdefgh")
+    for __ in range(2):
+        with DatabaseResultStore() as store:
+            processor = Processor(TSConfig(), CV2Config(), loaders=[Loader], store=store)
+            processor.reader = reader
+            list(processor.find_text(image, "abcdefgh", max_errors=0))
+    assert reader.calls == 1
+    assert ScanResult.objects.get().match == "abcdefgh"
+
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    # the process wide copy outlives the test transaction
+    monkeypatch.setattr(archive_store, "_fingerprints", MemoryFingerprintIndex())
+    monkeypatch.setattr(archive_store, "_fingerprints_key", (0, 0))
+
+
+@pytest.mark.django_db
+def test_fingerprint_index(fingerprints, django_assert_num_queries):
+    index = DatabaseFingerprintIndex()
+    assert index.lookup("00" * 32, 8) is None
+    index.add("00" * 32, "digest")
+    index.add("00" * 32, "digest")
+    assert ImageFingerprint.objects.count() == 1
+
+    # shared by the new instances, only the new rows are loaded
+    index = DatabaseFingerprintIndex()
+    with django_assert_num_queries(2):
+        assert index.lookup("01" + "00" * 31, 8) == "digest"
+    with django_assert_num_queries(1):
+        assert index.lookup("ff" * 32, 8) is None
+    ImageFingerprint.objects.create(image_hash="other", fingerprint="ff" * 32)
+    assert DatabaseFingerprintIndex().lookup("ff" * 32, 8) == "other"
+
+    # reloaded when rows are deleted
+    ImageFingerprint.objects.filter(image_hash="digest").delete()
+    assert index.lookup("00" * 32, 8) is None
+    assert index.lookup("ff" * 32, 8) == "other"
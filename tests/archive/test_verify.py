@@ -0,0 +1,102 @@
+import io
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from demo.factories import get_factory_for_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from hope_documents.archive.models import DocumentRule
+
+
+@pytest.fixture
+def ocr():
+    with mock.patch("pytesseract.image_to_string", return_value="N. MO1699252K") as m:
+        yield m
+
+
+@pytest.fixture
+def rule(db):
+    rule = get_factory_for_model(DocumentRule)()
+    rule.number_regex = r"[A-Z]{2}\d{7}[A-Z]"
+    rule.ocr_loaders = ["Loader"]
+    rule.save()
+    return rule
+
+
+def test_verify_batch_command(tmp_path, images_dir, rule, ocr):
+    image = str(images_dir / "ita/dl1.png")
+    source = tmp_path / "items.jsonl"
+    source.write_text(
+        "\n".join(
+            json.dumps(e)
+            for e in [
+                {"image": image, "target": "M01699252K", "rule": rule.pk, "key": "1"},
+                {"image": image, "rule": rule.pk, "key": "2"},
+                {"image": str(tmp_path / "missing.png"), "target": "M01699252K", "key": "3"},
+            ]
+        )
+    )
+    out = io.StringIO()
+    call_command("verify_batch", str(source), workers=2, stdout=out)
+    verdicts = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(v["key"], v["status"], v["match"]) for v in verdicts] == [
+        ("1", "found", "MO1699252K"),
+        ("2", "found", "MO1699252K"),
+        ("3", "error", None),
+    ]
+
+
+def test_verify_view(django_app, admin_user, images_dir, rule, ocr):
+    image = Path(images_dir / "ita/dl1.png")
+    url = reverse("admin:archive_documentrule_verify")
+    res = django_app.post(
+        url,
+        params=[
+            ("target", "M01699252K"),
+            ("target", "XX"),
+            ("rule", str(rule.pk)),
+            ("rule", str(rule.pk)),
+            ("max_errors", "0"),
+        ],
+        upload_files=[("image", "a.png", image.read_bytes()), ("image", "b.png", image.read_bytes())],
+        user=admin_user,
+    )
+    verdicts = [json.loads(line) for line in res.text.splitlines()]
+    assert [(v["key"], v["status"]) for v in verdicts] == [("a.png", "found"), ("b.png", "not_found")]
+    assert django_app.get(url, user=admin_user, expect_errors=True).status_code == 405
+
+
+def test_verify_view_permission(django_app, django_user_model, db):
+    user = django_user_model.objects.create_user("user", password="password")
+    url = reverse("admin:archive_documentrule_verify")
+    res = django_app.post(url, params={"target": "XX"}, user=user, expect_errors=True)
+    assert res.status_code == 403
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        [("workers", "many")],
+        [("timeout", "0")],
+        [("max_errors", "-1")],
+        [("rule", "abc")],
+        [("rule", "999999")],
+    ],
+)
+def test_verify_view_invalid(django_app, admin_user, params):
+    url = reverse("admin:archive_documentrule_verify")
+    res = django_app.post(url, params=params, user=admin_user, expect_errors=True)
+    assert res.status_code == 400
+    assert res.json["error"]
+
+
+def test_verify_view_workers(django_app, admin_user, settings):
+    settings.HOPE_DOCUMENTS_VERIFY_MAX_WORKERS = 2
+    url = reverse("admin:archive_documentrule_verify")
+    with mock.patch("hope_documents.archive.admin.verify_entries", return_value=iter([])) as m:
+        res = django_app.post(url, params=[("workers", "10000")], user=admin_user)
+    assert res.status_code == 200
+    assert m.call_args.kwargs == {"workers": 2, "timeout": 60.0, "max_errors": 5}
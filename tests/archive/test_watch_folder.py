@@ -0,0 +1,33 @@
+import io
+import json
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+
+from hope_documents.archive.models import ScanResult
+
+
+def test_watch_folder(db, images_dir: Path, tmp_path: Path) -> None:
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    shutil.copy(images_dir / "_valid" / "img.png", spool / "img.png")
+    (spool / "empty.png").write_bytes(b"")
+    out = io.StringIO()
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        call_command(
+            "watch_folder",
+            str(spool),
+            once=True,
+            settle=0,
+            move_to=str(tmp_path / "done"),
+            errors_to=str(tmp_path / "errors"),
+            stdout=out,
+        )
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {Path(r["file"]).name for r in records} == {"img.png", "empty.png"}
+    assert ScanResult.objects.filter(text="MO1699252K").exists()
+    assert (tmp_path / "done" / "img.png").exists()
+    assert (tmp_path / "errors" / "empty.png").exists()
+    assert not list(spool.iterdir())
@@ -1,4 +1,7 @@
+import json
+import shutil
 from pathlib import Path
+from unittest import mock
 
 import pytest
 from click.testing import CliRunner
@@ -42,3 +45,101 @@ def test_extract_help(runner: CliRunner) -> None:
 def test_extract_params(runner: CliRunner, arguments, exit_code) -> None:
     result = runner.invoke(cli, ["extract", *arguments.split()], catch_exceptions=False)
     assert result.exit_code == exit_code, result.output
+
+
+@pytest.mark.parametrize("pattern", [[], ["--pattern=MO1699252K"]])
+def test_extract_jsonl(runner: CliRunner, pattern) -> None:
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        result = runner.invoke(cli, ["extract", valid_image, "--format", "jsonl", *pattern], catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert records
+    assert all(r["file"] == valid_image for r in records)
+    assert all(r["text"] == "MO1699252K" for r in records)
+
+
+@pytest.mark.parametrize("number_regex", [[], [r"--number-regex=[A-Z]{2}\d{7}[A-Z]"]])
+def test_extract_jsonl_not_found(runner: CliRunner, number_regex) -> None:
+    with mock.patch("pytesseract.image_to_string", return_value="nothing here"):
+        result = runner.invoke(
+            cli,
+            ["extract", valid_image, invalid_image, "--format", "jsonl", "--pattern=MO1699252K", *number_regex],
+            catch_exceptions=False,
+        )
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["file"] for r in records] == [valid_image, invalid_image]
+    assert all(r["match"] is None for r in records)
+    assert records[0]["time"]
+    assert records[1]["error"]
+
+
+@pytest.mark.parametrize("pattern", [[], ["--pattern", "M0 1699252K"]])
+def test_extract_number_regex(runner: CliRunner, pattern) -> None:
+    with mock.patch("pytesseract.image_to_string", return_value="N. MO1699252K"):
+        result = runner.invoke(
+            cli,
+            [
+                "extract",
+                valid_image,
+                "--format",
+                "jsonl",
+                "--rotate",
+                "0",
+                *pattern,
+                r"--number-regex=[A-Z]{2}\d{7}[A-Z]",
+            ],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output.splitlines()[0])["match"] == "MO1699252K"
+
+
+def test_extract_number_regex_empty(runner: CliRunner) -> None:
+    # `.*` cannot extract a number: the text is only extracted
+    with mock.patch("pytesseract.image_to_string", return_value="N. MO1699252K"):
+        result = runner.invoke(cli, ["extract", valid_image, "--format", "jsonl", "--number-regex=.*"])
+    assert result.exit_code == 0, result.output
+    assert all("match" not in json.loads(line) for line in result.output.splitlines())
+
+
+def test_extract_resume(runner: CliRunner, tmp_path) -> None:
+    checkpoint = str(tmp_path / "extract.jsonl")
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K") as ocr:
+        result = runner.invoke(cli, ["extract", valid_image, invalid_image, "--checkpoint", checkpoint])
+        assert result.exit_code == 1, result.output
+        ocr.reset_mock()
+        result = runner.invoke(cli, ["extract", valid_image, invalid_image, "--checkpoint", checkpoint, "--resume"])
+        assert not ocr.call_count
+    assert result.exit_code == 1, result.output
+
+
+def test_extract_resume_output(runner: CliRunner, tmp_path) -> None:
+    other = tmp_path / "b.png"
+    shutil.copy(valid_image, other)
+    args = ["--format", "jsonl", "--output", str(tmp_path / "out.jsonl"), "--checkpoint", str(tmp_path / "done.jsonl")]
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        result = runner.invoke(cli, ["extract", valid_image, *args])
+        assert result.exit_code == 0, result.output
+        result = runner.invoke(cli, ["extract", valid_image, str(other), *args, "--resume"])
+        assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    # the records of the first run are kept
+    assert {r["file"] for r in records} == {valid_image, str(other)}
+
+
+def test_extract_resume_requires_checkpoint(runner: CliRunner) -> None:
+    result = runner.invoke(cli, ["extract", valid_image, "--resume"])
+    assert result.exit_code == 2
+    assert "--resume requires --checkpoint" in result.output
+
+
+def test_extract_images_only(runner: CliRunner) -> None:
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        result = runner.invoke(cli, ["extract", invalid_image, "--images-only"], catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+
+
+def test_extract_shard_invalid(runner: CliRunner) -> None:
+    result = runner.invoke(cli, ["extract", valid_image, "--shard", "2/2"])
+    assert result.exit_code == 2
+    assert "Invalid shard" in result.output
@@ -0,0 +1,71 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from hope_documents.ocr.__cli__ import cli
+
+expectations_file = Path(__file__).parent.parent / "ocr" / "expectations.csv"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_loaders(runner: CliRunner, test_dir: Path, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+    ):
+        result = runner.invoke(
+            cli,
+            ["loaders", "-e", str(expectations_file), "--output", "loaders.json", str(test_dir / "images" / "ita")],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0, result.output
+    assert "Pruned loaders: -l " in result.output
+    data = json.loads((tmp_path / "loaders.json").read_text())
+    # the loaders all read the same text: a single one is enough, none has unique wins
+    assert len(data["pruned"]) == 1
+    assert len(data["loaders"]) == 7
+    assert data["searches"] >= data["solved"] > 0
+    assert all(usage["unique"] == 0 for usage in data["loaders"].values())
+
+
+def test_report_loaders(runner: CliRunner, test_dir: Path, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+    ):
+        result = runner.invoke(
+            cli,
+            [
+                "report",
+                "-e",
+                str(expectations_file),
+                "-l",
+                "PILLoader",
+                "--format",
+                "jsonl",
+                "--output",
+                "out.jsonl",
+                str(test_dir / "images" / "ita"),
+            ],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert lines
+    assert {line["loader"] for line in lines if "loader" in line} == {"PILLoader"}
+
+
+def test_report_unknown_loader(runner: CliRunner, tmp_path: Path) -> None:
+    result = runner.invoke(cli, ["report", "-e", str(expectations_file), "-l", "Missing", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "Unknown loaders: Missing" in result.output
@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from unittest import mock
@@ -47,3 +48,80 @@ def test_report(write_report_mock, runner: CliRunner, test_dir) -> None:
         args, kwargs = write_report_mock.call_args
         assert args[0] == ".report_FIRST.html"
         assert args[1] == "report.html"
+
+
+def test_report_pages(runner: CliRunner, test_dir, tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+    ):
+        result = runner.invoke(
+            cli,
+            ["report", "--expectations", str(expectations_file), "--page-size", "2", *images_dirs],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0, result.output
+    pages = len(list(tmp_path.glob(".report_FIRST*.html")))
+    assert pages > 1
+    first = (tmp_path / ".report_FIRST.html").read_text()
+    assert 'href=".report_FIRST.2.html"' in first
+    assert "data:image/jpeg;base64," in first
+    last = (tmp_path / f".report_FIRST.{pages}.html").read_text()
+    assert "next &raquo;" not in last
+
+
+def test_report_jsonl(runner: CliRunner, test_dir) -> None:
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+    ):
+        result = runner.invoke(
+            cli,
+            ["report", "--expectations", str(expectations_file), "--format", "jsonl", *images_dirs],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert records
+    assert {r["status"] for r in records} <= {"success", "warning", "error"}
+    assert all("file" in r for r in records)
+
+
+def test_report_incremental(runner: CliRunner, test_dir, tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    args = ["report", "--expectations", str(expectations_file), "--format", "jsonl", "--incremental", *images_dirs]
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K") as ocr,
+    ):
+        first = runner.invoke(cli, args, catch_exceptions=False)
+        assert ocr.call_count
+        ocr.reset_mock()
+        second = runner.invoke(cli, args, catch_exceptions=False)
+        assert not ocr.call_count
+    assert first.exit_code == second.exit_code == 0, second.output
+    assert (tmp_path / ".report_FIRST.manifest.json").exists()
+    assert first.output.splitlines() == second.output.splitlines()
+
+
+def test_report_resume(runner: CliRunner, test_dir, tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    args = ["report", "--expectations", str(expectations_file), "--format", "jsonl", "--checkpoint", "run.jsonl"]
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K") as ocr,
+    ):
+        first = runner.invoke(cli, [*args, *images_dirs], catch_exceptions=False)
+        calls = ocr.call_count
+        # simulate a run killed while writing its last record
+        lines = (tmp_path / "run.jsonl").read_text().splitlines(keepends=True)
+        (tmp_path / "run.jsonl").write_text("".join(lines[:-1]) + lines[-1][:10])
+        ocr.reset_mock()
+        second = runner.invoke(cli, [*args, "--resume", *images_dirs], catch_exceptions=False)
+        assert ocr.call_count < calls
+    assert second.exit_code == 0, second.output
+    # the row of the interrupted file is computed again, with its own timing
+    records = [{**json.loads(line), "time": ""} for line in first.output.splitlines()]
+    assert records == [{**json.loads(line), "time": ""} for line in second.output.splitlines()]
+    assert len((tmp_path / "run.jsonl").read_text().splitlines()) == len(lines)
@@ -0,0 +1,72 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from hope_documents.ocr.__cli__ import cli
+
+expectations_file = Path(__file__).parent.parent / "ocr" / "expectations.csv"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_tune(runner: CliRunner, test_dir: Path, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+    ):
+        result = runner.invoke(
+            cli,
+            [
+                "tune",
+                "--expectations",
+                str(expectations_file),
+                "--loader",
+                "SmartLoader",
+                "--results",
+                "results.jsonl",
+                "--output",
+                "best.json",
+                str(test_dir / "images" / "ita"),
+            ],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0, result.output
+    assert "Tuning 9 candidates" in result.stderr
+    best = json.loads((tmp_path / "best.json").read_text())
+    assert list(best) == ["SmartLoader"]
+    assert len((tmp_path / "results.jsonl").read_text().splitlines()) == 9
+    assert (tmp_path / ".tune_cache.json").exists()
+
+    # the best configuration feeds the report
+    with (
+        mock.patch.object(os, "getcwd", return_value=str(test_dir.parent.absolute())),
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+    ):
+        result = runner.invoke(
+            cli,
+            ["report", "-e", str(expectations_file), "--loader-config", "best.json", str(test_dir / "images" / "ita")],
+        )
+    assert result.exit_code == 0, result.output
+
+
+def test_tune_no_samples(runner: CliRunner, test_dir: Path, tmp_path: Path) -> None:
+    result = runner.invoke(cli, ["tune", "-e", str(expectations_file), "--no-cache", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "No file with an expected text" in result.output
+
+
+def test_report_loader_config_invalid(runner: CliRunner, tmp_path: Path) -> None:
+    (tmp_path / "best.json").write_text("[1]")
+    result = runner.invoke(
+        cli, ["report", "-e", str(expectations_file), "--loader-config", str(tmp_path / "best.json"), str(tmp_path)]
+    )
+    assert result.exit_code == 2
+    assert "expected an object of loader parameters" in result.output
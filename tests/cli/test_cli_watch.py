@@ -0,0 +1,34 @@
+import json
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from click.testing import CliRunner
+
+from hope_documents.ocr.__cli__ import cli
+
+
+def test_watch_once(images_dir: Path, tmp_path: Path, truncated_tiff: bytes) -> None:
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    shutil.copy(images_dir / "_valid" / "img.png", spool / "img.png")
+    (spool / "empty.png").write_bytes(b"")
+    (spool / "notes.txt").write_text("not an image")
+    (spool / "pages.tif").write_bytes(truncated_tiff)
+    args = ["watch", str(spool), "--once", "--settle=0", "--images-only"]
+    args += ["--move-to", str(tmp_path / "done"), "--errors-to", str(tmp_path / "errors")]
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert {r["file"] for r in records} == {str(spool / "img.png"), str(spool / "pages.tif")}
+    assert (tmp_path / "done" / "img.png").exists()
+    assert (tmp_path / "errors" / "pages.tif").exists()
+    assert sorted(p.name for p in spool.iterdir()) == ["empty.png", "notes.txt"]
+
+
+def test_watch_archives_move_to(tmp_path: Path) -> None:
+    args = ["watch", str(tmp_path), "--once", "--archives", "--move-to", str(tmp_path / "done")]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 2
+    assert "cannot be used with --archives" in result.output
@@ -1,3 +1,4 @@
+import io
 import logging
 import sys
 from pathlib import Path
@@ -39,6 +40,19 @@ def images_dir(test_dir):
     return test_dir / "images"
 
 
+@pytest.fixture
+def truncated_tiff():
+    """A 3 pages TIFF cut to 80%: its last page cannot be decoded."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    frames = [Image.fromarray(rng.integers(0, 255, (100, 100), dtype=np.uint8)) for __ in range(3)]
+    stream = io.BytesIO()
+    frames[0].save(stream, "TIFF", save_all=True, append_images=frames[1:])
+    return stream.getvalue()[: int(len(stream.getvalue()) * 0.8)]
+
+
 def pytest_addoption(parser):
     parser.addoption("--with-report", action="store_true", default=False, help="run tests marked with 'report'")
 
@@ -1,7 +1,7 @@
 import pytest
 
 from hope_documents.ocr.diff.common import Match
-from hope_documents.ocr.diff.impl1 import find_similar, levenshtein_distance
+from hope_documents.ocr.diff.impl1 import batch_distances, find_similar, levenshtein_distance, window_distances
 
 
 @pytest.mark.parametrize(
@@ -23,6 +23,34 @@ def test_levenshtein_distance(s1, s2, expected_distance):
     assert levenshtein_distance(s2, s1) == expected_distance
 
 
+def test_batch_distances():
+    """Test that batch_distances scores every pair like levenshtein_distance."""
+    patterns = ["kitten", "kitten", "saturday", "", "abc"]
+    texts = ["sitting", "kitten", "sunday", "abc", ""]
+    expected = [levenshtein_distance(p, t) for p, t in zip(patterns, texts, strict=True)]
+    assert batch_distances(patterns, texts).tolist() == expected
+
+
+def test_batch_distances_length_mismatch():
+    with pytest.raises(ValueError, match="same length"):
+        batch_distances(["abc"], [])
+
+
+@pytest.mark.parametrize(
+    ("pattern", "text", "window_size"),
+    [
+        ("world", "Hello world", 5),
+        ("wrold", "Hello world", 4),
+        ("abc", "ab", 3),
+        ("", "abc", 2),
+    ],
+)
+def test_window_distances(pattern, text, window_size):
+    """Test that window_distances scores every window of the text."""
+    expected = [levenshtein_distance(pattern, text[i : i + window_size]) for i in range(len(text) - window_size + 1)]
+    assert window_distances(pattern, text, window_size).tolist() == expected
+
+
 # --- Tests for find_similar ---
 
 
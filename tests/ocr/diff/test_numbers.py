@@ -0,0 +1,53 @@
+import re
+from unittest import mock
+
+import pytest
+
+from hope_documents.ocr.diff.common import Match
+from hope_documents.ocr.diff.numbers import extract_numbers, find_number, number_pattern
+
+TEXT = "PATENTE DI GUIDA\n5. MO1699252K\n4a. 01/02/2020"
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        (r"[A-Z]{2}\d{7}[A-Z]", ["MO1699252K"]),
+        (r"5\. (\w+)", ["MO1699252K"]),
+        (r"(?P<date>\d\d/\d\d/\d{4})|5\. (?P<number>\w+)", ["MO1699252K"]),
+        (r"\d\d/\d\d/\d{4}", ["01/02/2020"]),
+        (r"X{3}", []),
+    ],
+)
+def test_extract_numbers(pattern, expected):
+    assert extract_numbers(re.compile(pattern), TEXT) == expected
+
+
+@pytest.mark.parametrize(
+    ("target", "max_distance", "expected"),
+    [
+        ("MO1699252K", 0, Match("MO1699252K", 0)),
+        ("M01699252K", 0, Match("MO1699252K", 0)),  # homoglyph
+        ("MO 1699 252K", 0, Match("MO1699252K", 0)),  # separators
+        ("MO1699253K", 1, Match("MO1699252K", 1)),
+        ("MO1699253K", 0, None),
+        ("", 0, Match("MO1699252K", 0)),  # no target: extracted number
+    ],
+)
+def test_find_number(target, max_distance, expected):
+    with mock.patch("hope_documents.ocr.diff.numbers.find_similar", return_value=None) as m:
+        assert find_number(re.compile(r"[A-Z]{2}\d{7}[A-Z]"), target, TEXT, max_distance) == expected
+    # the fuzzy search only runs when no extracted number is close enough
+    assert m.called is (expected is None)
+
+
+@pytest.mark.parametrize(("pattern", "expected"), [(None, False), (".*", False), ("a?", False), (r"\d+", True)])
+def test_number_pattern(pattern, expected):
+    compiled = re.compile(pattern) if pattern else None
+    assert (number_pattern(compiled) is not None) is expected
+
+
+def test_find_number_fallback():
+    """The fuzzy search runs on the whole text only when no candidate is close enough."""
+    assert find_number(re.compile(r"X{3}"), "MO1699252K", TEXT, 1) == Match("MO1699252K", 0)
+    assert find_number(re.compile(r"X{3}"), "", TEXT, 1) is None
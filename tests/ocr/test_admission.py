@@ -0,0 +1,84 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from hope_documents.exceptions import OCRBusyError
+from hope_documents.ocr import admission as module
+from hope_documents.ocr.admission import Admission, configure, get_admission
+from hope_documents.ocr.reader import Reader
+
+
+@pytest.fixture(autouse=True)
+def restore(monkeypatch):
+    monkeypatch.setattr(module, "admission", None)
+    monkeypatch.setattr(module, "thread_limit", None)
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+
+
+def test_admission_limits():
+    controller = Admission(max_concurrent=1, max_waiting=1, wait_timeout=0.05)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with controller.slot():
+            entered.set()
+            release.wait(2)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(2)
+    # one slot, taken: waits then gives up
+    with pytest.raises(OCRBusyError, match="no OCR slot"), controller.slot():
+        pass
+    release.set()
+    holder.join()
+    with controller.slot():
+        assert controller.metrics()["running"] == 1
+    metrics = controller.metrics()
+    assert metrics["admitted"] == 2
+    assert metrics["rejected"] == 1
+    assert metrics["running"] == metrics["waiting"] == 0
+
+
+def test_admission_queue_depth():
+    controller = Admission(max_concurrent=1, max_waiting=1)
+    controller.waiting = 1
+    assert controller.busy
+    with pytest.raises(OCRBusyError, match="already waiting"), controller.slot():
+        pass
+
+
+def test_configure(monkeypatch):
+    monkeypatch.setattr(module, "DEFAULT_CONCURRENCY", 8)
+    controller = configure(max_concurrent=2)
+    assert get_admission() is controller
+    assert controller.max_concurrent == 2
+    assert module.os.environ["OMP_THREAD_LIMIT"] == "4"
+    # a later call with a different concurrency applies
+    configure(max_concurrent=4)
+    assert module.os.environ["OMP_THREAD_LIMIT"] == "2"
+    configure(threads=1)
+    assert module.os.environ["OMP_THREAD_LIMIT"] == "1"
+
+
+def test_configure_default(monkeypatch):
+    # serial runs keep the multithreading of tesseract
+    configure()
+    assert "OMP_THREAD_LIMIT" not in module.os.environ
+    monkeypatch.setattr(module, "admission", None)
+    assert get_admission().max_concurrent == module.DEFAULT_CONCURRENCY
+    assert "OMP_THREAD_LIMIT" not in module.os.environ
+
+
+def test_configure_external_limit(monkeypatch):
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "3")
+    configure(max_concurrent=2)
+    assert module.os.environ["OMP_THREAD_LIMIT"] == "3"
+
+
+def test_reader_uses_admission():
+    with mock.patch("pytesseract.image_to_string", return_value="abc"):
+        assert Reader("").extract(mock.Mock()) == "abc"
+    assert get_admission().metrics()["admitted"] == 1
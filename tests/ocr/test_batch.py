@@ -0,0 +1,36 @@
+from unittest import mock
+
+from PIL import Image
+
+from hope_documents.ocr.batch import Verdict, VerifyItem, verify, verify_batch
+from hope_documents.ocr.engine import CV2Config, OCRProfile, Processor, TSConfig
+from hope_documents.utils.image import ImageBuffer
+
+
+def buffer() -> ImageBuffer:
+    return ImageBuffer.from_pil(Image.new("L", (8, 8)))
+
+
+@mock.patch("pytesseract.image_to_string", return_value="ID MO1699252K")
+def test_verify_batch(m, images_dir):
+    processor = Processor(TSConfig(), CV2Config())
+    items = [
+        VerifyItem(buffer(), "MO1699252K", key="a", profile=OCRProfile(loaders=["Loader"])),
+        VerifyItem(buffer(), "ZZZZ", key="b", profile=OCRProfile(loaders=["Loader"], rotations=[0])),
+        VerifyItem(str(images_dir / "_invalid/_empty.png"), "MO1699252K", key="c"),
+    ]
+    verdicts = list(verify_batch(processor, iter(items), workers=2, max_errors=0))
+    assert [v.key for v in verdicts] == ["a", "b", "c"]
+    assert [v.status for v in verdicts] == [Verdict.FOUND, Verdict.NOT_FOUND, Verdict.ERROR]
+    assert verdicts[0].as_dict()["match"] == "MO1699252K"
+    assert verdicts[2].error.startswith("InvalidImageError")
+    # 2 rotations for "a" (found at the first one) + 1 for "b"
+    assert m.call_count == 2
+
+
+@mock.patch("pytesseract.image_to_string", return_value="")
+def test_verify_timeout(m):
+    processor = Processor(TSConfig(), CV2Config())
+    verdict = verify(processor, VerifyItem(buffer(), "MO1699252K"), timeout=0)
+    assert verdict.status == Verdict.TIMEOUT
+    assert not m.called
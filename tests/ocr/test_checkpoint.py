@@ -0,0 +1,25 @@
+from hope_documents.ocr.checkpoint import Checkpoint
+
+
+def test_checkpoint(tmp_path) -> None:
+    path = tmp_path / "checkpoint.jsonl"
+    with Checkpoint(path) as checkpoint:
+        checkpoint.add("a.png", {"ret_code": 0})
+        checkpoint.add("b.png", {"ret_code": 1})
+    with Checkpoint(path, resume=True) as checkpoint:
+        assert "a.png" in checkpoint
+        assert checkpoint.get("b.png") == {"ret_code": 1}
+    with Checkpoint(path) as checkpoint:
+        assert not checkpoint.done
+    assert path.read_text() == ""
+
+
+def test_checkpoint_truncated(tmp_path) -> None:
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text('{"file": "a.png", "data": {}}\n{"file": "b.p')
+    with Checkpoint(path, resume=True) as checkpoint:
+        assert len(checkpoint.done) == 1
+        checkpoint.add("b.png", {})
+    with Checkpoint(path, resume=True) as checkpoint:
+        assert "b.png" in checkpoint
+        assert len(checkpoint.done) == 2
@@ -1,12 +1,30 @@
+import io
+import json
 import os
+import re
+import threading
 from pathlib import Path
 from unittest import mock
 
 import pytest
+from PIL import Image
 
 from hope_documents.ocr.__cli__ import load_expectations
-from hope_documents.ocr.engine import CV2Config, MatchMode, Processor, TSConfig
-from hope_documents.utils.image import get_image
+from hope_documents.ocr.diff import Match
+from hope_documents.ocr.engine import (
+    CV2Config,
+    JsonLinesSink,
+    MatchMode,
+    OCRProfile,
+    Processor,
+    SearchInfo,
+    TSConfig,
+    TraceLevel,
+    Tracer,
+)
+from hope_documents.ocr.loaders import BWLoader, Loader, PILLoader
+from hope_documents.ocr.store import MemoryFingerprintIndex, MemoryResultStore, same_text
+from hope_documents.utils.image import ImageBuffer, get_image, load_pages
 
 images_dirs = [Path(__file__).parent.parent / "images/and/"]
 
@@ -43,3 +61,322 @@ def test_search_text(processor, filename, test_dir) -> None:
                 assert findings[0].match
             else:
                 assert not findings
+
+
+class FakeReader:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def extract(self, image):
+        self.calls += 1
+        return self.text
+
+
+@pytest.mark.parametrize(
+    ("level", "angles", "text"),
+    [(TraceLevel.OFF, 0, None), (TraceLevel.SUMMARY, 2, None), (TraceLevel.FULL, 2, "abcd")],
+)
+def test_find_text_trace(level, angles, text):
+    sink = []
+    processor = Processor(
+        TSConfig(), CV2Config(), loaders=[Loader], tracer=Tracer(level, max_text=4, max_entries=1, sink=sink.append)
+    )
+    processor.reader = FakeReader("abcdefgh")
+    findings = list(processor.find_text(Image.new("L", (4, 4)), "zzzzzzzz", max_errors=0))
+    assert findings == []
+    assert processor.debug_info.last.text == "abcdefgh"
+    assert not processor.debug_info.iterations
+    assert len(sink) == angles
+    if angles:
+        attempts = processor.debug_info.last.iterations[0]["angles"]
+        assert len(attempts) == angles
+        assert attempts[0].get("text") == text
+    else:
+        assert processor.debug_info.last.iterations == []
+
+
+def test_find_text_debug_is_bounded():
+    processor = Processor(TSConfig(), CV2Config(), loaders=[Loader, PILLoader], tracer=Tracer(max_entries=3))
+    processor.reader = FakeReader("abcdefgh")
+    list(processor.find_text(Image.new("L", (4, 4)), "zzzzzzzz", max_errors=0, debug=True))
+    assert len(processor.debug_info.iterations) == 3
+
+
+def test_json_lines_sink():
+    stream = io.StringIO()
+    sink = JsonLinesSink(stream, filename="a.png")
+    info = SearchInfo(loader="Loader", match=Match(text="abc", distance=1), angle=90)
+    sink(info)
+    assert json.loads(stream.getvalue()) == {
+        "filename": "a.png",
+        "loader": "Loader",
+        "text": "",
+        "error": "",
+        "time": "",
+        "page": 1,
+        "angle": 90,
+        "match": "abc",
+        "distance": 1,
+    }
+
+
+def test_process_decodes_once(images_dir):
+    processor = Processor(TSConfig(), CV2Config())
+    processor.reader = FakeReader("abc")
+    with mock.patch("hope_documents.utils.image.Image.open", wraps=Image.open) as m:
+        entries = list(processor.process(str(images_dir / "_valid/img.png"), rotate=90))
+    assert m.call_count == 1
+    assert len(entries) == len(processor.loaders)
+    assert all(e.text == "abc" and not e.error for e in entries)
+
+
+def test_process_invalid(images_dir):
+    processor = Processor(TSConfig(), CV2Config())
+    entries = list(processor.process(str(images_dir / "_invalid/_empty.png")))
+    assert len(entries) == len(processor.loaders)
+    assert all(e.error.startswith("InvalidImageError") for e in entries)
+
+
+def test_find_text_store():
+    store = MemoryResultStore()
+    processor = Processor(TSConfig(), CV2Config(), loaders=[Loader], store=store)
+    processor.reader = FakeReader("abcdefgh")
+    image = Image.new("L", (4, 4))
+    assert not list(processor.find_text(image, "zzzzzzzz", max_errors=0))
+    assert len(store.results) == 2
+
+    processor.reader = FakeReader("zzzzzzzz")
+    assert not list(processor.find_text(image, "zzzzzzzz", max_errors=0))
+    assert len(store.results) == 2
+
+
+def test_find_text_number_regex():
+    processor = Processor(TSConfig(), CV2Config(), loaders=[Loader])
+    processor.reader = FakeReader("N. MO1699252K")
+    image = Image.new("L", (4, 4))
+    number_regex = re.compile(r"[A-Z]{2}\d{7}[A-Z]")
+    with mock.patch("hope_documents.ocr.engine.find_similar") as m:
+        findings = list(processor.find_text(image, "M01699252K", max_errors=0, number_regex=number_regex))
+        assert findings[0].match == Match("MO1699252K", 0)
+        findings = list(processor.find_text(image, "", number_regex=number_regex))
+        assert findings[0].match == Match("MO1699252K", 0)
+    assert not m.called
+
+
+def test_with_profile():
+    processor = Processor(TSConfig(psm=11, number_only=False), CV2Config())
+    narrowed = processor.with_profile(
+        OCRProfile(lang="ara", whitelist="0123456789ABC", loaders=["BWLoader", "Missing"], rotations=[0])
+    )
+    assert narrowed.loader_classes == [BWLoader]
+    assert narrowed.rotations == (0,)
+    assert narrowed.reader.lang == "ara"
+    assert "--psm 11" in narrowed.ts_config
+    assert "tessedit_char_whitelist=0123456789ABC" in narrowed.ts_config
+    assert narrowed.config_key != processor.config_key
+    assert processor.with_profile(OCRProfile()).loader_classes == processor.loader_classes
+
+    narrowed.reader = FakeReader("abc")
+    assert [e.angle for e in narrowed.find_text(Image.new("L", (4, 4)), "abc", mode=MatchMode.ALL)] == [0]
+
+
+LICENCE = "REPUBBLICA ITALIANA PATENTE GUIDA ROSSI MARIO MO1699252K"
+
+
+def crop(image, ratio):
+    dx, dy = int(image.width * ratio), int(image.height * ratio)
+    return image.crop((dx, dy, image.width - dx, image.height - dy))
+
+
+def test_find_text_near_duplicate(images_dir):
+    processor = Processor(
+        TSConfig(), CV2Config(), loaders=[Loader, PILLoader], store=MemoryResultStore(), index=MemoryFingerprintIndex()
+    )
+    processor.reader = FakeReader(LICENCE)
+    image = Image.open(images_dir / "ita/dl1.png")
+    assert list(processor.find_text(image, "MO1699252K", max_errors=0))
+    assert processor.duplicate_of is None
+
+    # a resize and a small crop: only the first attempt runs, to confirm the duplicate
+    for copy in [image.resize((image.width // 2, image.height // 2)), crop(image, 0.01)]:
+        processor.reader = reader = FakeReader(LICENCE)
+        assert list(processor.find_text(copy, "MO1699252K", max_errors=0))
+        assert processor.duplicate_of == ImageBuffer.from_pil(image).digest
+        assert reader.calls == 1
+
+    processor.reader = FakeReader("REPUBBLICA ITALIANA CARTA IDENTITA")
+    assert not list(processor.find_text(Image.open(images_dir / "ita/id1.png"), "MO1699252K", max_errors=0))
+    assert processor.duplicate_of is None
+
+
+def test_find_text_near_duplicate_same_template(images_dir):
+    processor = Processor(
+        TSConfig(), CV2Config(), loaders=[Loader], store=MemoryResultStore(), index=MemoryFingerprintIndex()
+    )
+    processor.reader = FakeReader(LICENCE)
+    image = Image.open(images_dir / "ita/dl1.png")
+    list(processor.find_text(image, "MO1699252K", max_errors=0))
+
+    # same layout, another holder: the results of the first one are not reused
+    processor.reader = FakeReader("REPUBBLICA ITALIANA PATENTE GUIDA BIANCHI LUCA AB1234567C")
+    found = list(processor.find_text(crop(image, 0.005), "AB1234567C", max_errors=0))
+    assert processor.duplicate_of is None
+    assert found[0].match == Match("AB1234567C", 0)
+
+
+def test_find_text_near_duplicate_no_store():
+    with pytest.raises(ValueError, match="requires a result store"):
+        Processor(TSConfig(), CV2Config(), index=MemoryFingerprintIndex())
+
+
+@pytest.mark.parametrize(
+    ("text", "stored", "expected"),
+    [
+        (LICENCE, LICENCE, True),
+        ("patente guida mario", LICENCE, True),
+        (LICENCE.replace("ROSSI", "VERDI"), LICENCE, False),
+        # too few words to tell
+        ("MO1699252K", LICENCE, False),
+    ],
+)
+def test_same_text(text, stored, expected):
+    assert same_text(text, stored) is expected
+
+
+class PageReader:
+    """Find the text only in the 200 pixels wide pages."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract(self, image):
+        self.calls += 1
+        return "abc" if max(image.size) == 200 else "xyz"
+
+
+@pytest.fixture
+def pages():
+    frames = [Image.new("L", size) for size in [(100, 100), (200, 100), (150, 100), (200, 100)]]
+    stream = io.BytesIO()
+    frames[0].save(stream, "TIFF", save_all=True, append_images=frames[1:])
+    stream.seek(0)
+    return load_pages(stream)
+
+
+@pytest.mark.parametrize("page_workers", [1, 3])
+def test_find_text_pages(pages, page_workers):
+    processor = Processor(TSConfig(), CV2Config(), loaders=[PILLoader])
+    processor.page_workers = page_workers
+    processor.reader = reader = PageReader()
+    found = list(processor.find_text(pages, "abc", mode=MatchMode.FIRST, max_errors=1))
+    assert [(f.page, f.match.text) for f in found] == [(2, "abc")]
+    if page_workers == 1:
+        # the next pages are not processed
+        assert reader.calls == 3
+
+    found = list(processor.find_text(pages, "abc", mode=MatchMode.ALL, max_errors=1))
+    assert [f.page for f in found] == [2, 2, 4, 4]
+
+    found = list(processor.find_text(pages, "abc", mode=MatchMode.BEST, max_errors=1))
+    assert [f.page for f in found] == [2]
+
+
+class ThreadIndex(MemoryFingerprintIndex):
+    """Record the threads the index is used from."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def lookup(self, fingerprint, max_distance):
+        self.threads.add(threading.current_thread())
+        return super().lookup(fingerprint, max_distance)
+
+
+def test_find_text_pages_shared(pages):
+    sink = []
+    index = ThreadIndex()
+    processor = Processor(
+        TSConfig(),
+        CV2Config(),
+        loaders=[PILLoader, BWLoader],
+        tracer=Tracer(sink=sink.append),
+        store=MemoryResultStore(),
+        index=index,
+    )
+    processor.page_workers = 2
+    processor.rotations = (0,)
+    processor.reader = reader = FakeReader(LICENCE)
+    list(processor.find_text(pages, "abc", mode=MatchMode.ALL, max_errors=1))
+    assert len(sink) == 2 * len(pages)
+    assert index.threads == {threading.current_thread()}
+
+    calls = reader.calls
+    list(processor.find_text(pages, "abc", mode=MatchMode.ALL, max_errors=1))
+    # the first page is known as is, the others take one attempt to confirm the duplicate;
+    # the workers report it back
+    assert reader.calls == calls + len(pages) - 1
+    assert processor.duplicate_of is not None
+
+
+@pytest.mark.parametrize("page_workers", [1, 2])
+def test_find_text_pages_truncated(truncated_tiff, page_workers):
+    processor = Processor(TSConfig(), CV2Config(), loaders=[PILLoader])
+    processor.page_workers = page_workers
+    processor.reader = FakeReader("abc")
+    found = list(processor.find_text(load_pages(io.BytesIO(truncated_tiff)), "abc", mode=MatchMode.ALL, max_errors=0))
+    assert [(f.page, bool(f.match), bool(f.error)) for f in found][-3:] == [
+        (2, True, False),
+        (2, True, False),
+        (3, False, True),
+    ]
+
+
+def test_process_pages_truncated(truncated_tiff):
+    processor = Processor(TSConfig(), CV2Config(), loaders=[PILLoader])
+    processor.reader = FakeReader("abc")
+    entries = list(processor.process(load_pages(io.BytesIO(truncated_tiff))))
+    assert [(e.page, e.error.split(":")[0]) for e in entries] == [(1, ""), (2, ""), (3, "InvalidImageError")]
+
+
+def test_process_pages(pages):
+    processor = Processor(TSConfig(), CV2Config(), loaders=[PILLoader, BWLoader])
+    processor.reader = FakeReader("abc")
+    assert [(e.page, e.loader) for e in processor.process(pages)] == [
+        (1, "PILLoader"),
+        (1, "BWLoader"),
+        (2, "PILLoader"),
+        (2, "BWLoader"),
+        (3, "PILLoader"),
+        (3, "BWLoader"),
+        (4, "PILLoader"),
+        (4, "BWLoader"),
+    ]
+
+
+@pytest.mark.parametrize(("trust", "angles"), [(False, [0, 270]), (True, [0])])
+def test_find_text_exif_orientation(trust, angles):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    stream = io.BytesIO()
+    Image.new("RGB", (40, 20)).save(stream, "JPEG", exif=exif)
+    processor = Processor(TSConfig(), CV2Config(), loaders=[PILLoader], tracer=Tracer(TraceLevel.SUMMARY))
+    processor.trust_orientation = trust
+    processor.reader = FakeReader("xyz")
+    found = list(processor.find_text(load_pages(stream), "abc", mode=MatchMode.FIRST, max_errors=1))
+    assert not found
+    assert [a["angle"] for a in processor.debug_info.last.iterations[0]["angles"]] == angles
+    # not oriented: the default order
+    assert processor.get_rotations(ImageBuffer.from_pil(Image.new("RGB", (40, 20)))) == (270, 0)
+
+
+def test_processor_decode_size():
+    stream = io.BytesIO()
+    Image.new("L", (800, 400)).save(stream, "PNG")
+    processor = Processor(TSConfig(), CV2Config(), loaders=[PILLoader]).with_profile(OCRProfile())
+    processor.decode_size = 200
+    processor.reader = reader = mock.Mock(extract=mock.Mock(return_value="abc"))
+    assert [e.text for e in processor.process(stream)] == ["abc"]
+    assert reader.extract.call_args[0][0].size == (200, 100)
+    assert processor.with_profile(OCRProfile()).decode_size == 200
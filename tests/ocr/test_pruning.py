@@ -0,0 +1,62 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from hope_documents.ocr.engine import CV2Config, MatchMode, OCRProfile, Processor, TSConfig
+from hope_documents.ocr.loaders import BWLoader, Loader, PILLoader, SmartLoader
+from hope_documents.ocr.pruning import LoaderStats
+
+
+@pytest.fixture
+def stats() -> LoaderStats:
+    stats = LoaderStats()
+    # A is cheap and solves most, B is costly and redundant, C solves one search alone
+    stats.record([("A", 1.0, True), ("B", 4.0, True), ("C", 2.0, False)])
+    stats.record([("A", 1.0, True), ("B", 4.0, True), ("C", 2.0, False)])
+    stats.record([("A", 1.0, False), ("B", 4.0, False), ("C", 2.0, True)])
+    stats.record([("A", 1.0, False), ("B", 4.0, False), ("C", 2.0, False)])
+    return stats
+
+
+def test_loader_stats(stats: LoaderStats) -> None:
+    assert (stats.searches, stats.solved) == (4, 3)
+    a, b, c = stats.loaders["A"], stats.loaders["B"], stats.loaders["C"]
+    assert (a.attempts, a.cost, a.wins, a.first, a.unique) == (4, 1.0, 2, 2, 0)
+    assert (b.wins, b.first, b.unique) == (2, 0, 0)
+    assert (c.wins, c.first, c.unique) == (1, 1, 1)
+    assert stats.as_dict()["loaders"]["B"] == {
+        "attempts": 4,
+        "seconds": 16.0,
+        "cost": 4.0,
+        "wins": 2,
+        "first": 0,
+        "unique": 0,
+    }
+
+
+def test_prune(stats: LoaderStats) -> None:
+    assert stats.prune() == ["A", "C"]
+    assert stats.prune(coverage=0.5) == ["A"]
+    assert stats.prune(coverage=0) == []
+    assert LoaderStats().prune() == []
+
+
+def test_processor_stats(images_dir: Path) -> None:
+    processor = Processor(TSConfig(), CV2Config(), loaders=[Loader, PILLoader, SmartLoader, BWLoader])
+    processor.stats = LoaderStats()
+    processor.rotations = (0,)
+    assert processor.with_profile(OCRProfile()).stats is processor.stats
+    image = processor.load(str(images_dir / "_valid" / "img.png"))
+    texts = iter(["noise", "MO1699252K", "MO1699252K", "noise"] * 2)
+    with mock.patch("pytesseract.image_to_string", side_effect=lambda *a, **kw: next(texts)):
+        assert len(list(processor.find_text(image, "MO1699252K", mode=MatchMode.ALL, max_errors=1))) == 2
+        assert len(list(processor.find_text(image, "MO1699252K", mode=MatchMode.FIRST, max_errors=1))) == 1
+    stats = processor.stats
+    assert stats.searches == 2
+    assert stats.loaders["PILLoader"].first == 2
+    assert stats.loaders["SmartLoader"].wins == 1
+    # FIRST stops at the first match
+    assert stats.loaders["Loader"].attempts == 2
+    assert stats.loaders["SmartLoader"].attempts == 1
+    assert stats.prune() == ["PILLoader"]
@@ -18,6 +18,7 @@ from hope_documents.ocr.loaders import (
     SmartLoader,
 )
 from hope_documents.ocr.reader import Reader
+from hope_documents.utils.image import ImageBuffer
 
 images_dir = Path(__file__).parent.parent / "images"
 
@@ -54,3 +55,16 @@ def test_reader_error(reader: Reader):
         m.side_effect = TesseractError("", "")
         with pytest.raises(ExtractionError):
             reader.extract(Mock())
+
+
+def test_reader_buffer(reader: Reader):
+    buffer = ImageBuffer.from_pil(Image.new("L", (4, 3)))
+    with mock.patch("pytesseract.image_to_string", return_value="a\n\nb") as m:
+        assert reader.extract(buffer) == "a\nb"
+    assert m.call_args[0][0] is buffer.data
+
+
+def test_reader_lang():
+    with mock.patch("pytesseract.image_to_string", return_value="") as m:
+        Reader("", lang="ara+eng").extract(Mock())
+    assert m.call_args[1]["lang"] == "ara+eng"
@@ -0,0 +1,103 @@
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from hope_documents.ocr.scanner import Scanner, parse_shard
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 12
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for name, content in [
+        ("a.png", PNG),
+        ("b.jpg", JPEG),
+        ("notes.txt", b"hello"),
+        ("README", b"no extension"),
+        (".hidden.png", PNG),
+        ("sub/c.png", PNG),
+        ("sub/d.JPG", JPEG),
+        ("sub/fake.png", b"not an image"),
+        (".git/e.png", PNG),
+        ("sub/deep/f.png", PNG),
+    ]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return tmp_path
+
+
+def names(scanner: Scanner, root: Path) -> list[str]:
+    return [Path(f).relative_to(root).as_posix() for f in scanner.files]
+
+
+def test_scanner(tree: Path) -> None:
+    assert names(Scanner(tree), tree) == [
+        "a.png",
+        "b.jpg",
+        "notes.txt",
+        "sub/c.png",
+        "sub/d.JPG",
+        "sub/deep/f.png",
+        "sub/fake.png",
+    ]
+    assert ".hidden.png" in names(Scanner(tree, hidden=True), tree)
+    assert ".git/e.png" in names(Scanner(tree, hidden=True), tree)
+
+
+@pytest.mark.parametrize(
+    ("options", "expected"),
+    [
+        ({"extensions": ["jpg"]}, ["b.jpg", "sub/d.JPG"]),
+        ({"include": ["sub/*"], "exclude": ["fake.*"]}, ["sub/c.png", "sub/d.JPG", "sub/deep/f.png"]),
+        ({"images_only": True}, ["a.png", "b.jpg", "sub/c.png", "sub/d.JPG", "sub/deep/f.png"]),
+        ({"mime_types": ["image/jpeg"]}, ["b.jpg", "sub/d.JPG"]),
+    ],
+)
+def test_scanner_filters(tree: Path, options, expected) -> None:
+    assert names(Scanner(tree, **options), tree) == expected
+
+
+def test_scanner_shard(tree: Path) -> None:
+    everything = names(Scanner(tree), tree)
+    shards = [names(Scanner(tree, shard=(i, 3)), tree) for i in range(3)]
+    assert sorted(sum(shards, [])) == everything
+    assert shards == [names(Scanner(tree, shard=(i, 3), workers=4), tree) for i in range(3)]
+
+
+def test_scanner_workers(tree: Path) -> None:
+    assert names(Scanner(tree, workers=4), tree) == names(Scanner(tree), tree)
+    assert sorted(names(Scanner(tree, workers=4, sort=False), tree)) == names(Scanner(tree), tree)
+
+
+def test_scanner_files(tree: Path) -> None:
+    assert list(Scanner(tree / "a.png", tree / "notes.txt", images_only=True).files) == [str(tree / "a.png")]
+
+
+@pytest.mark.parametrize("value", ["1", "3/3", "a/2", "-1/2"])
+def test_parse_shard_invalid(value: str) -> None:
+    with pytest.raises(ValueError, match="Invalid shard"):
+        parse_shard(value)
+
+
+def test_parse_shard() -> None:
+    assert parse_shard("1/4") == (1, 4)
+
+
+def test_scanner_archives(tree: Path) -> None:
+    with tarfile.open(tree / "sub" / "bundle.tar", "w") as tar:
+        for name, data in [("x.png", PNG), ("y.txt", b"text"), ("dir/z.jpg", JPEG)]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    assert "sub/bundle.tar" in names(Scanner(tree, extensions=["tar"]), tree)
+    assert names(Scanner(tree, archives=True, images_only=True, include=["sub/bundle.tar*"]), tree) == [
+        "sub/bundle.tar!/dir/z.jpg",
+        "sub/bundle.tar!/x.png",
+    ]
+    assert list(Scanner(tree / "sub" / "bundle.tar", archives=True, extensions=["png"]).files) == [
+        f"{tree}/sub/bundle.tar!/x.png"
+    ]
@@ -0,0 +1,89 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from hope_documents.ocr.engine import CV2Config, Processor, TSConfig
+from hope_documents.ocr.tune import TuneCache, Tuner, best_config, iter_candidates
+from hope_documents.utils.image import ImageBuffer
+
+TARGET = "MO1699252K"
+
+
+class FakeReader:
+    """Read the target only from images upscaled at least twice."""
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.calls = 0
+
+    def extract(self, image: ImageBuffer) -> str:
+        self.calls += 1
+        return TARGET if image.size[0] >= 2 * self.width else "noise"
+
+
+@pytest.fixture
+def sample(images_dir: Path) -> tuple[str, str]:
+    return str(images_dir / "_valid" / "img.png"), TARGET
+
+
+@pytest.fixture
+def processor(sample: tuple[str, str]) -> Processor:
+    processor = Processor(TSConfig(), CV2Config())
+    processor.reader = FakeReader(processor.load(sample[0]).size[0])
+    processor.rotations = (0, 180)
+    return processor
+
+
+def test_iter_candidates() -> None:
+    assert iter_candidates({"SmartLoader": {"block_size": [11, 21], "c": [2]}, "CV2Loader": {"threshold": [1]}}) == [
+        ("SmartLoader", {"block_size": 11, "c": 2}),
+        ("SmartLoader", {"block_size": 21, "c": 2}),
+        ("CV2Loader", {"threshold": 1}),
+    ]
+
+
+def test_tuner_unknown_loader(processor: Processor) -> None:
+    with pytest.raises(ValueError, match="Unknown loaders: Missing"):
+        Tuner(processor, {"Missing": {"a": [1]}})
+
+
+def test_tuner(processor: Processor, sample: tuple[str, str], tmp_path: Path) -> None:
+    grid = {"ImprovedLoader": {"scale_factor": [1.0, 2.0], "blur_kernel_size": [3]}, "CV2Loader": {"threshold": [128]}}
+    cache = TuneCache(tmp_path / "cache.json")
+    with mock.patch("time.perf_counter", side_effect=[float(i) / 10 for i in range(100)]):
+        results = Tuner(processor, grid, cache=cache, workers=2).run([sample, ("missing.png", TARGET)])
+    best = results[0]
+    assert (best.loader, best.params) == ("ImprovedLoader", {"scale_factor": 2.0, "blur_kernel_size": 3})
+    assert (best.total, best.hits, best.attempts) == (1, 1, 1)
+    assert best.score == pytest.approx(10)
+    assert [r.hits for r in results[1:]] == [0, 0]
+    assert results[1].attempts == len(processor.rotations)
+    assert results[1].missed == [sample[0]]
+    assert best_config(results) == {
+        "ImprovedLoader": {"scale_factor": 2.0, "blur_kernel_size": 3},
+        "CV2Loader": {"threshold": 128},
+    }
+    calls = processor.reader.calls
+
+    # a second run reuses the cached attempts
+    cache = TuneCache(tmp_path / "cache.json")
+    again = Tuner(processor, grid, cache=cache).run([sample])
+    assert processor.reader.calls == calls
+    assert cache.hits == calls
+    assert [r.as_dict() for r in again] == [r.as_dict() for r in results]
+
+
+def test_tune_cache_invalid(tmp_path: Path) -> None:
+    (tmp_path / "cache.json").write_text("[1, 2]")
+    assert TuneCache(tmp_path / "cache.json").entries == {}
+
+
+def test_cv2_config_loaders() -> None:
+    config = CV2Config(loaders={"SmartLoader": {"block_size": 21}})
+    assert config.options("SmartLoader") == {"threshold": 120, "block_size": 21}
+    assert config.options("BWLoader") == {"threshold": 120}
+    assert CV2Config().as_dict() == {"threshold": 120}
+    processor = Processor(TSConfig(), config)
+    assert [loader.block_size for loader in processor.loaders if hasattr(loader, "block_size")] == [21, 11]
+    assert "block_size" in processor.config_key
@@ -0,0 +1,94 @@
+import shutil
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from hope_documents.ocr import watch
+from hope_documents.ocr.engine import CV2Config, Processor, TSConfig
+from hope_documents.ocr.scanner import Scanner
+from hope_documents.ocr.watch import Watcher, get_notifier, move_aside, watch_files
+
+
+@pytest.fixture
+def spool(tmp_path: Path) -> Path:
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    return spool
+
+
+def test_watcher_settle(spool: Path) -> None:
+    watcher = Watcher(Scanner(spool), settle=0)
+    image = spool / "a.png"
+    image.write_bytes(b"partial")
+    assert watcher.poll() == []
+    assert watcher.unsettled
+    image.write_bytes(b"partial and more")
+    assert watcher.poll() == []
+    assert watcher.poll() == [str(image)]
+    # returned once, until it changes
+    assert watcher.poll() == []
+    image.write_bytes(b"a new version")
+    watcher.poll()
+    assert watcher.poll() == [str(image)]
+    image.unlink()
+    watcher.poll()
+    assert not watcher.seen
+    watcher.close()
+
+
+def test_notifier(spool: Path) -> None:
+    if not (notifier := get_notifier([str(spool)])):
+        pytest.skip("inotify not available")
+    assert not notifier.wait(0)
+    (spool / "a.png").write_bytes(b"data")
+    assert notifier.wait(1)
+    assert not notifier.wait(0)
+    notifier.close()
+
+
+def test_watch_files(spool: Path, images_dir: Path) -> None:
+    shutil.copy(images_dir / "_valid" / "img.png", spool / "img.png")
+    (spool / "empty.png").write_bytes(b"")
+    processor = Processor(TSConfig(), CV2Config())
+    watcher = Watcher(Scanner(spool), interval=0.1, settle=0)
+    with mock.patch("pytesseract.image_to_string", return_value="MO1699252K"):
+        results = {Path(r.path).name: r for r in watch_files(processor, watcher, workers=2, once=True)}
+    assert not results["img.png"].failed
+    assert results["img.png"].digests[1]
+    assert {e.text for e in results["img.png"].entries} == {"MO1699252K"}
+    assert results["empty.png"].failed
+
+
+def test_move_aside(spool: Path, tmp_path: Path) -> None:
+    done = tmp_path / "done"
+    for _ in range(2):
+        (spool / "a.png").write_bytes(b"data")
+        move_aside(str(spool / "a.png"), str(done))
+    assert sorted(p.name for p in done.iterdir()) == ["a.1.png", "a.png"]
+
+
+def test_watch_files_errors(spool: Path, images_dir: Path, truncated_tiff: bytes) -> None:
+    shutil.copy(images_dir / "_valid" / "img.png", spool / "img.png")
+    shutil.copy(images_dir / "_valid" / "img.png", spool / "bug.png")
+    (spool / "pages.tif").write_bytes(truncated_tiff)
+    processor = Processor(TSConfig(), CV2Config())
+    watcher = Watcher(Scanner(spool), interval=0.1, settle=0)
+    extract_file = watch.extract_file
+
+    def extract(processor, path):
+        if path.endswith("bug.png"):
+            raise RuntimeError("unexpected")
+        return extract_file(processor, path)
+
+    with (
+        mock.patch("pytesseract.image_to_string", return_value="MO1699252K"),
+        mock.patch("hope_documents.ocr.watch.extract_file", side_effect=extract),
+    ):
+        results = {Path(r.path).name: r for r in watch_files(processor, watcher, workers=2, once=True)}
+    assert not results["img.png"].failed
+    assert results["bug.png"].entries[0].error == "RuntimeError: unexpected"
+    # the pages before the truncated one are extracted
+    assert results["pages.tif"].failed
+    assert {e.page for e in results["pages.tif"].entries if e.error} == {3}
+    assert {e.page for e in results["pages.tif"].entries if not e.error} == {1, 2}
@@ -0,0 +1,81 @@
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from hope_documents.exceptions import InvalidImageError
+from hope_documents.utils.bundle import Bundle, MemberReader, open_path, path_stat, split_member
+from hope_documents.utils.image import get_image, load_image
+
+
+@pytest.fixture
+def image_bytes(images_dir: Path) -> bytes:
+    return (images_dir / "_valid" / "img.png").read_bytes()
+
+
+def make_tar(path: Path, members: dict[str, bytes]) -> Path:
+    with tarfile.open(path, "w") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def make_zip(path: Path, members: dict[str, bytes], compression: int = zipfile.ZIP_STORED) -> Path:
+    with zipfile.ZipFile(path, "w", compression=compression) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return path
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        make_tar,
+        make_zip,
+        lambda path, members: make_zip(path, members, zipfile.ZIP_DEFLATED),
+    ],
+    ids=["tar", "zip", "zip-deflated"],
+)
+def test_bundle(tmp_path: Path, image_bytes: bytes, factory) -> None:
+    bundle = Bundle(factory(tmp_path / "bundle", {"a/img.png": image_bytes, "notes.txt": b"hello"}))
+    assert list(bundle) == ["a/img.png", "notes.txt"]
+    assert bundle.size("a/img.png") == len(image_bytes)
+    assert bundle.open("a/img.png").read() == image_bytes
+    assert bundle.open("notes.txt").read() == b"hello"
+    with pytest.raises(FileNotFoundError):
+        bundle.open("missing.png")
+
+
+def test_bundle_invalid(tmp_path: Path) -> None:
+    (tmp_path / "bundle.tar").write_bytes(b"not an archive" * 100)
+    with pytest.raises(InvalidImageError, match="not an uncompressed tar"):
+        Bundle(tmp_path / "bundle.tar")
+    (tmp_path / "empty.tar").write_bytes(b"")
+    with pytest.raises(InvalidImageError, match="empty"):
+        Bundle(tmp_path / "empty.tar")
+
+
+def test_member_reader() -> None:
+    reader = MemberReader(memoryview(b"0123456789")[2:8])
+    assert reader.read(2) == b"23"
+    assert reader.tell() == 2
+    reader.seek(-1, os.SEEK_END)
+    assert reader.read() == b"7"
+    assert reader.read(5) == b""
+    reader.seek(1)
+    assert reader.read(100) == b"34567"
+
+
+def test_member_path(tmp_path: Path, image_bytes: bytes) -> None:
+    archive = make_tar(tmp_path / "bundle.tar", {"a/img.png": image_bytes})
+    member = f"{archive}!/a/img.png"
+    assert split_member(member) == (str(archive), "a/img.png")
+    assert split_member(archive) is None
+    assert open_path(member).read() == image_bytes
+    assert path_stat(member) == (len(image_bytes), archive.stat().st_mtime_ns)
+    assert get_image(member).size == load_image(io.BytesIO(image_bytes)).size
@@ -1,9 +1,22 @@
 import base64
 from io import BytesIO
+from unittest import mock
 
+import numpy as np
+import pytest
+from PIL import ExifTags, Image
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
-from hope_documents.utils.image import get_image_base64
+from hope_documents.exceptions import InvalidImageError
+from hope_documents.utils.image import (
+    ImageBuffer,
+    ImagePages,
+    fingerprint_distance,
+    get_image_base64,
+    get_thumbnail_base64,
+    load_pages,
+    reduce_image,
+)
 
 
 def test_get_image_base64_with_png():
@@ -25,3 +38,147 @@ def test_get_image_base64_with_png():
     encoded_content = base64_uri.split(",")[1]
     expected_encoded_content = base64.b64encode(image_content).decode("utf-8")
     assert encoded_content == expected_encoded_content
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "P", "1"])
+def test_image_buffer_from_pil(mode):
+    image = Image.new(mode, (4, 3))
+    buffer = ImageBuffer.from_pil(image)
+    assert buffer.size == (4, 3)
+    assert buffer.mode in ("L", "RGB")
+    assert buffer.to_pil().size == (4, 3)
+
+
+@pytest.mark.parametrize("angle", [0, 90, 180, 270, 45])
+def test_image_buffer_rotate(angle):
+    image = Image.fromarray(np.arange(36, dtype=np.uint8).reshape(3, 4, 3))
+    buffer = ImageBuffer.from_pil(image).rotate(angle)
+    expected = image.rotate(angle, expand=True)
+    assert buffer.size == expected.size
+    assert (buffer.data == np.asarray(expected)).all()
+    assert (buffer.gray().data == ImageBuffer.from_pil(expected).gray().data).all()
+
+
+def test_image_buffer_gray_is_shared():
+    buffer = ImageBuffer.from_pil(Image.new("RGB", (4, 3)))
+    assert buffer.gray() is buffer.gray()
+    assert buffer.gray().gray() is buffer.gray()
+    assert buffer.rotate(90).gray().data.base is not None
+
+
+def test_get_image_base64_with_buffer():
+    buffer = ImageBuffer.from_pil(Image.new("L", (4, 3)))
+    assert get_image_base64(buffer).startswith("data:image/png;base64,")
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "WEBP", "PNG"])
+def test_get_thumbnail_base64(image_format):
+    image = Image.new("RGB", (1000, 500))
+    uri = get_thumbnail_base64(image, 100, image_format)
+    assert uri.startswith(f"data:image/{image_format.lower()};base64,")
+    thumbnail = Image.open(BytesIO(base64.b64decode(uri.split(",")[1])))
+    assert thumbnail.size == (100, 50)
+
+
+def test_fingerprint(images_dir):
+    image = Image.open(images_dir / "ita/dl1.png").convert("RGB")
+    fingerprint = ImageBuffer.from_pil(image).fingerprint()
+    assert len(fingerprint) == 64
+
+    encoded = BytesIO()
+    image.save(encoded, "JPEG", quality=60)
+    for variant in [Image.open(encoded), image.resize((image.width // 2, image.height // 2))]:
+        assert fingerprint_distance(fingerprint, ImageBuffer.from_pil(variant).fingerprint()) <= 12
+
+    # same layout, different documents
+    passport1 = ImageBuffer.from_pil(Image.open(images_dir / "pol/pp1.png")).fingerprint()
+    passport2 = ImageBuffer.from_pil(Image.open(images_dir / "deu/dp1.png")).fingerprint()
+    assert fingerprint_distance(passport1, passport2) > 12
+
+
+def multipage_tiff(sizes):
+    pages = [Image.new("L", size, color=i * 50) for i, size in enumerate(sizes)]
+    stream = BytesIO()
+    pages[0].save(stream, "TIFF", save_all=True, append_images=pages[1:])
+    stream.seek(0)
+    return stream
+
+
+def test_load_pages():
+    pages = load_pages(multipage_tiff([(10, 10), (20, 10), (30, 10)]))
+    assert isinstance(pages, ImagePages)
+    assert len(pages) == 3
+    assert [p.size for p in pages] == [(10, 10), (20, 10), (30, 10)]
+    assert get_thumbnail_base64(pages).startswith("data:image/jpeg;base64,")
+    assert isinstance(load_pages(multipage_tiff([(10, 10)])), ImageBuffer)
+
+
+def test_image_pages_lazy():
+    pages = load_pages(multipage_tiff([(10, 10), (20, 10), (30, 10)]))
+    with mock.patch.object(ImageBuffer, "from_pil", wraps=ImageBuffer.from_pil) as decode:
+        for page in pages:
+            if page.size == (20, 10):
+                break
+    assert decode.call_count == 2
+
+
+def test_image_pages_truncated(truncated_tiff):
+    pages = load_pages(BytesIO(truncated_tiff))
+    assert pages[1].size == (100, 100)
+    with pytest.raises(InvalidImageError, match="page 3"):
+        pages[2]
+
+
+def exif_rotated(image, orientation):
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    stream = BytesIO()
+    image.save(stream, "JPEG", exif=exif)
+    stream.seek(0)
+    return Image.open(stream)
+
+
+def test_image_buffer_exif_orientation():
+    # stored 90 degrees clockwise, EXIF orientation 6 tells to rotate it back
+    stored = exif_rotated(Image.new("RGB", (40, 20)), 6)
+    buffer = ImageBuffer.from_pil(stored)
+    assert buffer.size == (20, 40)
+    assert buffer.oriented
+    assert buffer.info["exif_orientation"] == 6
+    assert buffer.rotate(90).oriented
+    assert not ImageBuffer.from_pil(exif_rotated(Image.new("RGB", (40, 20)), 1)).oriented
+
+
+@pytest.mark.parametrize(
+    ("image_format", "mode", "size"),
+    [
+        # JPEG: decoded at 1/2, 1/4 would be smaller than max_size
+        ("JPEG", "RGB", (500, 300)),
+        # others: the largest integer reduction keeping the longest side >= max_size
+        ("PNG", "RGB", (334, 200)),
+        ("PNG", "P", (334, 200)),
+        ("PNG", "1", (334, 200)),
+    ],
+)
+def test_load_pages_max_size(image_format, mode, size):
+    stream = BytesIO()
+    Image.new(mode, (1000, 600)).save(stream, image_format)
+    stream.seek(0)
+    buffer = load_pages(stream, max_size=300)
+    assert buffer.size == size
+    assert buffer.info["decode_scale"] == pytest.approx(1000 / size[0])
+    stream.seek(0)
+    assert load_pages(stream, max_size=2000).size == (1000, 600)
+
+
+def test_reduce_image_draft():
+    stream = BytesIO()
+    Image.new("RGB", (1600, 800)).save(stream, "JPEG")
+    stream.seek(0)
+    image = Image.open(stream)
+    with mock.patch.object(image, "draft", wraps=image.draft) as draft:
+        reduced, scale = reduce_image(image, 400)
+    draft.assert_called_once_with("RGB", (400, 200))
+    # decoded at 1/4 by the JPEG decoder, no further reduction needed
+    assert reduced.size == (400, 200)
+    assert scale == 4
@@ -1,4 +1,4 @@
-from hope_documents.utils.language import fqn
+from hope_documents.utils.language import Peekable, fqn
 
 
 class MyClass:
@@ -24,3 +24,11 @@ def test_fqn_with_method():
     """Test that fqn returns the correct fully qualified name for a method."""
     instance = MyClass()
     assert fqn(instance.my_method) == "test_language.MyClass.my_method"
+
+
+def test_peekable():
+    items = Peekable([1, 2])
+    assert items.has_next()
+    assert items.has_next()
+    assert list(items) == [1, 2]
+    assert not items.has_next()